@@ -0,0 +1,1101 @@
+#!/usr/bin/env python3
+"""
+Motores de almacenamiento para perfiles y paletas de belleza
+Permite cambiar el archivo JSON completo por una base SQLite embebida con tablas indexadas
+"""
+
+import argparse
+import bisect
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se protege entre hilos del mismo proceso
+    fcntl = None
+
+from json_rapido import dumps, dumps_str, loads
+
+# ============================================================================
+# FORMA PERSISTIDA DE LOS REGISTROS
+# ============================================================================
+
+class RecordCodec:
+    """Conversión entre la forma de la API y la forma guardada de perfiles y paletas
+
+    El códec por defecto guarda los registros tal cual. decode_* debe aceptar también los
+    registros escritos con formatos anteriores, y encode_* registros ya codificados.
+    """
+
+    def encode_profile(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        return profile
+
+    def decode_profile(self, stored: Dict[str, Any]) -> Dict[str, Any]:
+        return stored
+
+    def encode_palette(self, palette: Dict[str, Any]) -> Dict[str, Any]:
+        return palette
+
+    def decode_palette(self, stored: Dict[str, Any]) -> Dict[str, Any]:
+        return stored
+
+    def encode_document(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "profiles": {user_id: self.encode_profile(profile)
+                         for user_id, profile in data.get("profiles", {}).items()},
+            "palettes": {user_id: [self.encode_palette(palette) for palette in palettes]
+                         for user_id, palettes in data.get("palettes", {}).items()}
+        }
+
+    def decode_document(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "profiles": {user_id: self.decode_profile(profile)
+                         for user_id, profile in data.get("profiles", {}).items()},
+            "palettes": {user_id: [self.decode_palette(palette) for palette in palettes]
+                         for user_id, palettes in data.get("palettes", {}).items()}
+        }
+
+# ============================================================================
+# INTERFAZ COMÚN
+# ============================================================================
+
+class BaseStorage:
+    """Interfaz común que deben implementar todos los motores de almacenamiento
+
+    Las operaciones reciben y devuelven registros en la forma de la API; el códec
+    decide cómo se guardan.
+    """
+
+    codec: RecordCodec = RecordCodec()
+    # True si profiles_version es un contador que sube exactamente 1 por transacción de escritura
+    counts_versions = False
+
+    def init(self) -> None:
+        """Crear la estructura de almacenamiento si no existe"""
+        raise NotImplementedError
+
+    def get_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Obtener un perfil o None si no existe"""
+        raise NotImplementedError
+
+    def has_profile(self, user_id: str) -> bool:
+        """Verificar si existe un perfil"""
+        return self.get_profile(user_id) is not None
+
+    def put_profile(self, user_id: str, profile: Dict[str, Any]) -> None:
+        """Crear o reemplazar un perfil"""
+        raise NotImplementedError
+
+    def put_profiles(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Crear o reemplazar varios perfiles en una sola escritura"""
+        for user_id, profile in items:
+            self.put_profile(user_id, profile)
+
+    def create_profile(self, user_id: str, profile: Dict[str, Any]) -> bool:
+        """Crear un perfil de forma atómica; devuelve False si ya existía"""
+        raise NotImplementedError
+
+    def create_profiles(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[bool]:
+        """Crear varios perfiles en una sola transacción; indica cuáles se crearon"""
+        raise NotImplementedError
+
+    def update_profiles(self, items: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> List[bool]:
+        """
+        Reemplazar perfiles solo si siguen guardados tal como se leyeron
+
+        items son tuplas (user_id, perfil leído, perfil nuevo). Un perfil borrado o modificado
+        desde la lectura no se toca; indica cuáles se actualizaron.
+        """
+        raise NotImplementedError
+
+    def delete_profile(self, user_id: str) -> bool:
+        """Eliminar un perfil; devuelve False si no existía"""
+        raise NotImplementedError
+
+    def iter_profiles(self, after: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Recorrer los perfiles como pares (user_id, perfil) en orden de user_id, desde after"""
+        raise NotImplementedError
+
+    def iter_profile_summaries(self, filters: Optional[Dict[str, str]] = None,
+                               after: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Recorrer resúmenes de perfiles ordenados por user_id
+
+        filters admite las claves de SUMMARY_FILTERS (skin_tone, undertone, season);
+        after es el cursor: solo se devuelven user_id mayores que él.
+        """
+        raise NotImplementedError
+
+    def count_profiles(self, filters: Optional[Dict[str, str]] = None) -> int:
+        """Contar los perfiles que cumplen los filtros usando los índices secundarios"""
+        raise NotImplementedError
+
+    def get_palettes(self, user_id: str) -> List[Dict[str, Any]]:
+        """Obtener el historial retenido de paletas de un usuario, de la más antigua a la más reciente"""
+        raise NotImplementedError
+
+    def iter_palettes(self, user_id: str) -> Iterator[Dict[str, Any]]:
+        """Recorrer el historial retenido de un usuario en el orden de get_palettes, por páginas"""
+        yield from self.get_palettes(user_id)
+
+    def iter_profiles_with_palettes(self) -> Iterator[Tuple[str, Dict[str, Any], Iterator[Dict[str, Any]]]]:
+        """Recorrer (user_id, perfil, paletas retenidas) en orden de user_id, para los volcados completos"""
+        for user_id, profile in self.iter_profiles():
+            yield user_id, profile, self.iter_palettes(user_id)
+
+    def get_palettes_page(self, user_id: str, limit: int,
+                          cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Página del historial de paletas, de la más reciente a la más antigua
+
+        Devuelve (paletas, next_cursor); next_cursor es None en la última página.
+        """
+        raise NotImplementedError
+
+    def append_palette(self, user_id: str, palette: Dict[str, Any]) -> None:
+        """Agregar una paleta al historial de un usuario"""
+        raise NotImplementedError
+
+    def append_palettes(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Agregar varias paletas (user_id, paleta) en una sola escritura"""
+        raise NotImplementedError
+
+    def load_all(self) -> Dict[str, Any]:
+        """Cargar el documento completo {"profiles": ..., "palettes": ...}"""
+        raise NotImplementedError
+
+    def save_all(self, data: Dict[str, Any]) -> None:
+        """Reemplazar el contenido completo del almacenamiento"""
+        raise NotImplementedError
+
+    def compact(self) -> int:
+        """Aplicar la retención de paletas y compactar; devuelve las paletas eliminadas"""
+        return 0
+
+    def profiles_version(self) -> Any:
+        """Marca que cambia cada vez que se modifican los perfiles almacenados"""
+        raise NotImplementedError
+
+    def is_empty(self) -> bool:
+        """Verificar si no hay perfiles ni paletas guardadas"""
+        data = self.load_all()
+        return not data.get("profiles") and not data.get("palettes")
+
+# ============================================================================
+# RESÚMENES DE PERFILES
+# ============================================================================
+
+# Columnas resumidas de cada perfil (en SQLite son columnas reales de la tabla profiles)
+SUMMARY_COLUMNS = ("user_id", "name", "created_at", "skin_tone", "undertone", "season")
+SUMMARY_FILTERS = ("skin_tone", "undertone", "season")
+
+# Perfiles leídos por consulta al recorrer SQLite por páginas
+ITER_PAGE_SIZE = 500
+
+def profile_summary_fields(user_id: str, profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Extraer los campos resumidos de un perfil (season es la clave de la estación)"""
+    basic_info = profile.get("basic_info", {})
+    physical = profile.get("physical_characteristics", {})
+    color_analysis = profile.get("color_analysis", {})
+    return {
+        "user_id": user_id,
+        "name": basic_info.get("name"),
+        "created_at": basic_info.get("created_at"),
+        "skin_tone": physical.get("skin_tone"),
+        "undertone": color_analysis.get("undertone_analysis", {}).get("undertone"),
+        "season": color_analysis.get("season_analysis", {}).get("season")
+    }
+
+class ProfileIndex:
+    """Índices secundarios en memoria: valor de skin_tone/undertone/season -> user_ids ordenados"""
+
+    def __init__(self):
+        self.summaries: Dict[str, Dict[str, Any]] = {}
+        self.user_ids: List[str] = []
+        self.by_field: Dict[str, Dict[Any, List[str]]] = {field: {} for field in SUMMARY_FILTERS}
+
+    @classmethod
+    def build(cls, profiles: Dict[str, Dict[str, Any]]) -> "ProfileIndex":
+        index = cls()
+        for user_id in sorted(profiles):
+            index.add(profile_summary_fields(user_id, profiles[user_id]))
+        return index
+
+    def add(self, summary: Dict[str, Any]) -> None:
+        user_id = summary["user_id"]
+        self.remove(user_id)
+        self.summaries[user_id] = summary
+        bisect.insort(self.user_ids, user_id)
+        for field in SUMMARY_FILTERS:
+            bisect.insort(self.by_field[field].setdefault(summary[field], []), user_id)
+
+    def remove(self, user_id: str) -> None:
+        summary = self.summaries.pop(user_id, None)
+        if summary is None:
+            return
+        _remove_sorted(self.user_ids, user_id)
+        for field in SUMMARY_FILTERS:
+            _remove_sorted(self.by_field[field].get(summary[field], []), user_id)
+
+    def lookup(self, filters: Dict[str, str], after: Optional[str] = None) -> List[str]:
+        """user_ids que cumplen los filtros, recorriendo solo la lista indexada más corta"""
+        if filters:
+            candidates = min((self.by_field[field].get(value, []) for field, value in filters.items()), key=len)
+        else:
+            candidates = self.user_ids
+        start = bisect.bisect_right(candidates, after) if after is not None else 0
+        return [
+            user_id for user_id in candidates[start:]
+            if all(self.summaries[user_id][field] == value for field, value in filters.items())
+        ]
+
+def _remove_sorted(items: List[str], value: str) -> None:
+    """Eliminar un valor de una lista ordenada si está presente"""
+    position = bisect.bisect_left(items, value)
+    if position < len(items) and items[position] == value:
+        del items[position]
+
+# ============================================================================
+# RETENCIÓN DE PALETAS
+# ============================================================================
+
+# Máximo de paletas por usuario y antigüedad máxima en días (0 = sin límite)
+PALETTE_MAX_PER_USER = int(os.environ.get("BEAUTY_PALETTE_MAX_PER_USER", 100))
+PALETTE_MAX_AGE_DAYS = float(os.environ.get("BEAUTY_PALETTE_MAX_AGE_DAYS", 0))
+
+class PaletteRetention:
+    """Límites del historial de paletas de cada usuario, ordenado por generated_at"""
+
+    def __init__(self, max_per_user: int = PALETTE_MAX_PER_USER, max_age_days: float = PALETTE_MAX_AGE_DAYS):
+        self.max_per_user = max_per_user
+        self.max_age_days = max_age_days
+
+    def cutoff(self) -> Optional[str]:
+        """generated_at mínimo que se conserva (misma forma ISO que datetime.now().isoformat())"""
+        if self.max_age_days <= 0:
+            return None
+        return (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+
+    def select(self, palettes: List[Dict[str, Any]]) -> List[int]:
+        """Posiciones de las paletas retenidas, ordenadas por generated_at (a igualdad, por posición)"""
+        order = sorted(range(len(palettes)), key=lambda i: palettes[i].get("generated_at") or "")
+        cutoff = self.cutoff()
+        if cutoff is not None:
+            order = [i for i in order if (palettes[i].get("generated_at") or "") >= cutoff]
+        if self.max_per_user > 0:
+            order = order[-self.max_per_user:]
+        return order
+
+    def apply(self, palettes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [palettes[i] for i in self.select(palettes)]
+
+    def info(self) -> Dict[str, Any]:
+        return {"max_per_user": self.max_per_user or None, "max_age_days": self.max_age_days or None}
+
+def encode_palette_cursor(generated_at: Optional[str], position: int) -> str:
+    return f"{generated_at or ''}|{position}"
+
+def decode_palette_cursor(cursor: str) -> Tuple[str, int]:
+    """Separar un cursor de paletas en (generated_at, posición); ValueError si no es válido"""
+    generated_at, separator, position = cursor.rpartition("|")
+    if not separator:
+        raise ValueError(f"Cursor no válido: {cursor}")
+    try:
+        return generated_at, int(position)
+    except ValueError:
+        raise ValueError(f"Cursor no válido: {cursor}") from None
+
+# ============================================================================
+# BLOQUEOS Y ESCRITURA ATÓMICA
+# ============================================================================
+
+class FileLock:
+    """Bloqueo exclusivo entre procesos (flock) y reentrante entre hilos del mismo proceso"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> "FileLock":
+        self._thread_lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            except Exception:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = 2) -> None:
+    """Escribir JSON en un archivo temporal y renombrarlo: nunca deja un archivo truncado"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dumps(data, indent=indent))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# ============================================================================
+# DIARIO DE PALETAS (append-only, una paleta por línea)
+# ============================================================================
+
+JOURNAL_MAX_BYTES = int(os.environ.get("BEAUTY_JOURNAL_MAX_BYTES", 1024 * 1024))
+
+class PaletteJournal:
+    """Diario append-only de paletas generadas en formato JSON por línea"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def append(self, user_id: str, palette: Dict[str, Any]) -> None:
+        """Agregar una paleta al final del diario"""
+        self.extend([(user_id, palette)])
+
+    def extend(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Agregar varias paletas al final del diario con una sola escritura"""
+        lines = "".join(
+            dumps_str({"user_id": user_id, "palette": palette}) + "\n"
+            for user_id, palette in items
+        )
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+    def entries(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Recorrer las entradas del diario, ignorando líneas incompletas"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = loads(line)
+                    except ValueError:
+                        continue  # Línea truncada por una escritura interrumpida
+                    yield entry["user_id"], entry["palette"]
+        except FileNotFoundError:
+            return
+
+    def size(self) -> int:
+        """Tamaño actual del diario en bytes"""
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def clear(self) -> None:
+        """Vaciar el diario después de compactarlo"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+# ============================================================================
+# MOTOR JSON (documento completo, compatible con la versión anterior)
+# ============================================================================
+
+class JSONFileStorage(BaseStorage):
+    """Almacenamiento en un archivo JSON más un diario de paletas que se compacta periódicamente"""
+
+    def __init__(self, path: str, journal_max_bytes: int = JOURNAL_MAX_BYTES,
+                 codec: Optional[RecordCodec] = None, retention: Optional[PaletteRetention] = None):
+        self.path = path
+        self.codec = codec or RecordCodec()
+        self.retention = retention or PaletteRetention()
+        self.journal = PaletteJournal(os.path.splitext(path)[0] + ".palettes.jsonl")
+        self.journal_max_bytes = journal_max_bytes
+        # Serializa las lecturas-modificación-escritura entre hilos y entre workers
+        self._lock = FileLock(path + ".lock")
+        # Índices secundarios; se reconstruyen si otro proceso modifica el documento
+        self._index: Optional[ProfileIndex] = None
+        self._index_version: Any = None
+
+    def init(self) -> None:
+        with self._lock:
+            if not os.path.exists(self.path):
+                self._write_document({"profiles": {}, "palettes": {}})
+
+    def _read_document(self) -> Dict[str, Any]:
+        """Leer solo el documento principal en su forma guardada, sin aplicar el diario"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = loads(f.read())
+        except FileNotFoundError:
+            self.init()
+            return {"profiles": {}, "palettes": {}}
+        data.setdefault("profiles", {})
+        data.setdefault("palettes", {})
+        return data
+
+    def _write_document(self, data: Dict[str, Any]) -> None:
+        atomic_write_json(self.path, data)
+
+    def _current_index(self) -> Optional[ProfileIndex]:
+        """Índice en memoria si sigue al día con el documento (llamar con el bloqueo tomado)"""
+        if self._index is not None and self._index_version == self.profiles_version():
+            return self._index
+        self._index = None
+        return None
+
+    def _index_written(self) -> None:
+        """Registrar que el índice refleja una escritura propia recién hecha"""
+        if self._index is not None:
+            self._index_version = self.profiles_version()
+
+    def _fresh_index(self) -> ProfileIndex:
+        """Obtener el índice, reconstruyéndolo desde el documento si está desactualizado"""
+        with self._lock:
+            index = self._current_index()
+            if index is None:
+                version = self.profiles_version()
+                index = ProfileIndex.build(self._read_document()["profiles"])
+                self._index, self._index_version = index, version
+            return index
+
+    def _read_stored(self) -> Dict[str, Any]:
+        """Documento principal más el diario, en la forma guardada"""
+        data = self._read_document()
+        for user_id, palette in self.journal.entries():
+            data["palettes"].setdefault(user_id, []).append(palette)
+        return data
+
+    def load_all(self) -> Dict[str, Any]:
+        with self._lock:
+            return self.codec.decode_document(self._read_stored())
+
+    def save_all(self, data: Dict[str, Any]) -> None:
+        # El documento recibido ya incluye el diario, así que se descarta tras escribirlo
+        with self._lock:
+            self._write_document(self.codec.encode_document(data))
+            self.journal.clear()
+            self._index = None
+
+    def compact(self) -> int:
+        """Incorporar el diario de paletas al documento principal aplicando la retención
+
+        Los registros se recodifican sin expandirlos, de modo que los escritos con un
+        formato anterior pasan al formato actual.
+        """
+        with self._lock:
+            data = self._read_stored()
+            removed = 0
+            for user_id, palettes in list(data["palettes"].items()):
+                kept = self.retention.apply(palettes)
+                removed += len(palettes) - len(kept)
+                if kept:
+                    data["palettes"][user_id] = kept
+                else:
+                    del data["palettes"][user_id]
+            self._write_document(self.codec.encode_document(data))
+            self.journal.clear()
+            self._index = None
+            return removed
+
+    def profiles_version(self) -> Any:
+        # Las paletas van al diario, así que el mtime del documento solo cambia con los perfiles
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def get_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        stored = self._read_document()["profiles"].get(user_id)
+        return self.codec.decode_profile(stored) if stored is not None else None
+
+    def put_profile(self, user_id: str, profile: Dict[str, Any]) -> None:
+        self.put_profiles([(user_id, profile)])
+
+    def put_profiles(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if not items:
+            return
+        with self._lock:
+            index = self._current_index()
+            data = self._read_document()
+            for user_id, profile in items:
+                data["profiles"][user_id] = self.codec.encode_profile(profile)
+            self._write_document(data)
+            if index is not None:
+                for user_id, profile in items:
+                    index.add(profile_summary_fields(user_id, profile))
+                self._index_written()
+
+    def update_profiles(self, items: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> List[bool]:
+        with self._lock:
+            index = self._current_index()
+            data = self._read_document()
+            updated = []
+            for user_id, expected, profile in items:
+                stored = data["profiles"].get(user_id)
+                updated.append(stored is not None and self.codec.decode_profile(stored) == expected)
+                if updated[-1]:
+                    data["profiles"][user_id] = self.codec.encode_profile(profile)
+            if any(updated):
+                self._write_document(data)
+                if index is not None:
+                    for (user_id, _, profile), was_updated in zip(items, updated):
+                        if was_updated:
+                            index.add(profile_summary_fields(user_id, profile))
+                    self._index_written()
+            return updated
+
+    def create_profile(self, user_id: str, profile: Dict[str, Any]) -> bool:
+        return self.create_profiles([(user_id, profile)])[0]
+
+    def create_profiles(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[bool]:
+        with self._lock:
+            index = self._current_index()
+            data = self._read_document()
+            created = []
+            for user_id, profile in items:
+                created.append(user_id not in data["profiles"])
+                if created[-1]:
+                    data["profiles"][user_id] = self.codec.encode_profile(profile)
+            if any(created):
+                self._write_document(data)
+                if index is not None:
+                    for (user_id, profile), was_created in zip(items, created):
+                        if was_created:
+                            index.add(profile_summary_fields(user_id, profile))
+                    self._index_written()
+            return created
+
+    def delete_profile(self, user_id: str) -> bool:
+        with self._lock:
+            index = self._current_index()
+            data = self._read_document()
+            if user_id not in data["profiles"]:
+                return False
+            del data["profiles"][user_id]
+            self._write_document(data)
+            if index is not None:
+                index.remove(user_id)
+                self._index_written()
+            return True
+
+    def iter_profiles(self, after: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        profiles = self._read_document()["profiles"]
+        for user_id in sorted(profiles):
+            if after is None or user_id > after:
+                yield user_id, self.codec.decode_profile(profiles[user_id])
+
+    def iter_profiles_with_palettes(self) -> Iterator[Tuple[str, Dict[str, Any], Iterator[Dict[str, Any]]]]:
+        # Una sola lectura del documento y del diario para todo el volcado, no una por usuario
+        with self._lock:
+            data = self._read_stored()
+        for user_id in sorted(data["profiles"]):
+            palettes = self.retention.apply(data["palettes"].get(user_id, []))
+            yield (user_id, self.codec.decode_profile(data["profiles"][user_id]),
+                   (self.codec.decode_palette(palette) for palette in palettes))
+
+    def iter_profile_summaries(self, filters: Optional[Dict[str, str]] = None,
+                               after: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        filters = filters or {}
+        with self._lock:
+            index = self._fresh_index()
+            summaries = [index.summaries[user_id] for user_id in index.lookup(filters, after)]
+        yield from summaries
+
+    def count_profiles(self, filters: Optional[Dict[str, str]] = None) -> int:
+        with self._lock:
+            return len(self._fresh_index().lookup(filters or {}))
+
+    def _stored_palettes(self, user_id: str) -> List[Dict[str, Any]]:
+        """Paletas guardadas de un usuario (documento + diario), aún sin aplicar la retención"""
+        with self._lock:
+            palettes = list(self._read_document()["palettes"].get(user_id, []))
+            palettes.extend(palette for owner, palette in self.journal.entries() if owner == user_id)
+            return palettes
+
+    def get_palettes(self, user_id: str) -> List[Dict[str, Any]]:
+        # La retención se aplica también al leer, para que sea efectiva antes de compactar
+        palettes = self.retention.apply(self._stored_palettes(user_id))
+        return [self.codec.decode_palette(palette) for palette in palettes]
+
+    def get_palettes_page(self, user_id: str, limit: int,
+                          cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        palettes = self._stored_palettes(user_id)
+        positions = list(reversed(self.retention.select(palettes)))
+        if cursor is not None:
+            last = decode_palette_cursor(cursor)
+            positions = [i for i in positions if ((palettes[i].get("generated_at") or ""), i) < last]
+        page = positions[:limit]
+        next_cursor = None
+        if len(positions) > limit:
+            next_cursor = encode_palette_cursor(palettes[page[-1]].get("generated_at"), page[-1])
+        return [self.codec.decode_palette(palettes[i]) for i in page], next_cursor
+
+    def append_palette(self, user_id: str, palette: Dict[str, Any]) -> None:
+        self.append_palettes([(user_id, palette)])
+
+    def append_palettes(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if not items:
+            return
+        with self._lock:
+            self.journal.extend([(user_id, self.codec.encode_palette(palette)) for user_id, palette in items])
+            if self.journal.size() >= self.journal_max_bytes:
+                self.compact()
+
+# ============================================================================
+# MOTOR SQLITE (tablas indexadas, escrituras por fila)
+# ============================================================================
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    name TEXT,
+    created_at TEXT,
+    skin_tone TEXT,
+    undertone TEXT,
+    season TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS palettes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    generated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_palettes_user ON palettes(user_id, generated_at);
+CREATE INDEX IF NOT EXISTS idx_profiles_season ON profiles(season, user_id);
+CREATE INDEX IF NOT EXISTS idx_profiles_undertone ON profiles(undertone, user_id);
+CREATE INDEX IF NOT EXISTS idx_profiles_skin_tone ON profiles(skin_tone, user_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('profiles_version', 0);
+"""
+
+BUMP_PROFILES_VERSION = "UPDATE meta SET value = value + 1 WHERE key = 'profiles_version'"
+
+def _profile_columns(user_id: str, profile: Dict[str, Any], codec: RecordCodec) -> Tuple[Any, ...]:
+    """Extraer las columnas resumidas de un perfil y su forma guardada para la tabla profiles"""
+    summary = profile_summary_fields(user_id, profile)
+    return tuple(summary[column] for column in SUMMARY_COLUMNS) + (dumps_str(codec.encode_profile(profile)),)
+
+def _palette_columns(user_id: str, palette: Dict[str, Any], codec: RecordCodec) -> Tuple[Any, ...]:
+    return user_id, palette.get("generated_at"), dumps_str(codec.encode_palette(palette))
+
+class SQLiteStorage(BaseStorage):
+    """Almacenamiento en SQLite: cada perfil y cada paleta ocupa su propia fila"""
+
+    counts_versions = True
+
+    def __init__(self, path: str, codec: Optional[RecordCodec] = None,
+                 retention: Optional[PaletteRetention] = None):
+        self.path = path
+        self.codec = codec or RecordCodec()
+        self.retention = retention or PaletteRetention()
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        """Conexión propia de cada hilo (y de cada proceso tras un fork)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def init(self) -> None:
+        conn = self._conn()
+        conn.executescript(SQLITE_SCHEMA)
+        conn.commit()
+
+    def get_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT data FROM profiles WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return self.codec.decode_profile(loads(row[0])) if row else None
+
+    def has_profile(self, user_id: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM profiles WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return row is not None
+
+    def put_profile(self, user_id: str, profile: Dict[str, Any]) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO profiles "
+                "(user_id, name, created_at, skin_tone, undertone, season, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                _profile_columns(user_id, profile, self.codec)
+            )
+            conn.execute(BUMP_PROFILES_VERSION)
+
+    def put_profiles(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if not items:
+            return
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO profiles "
+                "(user_id, name, created_at, skin_tone, undertone, season, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (_profile_columns(user_id, profile, self.codec) for user_id, profile in items)
+            )
+            conn.execute(BUMP_PROFILES_VERSION)
+
+    def create_profile(self, user_id: str, profile: Dict[str, Any]) -> bool:
+        conn = self._conn()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO profiles "
+                    "(user_id, name, created_at, skin_tone, undertone, season, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    _profile_columns(user_id, profile, self.codec)
+                )
+                conn.execute(BUMP_PROFILES_VERSION)
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def create_profiles(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[bool]:
+        conn = self._conn()
+        created = []
+        with conn:
+            for user_id, profile in items:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO profiles "
+                    "(user_id, name, created_at, skin_tone, undertone, season, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    _profile_columns(user_id, profile, self.codec)
+                )
+                created.append(cursor.rowcount > 0)
+            if any(created):
+                conn.execute(BUMP_PROFILES_VERSION)
+        return created
+
+    def update_profiles(self, items: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> List[bool]:
+        conn = self._conn()
+        updated = []
+        with conn:
+            # BEGIN IMMEDIATE toma el bloqueo de escritura antes de comprobar
+            conn.execute("BEGIN IMMEDIATE")
+            for user_id, expected, profile in items:
+                row = conn.execute("SELECT data FROM profiles WHERE user_id = ?", (user_id,)).fetchone()
+                updated.append(row is not None and self.codec.decode_profile(loads(row[0])) == expected)
+                if updated[-1]:
+                    conn.execute(
+                        "UPDATE profiles SET name = ?, created_at = ?, skin_tone = ?, undertone = ?, "
+                        "season = ?, data = ? WHERE user_id = ?",
+                        _profile_columns(user_id, profile, self.codec)[1:] + (user_id,)
+                    )
+            if any(updated):
+                conn.execute(BUMP_PROFILES_VERSION)
+        return updated
+
+    def delete_profile(self, user_id: str) -> bool:
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute("DELETE FROM profiles WHERE user_id = ?", (user_id,))
+            if cursor.rowcount:
+                conn.execute(BUMP_PROFILES_VERSION)
+        return cursor.rowcount > 0
+
+    def iter_profiles(self, after: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        # Paginación por clave: no se mantiene un cursor abierto entre páginas, así el
+        # generador puede avanzarse desde otro hilo (p. ej. una respuesta en streaming)
+        last = after
+        while True:
+            if last is None:
+                rows = self._conn().execute(
+                    "SELECT user_id, data FROM profiles ORDER BY user_id LIMIT ?", (ITER_PAGE_SIZE,)
+                ).fetchall()
+            else:
+                rows = self._conn().execute(
+                    "SELECT user_id, data FROM profiles WHERE user_id > ? ORDER BY user_id LIMIT ?",
+                    (last, ITER_PAGE_SIZE)
+                ).fetchall()
+            for user_id, data in rows:
+                yield user_id, self.codec.decode_profile(loads(data))
+            if len(rows) < ITER_PAGE_SIZE:
+                return
+            last = rows[-1][0]
+
+    def iter_profile_summaries(self, filters: Optional[Dict[str, str]] = None,
+                               after: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        filters = filters or {}
+        conditions = [f"{key} = ?" for key in SUMMARY_FILTERS if key in filters]
+        params: List[Any] = [filters[key] for key in SUMMARY_FILTERS if key in filters]
+        select = f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM profiles"
+
+        last = after
+        while True:
+            page_conditions = conditions + (["user_id > ?"] if last is not None else [])
+            page_params = params + ([last] if last is not None else [])
+            query = select
+            if page_conditions:
+                query += " WHERE " + " AND ".join(page_conditions)
+            query += " ORDER BY user_id LIMIT ?"
+            rows = self._conn().execute(query, page_params + [ITER_PAGE_SIZE]).fetchall()
+            for row in rows:
+                yield dict(zip(SUMMARY_COLUMNS, row))
+            if len(rows) < ITER_PAGE_SIZE:
+                return
+            last = rows[-1][0]
+
+    def count_profiles(self, filters: Optional[Dict[str, str]] = None) -> int:
+        filters = filters or {}
+        conditions = [f"{key} = ?" for key in SUMMARY_FILTERS if key in filters]
+        query = "SELECT COUNT(*) FROM profiles"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        params = [filters[key] for key in SUMMARY_FILTERS if key in filters]
+        return self._conn().execute(query, params).fetchone()[0]
+
+    def _retained_palettes_query(self, user_id: str) -> Tuple[str, List[Any]]:
+        """Subconsulta con las paletas retenidas de un usuario (usa idx_palettes_user)"""
+        conditions = ["user_id = ?"]
+        params: List[Any] = [user_id]
+        cutoff = self.retention.cutoff()
+        if cutoff is not None:
+            conditions.append("generated_at >= ?")
+            params.append(cutoff)
+        # LIMIT -1 equivale a sin límite en SQLite
+        params.append(self.retention.max_per_user or -1)
+        query = (f"SELECT id, generated_at, data FROM palettes WHERE {' AND '.join(conditions)} "
+                 "ORDER BY generated_at DESC, id DESC LIMIT ?")
+        return query, params
+
+    def get_palettes(self, user_id: str) -> List[Dict[str, Any]]:
+        retained, params = self._retained_palettes_query(user_id)
+        cursor = self._conn().execute(f"SELECT data FROM ({retained}) ORDER BY generated_at, id", params)
+        return [self.codec.decode_palette(loads(data)) for (data,) in cursor]
+
+    def iter_palettes(self, user_id: str) -> Iterator[Dict[str, Any]]:
+        # Paginación por clave (generated_at, id), igual que iter_profiles
+        retained, params = self._retained_palettes_query(user_id)
+        last: Optional[Tuple[str, int]] = None
+        while True:
+            query = f"SELECT id, generated_at, data FROM ({retained})"
+            page_params = list(params)
+            if last is not None:
+                query += " WHERE generated_at > ? OR (generated_at = ? AND id > ?)"
+                page_params += [last[0], last[0], last[1]]
+            query += " ORDER BY generated_at, id LIMIT ?"
+            rows = self._conn().execute(query, page_params + [ITER_PAGE_SIZE]).fetchall()
+            for _, _, data in rows:
+                yield self.codec.decode_palette(loads(data))
+            if len(rows) < ITER_PAGE_SIZE:
+                return
+            last = (rows[-1][1], rows[-1][0])
+
+    def get_palettes_page(self, user_id: str, limit: int,
+                          cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        retained, params = self._retained_palettes_query(user_id)
+        query = f"SELECT id, generated_at, data FROM ({retained})"
+        if cursor is not None:
+            generated_at, last_id = decode_palette_cursor(cursor)
+            query += " WHERE generated_at < ? OR (generated_at = ? AND id < ?)"
+            params += [generated_at, generated_at, last_id]
+        query += " ORDER BY generated_at DESC, id DESC LIMIT ?"
+        rows = self._conn().execute(query, params + [limit + 1]).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_palette_cursor(rows[-1][1], rows[-1][0])
+        return [self.codec.decode_palette(loads(data)) for _, _, data in rows], next_cursor
+
+    def append_palette(self, user_id: str, palette: Dict[str, Any]) -> None:
+        self.append_palettes([(user_id, palette)])
+
+    def append_palettes(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO palettes (user_id, generated_at, data) VALUES (?, ?, ?)",
+                (_palette_columns(user_id, palette, self.codec) for user_id, palette in items)
+            )
+            # Retención incremental: solo se revisan los usuarios que recibieron paletas
+            for user_id in {user_id for user_id, _ in items}:
+                self._prune_palettes(conn, user_id)
+
+    def _prune_palettes(self, conn: sqlite3.Connection, user_id: str) -> int:
+        """Eliminar las paletas de un usuario que exceden la retención"""
+        removed = 0
+        if self.retention.max_per_user > 0:
+            removed += conn.execute(
+                "DELETE FROM palettes WHERE user_id = ? AND id NOT IN ("
+                "SELECT id FROM palettes WHERE user_id = ? ORDER BY generated_at DESC, id DESC LIMIT ?)",
+                (user_id, user_id, self.retention.max_per_user)
+            ).rowcount
+        cutoff = self.retention.cutoff()
+        if cutoff is not None:
+            removed += conn.execute(
+                "DELETE FROM palettes WHERE user_id = ? AND generated_at < ?", (user_id, cutoff)
+            ).rowcount
+        return removed
+
+    def compact(self) -> int:
+        conn = self._conn()
+        removed = 0
+        with conn:
+            if self.retention.max_per_user > 0:
+                over_limit = conn.execute(
+                    "SELECT user_id FROM palettes GROUP BY user_id HAVING COUNT(*) > ?",
+                    (self.retention.max_per_user,)
+                ).fetchall()
+                for (user_id,) in over_limit:
+                    removed += self._prune_palettes(conn, user_id)
+            cutoff = self.retention.cutoff()
+            if cutoff is not None:
+                removed += conn.execute("DELETE FROM palettes WHERE generated_at < ?", (cutoff,)).rowcount
+        return removed
+
+    def load_all(self) -> Dict[str, Any]:
+        data = {"profiles": dict(self.iter_profiles()), "palettes": {}}
+        cursor = self._conn().execute("SELECT user_id, data FROM palettes ORDER BY id")
+        for user_id, palette in cursor:
+            data["palettes"].setdefault(user_id, []).append(self.codec.decode_palette(loads(palette)))
+        return data
+
+    def save_all(self, data: Dict[str, Any]) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM profiles")
+            conn.execute("DELETE FROM palettes")
+            self._insert_document(conn, data)
+
+    def import_document(self, data: Dict[str, Any], only_if_empty: bool = False) -> bool:
+        """Importar un documento JSON completo sin borrar lo existente; con only_if_empty, solo en una base vacía"""
+        conn = self._conn()
+        with conn:
+            if only_if_empty:
+                # BEGIN IMMEDIATE toma el bloqueo de escritura antes de comprobar
+                conn.execute("BEGIN IMMEDIATE")
+                if not self.is_empty():
+                    return False
+            self._insert_document(conn, data)
+        return True
+
+    def import_if_empty(self, source: BaseStorage) -> bool:
+        """Importar otro almacenamiento solo si la base está vacía (seguro con varios workers)"""
+        conn = self._conn()
+        with conn:
+            # BEGIN IMMEDIATE toma el bloqueo de escritura antes de comprobar
+            conn.execute("BEGIN IMMEDIATE")
+            if not self.is_empty():
+                return False
+            self._insert_document(conn, source.load_all())
+        return True
+
+    def _insert_document(self, conn: sqlite3.Connection, data: Dict[str, Any]) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO profiles "
+            "(user_id, name, created_at, skin_tone, undertone, season, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (_profile_columns(user_id, profile, self.codec)
+             for user_id, profile in data.get("profiles", {}).items())
+        )
+        conn.executemany(
+            "INSERT INTO palettes (user_id, generated_at, data) VALUES (?, ?, ?)",
+            (_palette_columns(user_id, palette, self.codec)
+             for user_id, palettes in data.get("palettes", {}).items()
+             for palette in palettes)
+        )
+        conn.execute(BUMP_PROFILES_VERSION)
+
+    def profiles_version(self) -> Any:
+        row = self._conn().execute(
+            "SELECT value FROM meta WHERE key = 'profiles_version'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def is_empty(self) -> bool:
+        conn = self._conn()
+        has_profiles = conn.execute("SELECT 1 FROM profiles LIMIT 1").fetchone()
+        has_palettes = conn.execute("SELECT 1 FROM palettes LIMIT 1").fetchone()
+        return not has_profiles and not has_palettes
+
+# ============================================================================
+# SELECCIÓN DE MOTOR Y MIGRACIÓN
+# ============================================================================
+
+STORAGE_BACKENDS = {
+    "json": JSONFileStorage,
+    "sqlite": SQLiteStorage
+}
+
+def create_storage(backend: str, json_path: str, db_path: str, codec: Optional[RecordCodec] = None,
+                   retention: Optional[PaletteRetention] = None) -> BaseStorage:
+    """Crear el motor de almacenamiento indicado ("json" o "sqlite")"""
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Motor de almacenamiento no válido: {backend}")
+    if backend == "json":
+        return JSONFileStorage(json_path, codec=codec, retention=retention)
+    return SQLiteStorage(db_path, codec=codec, retention=retention)
+
+def migrate_json_to_sqlite(json_path: str, db_path: str) -> Dict[str, int]:
+    """Importar un archivo beauty_profiles.json existente a una base SQLite vacía
+
+    Lanza FileExistsError si la base ya tiene datos: repetir la migración duplicaría las paletas.
+    """
+    source = JSONFileStorage(json_path)
+    if not os.path.exists(json_path):
+        raise FileNotFoundError(f"No existe el archivo {json_path}")
+
+    data = source.load_all()
+    target = SQLiteStorage(db_path)
+    target.init()
+    if not target.import_document(data, only_if_empty=True):
+        raise FileExistsError(f"La base {db_path} ya tiene datos; no se vuelve a migrar")
+
+    return {
+        "profiles": len(data["profiles"]),
+        "palettes": sum(len(palettes) for palettes in data["palettes"].values())
+    }
+
+def main():
+    """Herramienta de línea de comandos para migrar el JSON a SQLite o compactar un almacenamiento"""
+    parser = argparse.ArgumentParser(description="Migrar beauty_profiles.json a SQLite")
+    parser.add_argument("--json", default="beauty_profiles.json", help="Archivo JSON de origen")
+    parser.add_argument("--db", default="beauty_profiles.db", help="Base SQLite de destino")
+    parser.add_argument("--compact", choices=list(STORAGE_BACKENDS),
+                        help="En lugar de migrar, aplicar la retención de paletas al motor indicado")
+    args = parser.parse_args()
+
+    if args.compact:
+        storage = create_storage(args.compact, json_path=args.json, db_path=args.db)
+        storage.init()
+        removed = storage.compact()
+        retention = storage.retention.info()
+        print(f"✅ Compactado ({args.compact}): {removed} paletas eliminadas "
+              f"(máx. por usuario: {retention['max_per_user']}, máx. días: {retention['max_age_days']})")
+        return
+
+    try:
+        result = migrate_json_to_sqlite(args.json, args.db)
+    except (FileNotFoundError, FileExistsError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"✅ Migrados {result['profiles']} perfiles y {result['palettes']} paletas a {args.db}")
+
+if __name__ == "__main__":
+    raise SystemExit(main())
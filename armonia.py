@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Motor de puntuación de armonía de color
+Evalúa relaciones de matiz, contraste de luminosidad/croma y coherencia de temperatura en espacio LCh
+"""
+
+from typing import Dict, Any, List
+
+import numpy as np
+
+from colorimetria import hex_array_to_lch
+
+# Ángulos de matiz armónicos (grados) y nombre de la relación
+HARMONY_TEMPLATES = [
+    (0.0, "Monocromática"),
+    (30.0, "Análoga"),
+    (120.0, "Triádica"),
+    (150.0, "Complementaria dividida"),
+    (180.0, "Complementaria")
+]
+TEMPLATE_ANGLES = np.array([angle for angle, _ in HARMONY_TEMPLATES])
+TEMPLATE_TOLERANCE = 12.0   # Desviación (grados) aceptada alrededor de cada ángulo armónico
+
+# Por debajo de este croma un color se considera neutro y armoniza con cualquier matiz
+ACHROMATIC_CHROMA = 8.0
+
+# Rango de luminosidad ideal entre el color más claro y el más oscuro de la paleta
+IDEAL_LIGHTNESS_RANGE = 40.0
+
+# Peso de cada componente en la puntuación final
+SCORE_WEIGHTS = {
+    "hue_relationships": 0.45,
+    "lightness_contrast": 0.20,
+    "chroma_coherence": 0.15,
+    "temperature_coherence": 0.20
+}
+
+def score_harmony(colors: List[str]) -> Dict[str, Any]:
+    """
+    Puntuar la armonía de una paleta de forma determinista (0-100)
+
+    Componentes:
+    - hue_relationships: cercanía de cada par de matices a un ángulo armónico
+    - lightness_contrast: rango de luminosidad respecto al ideal
+    - chroma_coherence: dispersión del croma entre colores cromáticos
+    - temperature_coherence: acuerdo cálido/frío ponderado por croma
+
+    Todas las comparaciones por pares se calculan como matrices NumPy (N x N).
+    """
+    lch = hex_array_to_lch(colors)
+    L, C, h = lch[:, 0], lch[:, 1], lch[:, 2]
+    chromatic = C > ACHROMATIC_CHROMA
+
+    # Relaciones de matiz entre pares de colores cromáticos
+    pair_mask = np.triu(np.outer(chromatic, chromatic), k=1)
+    if pair_mask.any():
+        hue_diff = np.abs(h[:, None] - h[None, :])
+        hue_diff = np.minimum(hue_diff, 360.0 - hue_diff)[pair_mask]
+        fit = np.exp(-((hue_diff[:, None] - TEMPLATE_ANGLES[None, :]) ** 2) / (2 * TEMPLATE_TOLERANCE ** 2))
+        pair_weight = np.sqrt(np.outer(C, C))[pair_mask]
+        best_fit = fit.max(axis=1)
+        hue_score = float(np.average(best_fit, weights=pair_weight))
+        template_votes = np.bincount(fit.argmax(axis=1), weights=pair_weight, minlength=len(HARMONY_TEMPLATES))
+        harmony_type = HARMONY_TEMPLATES[int(template_votes.argmax())][1] if hue_score >= 0.5 else "Mixta"
+    else:
+        hue_score = 1.0
+        harmony_type = "Neutra"
+
+    # Contraste de luminosidad
+    lightness_range = float(L.max() - L.min())
+    lightness_score = float(np.clip(1.0 - abs(lightness_range - IDEAL_LIGHTNESS_RANGE) / 60.0, 0.0, 1.0))
+
+    # Coherencia de croma
+    chroma_std = float(C[chromatic].std()) if chromatic.sum() > 1 else 0.0
+    chroma_score = float(np.clip(1.0 - chroma_std / 40.0, 0.0, 1.0))
+
+    # Coherencia de temperatura: rojos, naranjas y amarillos (h < 110° o h >= 330°) son cálidos
+    warm = (h < 110.0) | (h >= 330.0)
+    if chromatic.any():
+        sign = np.where(warm, 1.0, -1.0)[chromatic]
+        weights = C[chromatic]
+        balance = float(np.dot(sign, weights) / weights.sum())
+        temperature_score = abs(balance)
+        temperature = "calida" if balance > 0.5 else "fria" if balance < -0.5 else "mixta"
+    else:
+        temperature_score = 1.0
+        temperature = "neutra"
+
+    components = {
+        "hue_relationships": hue_score,
+        "lightness_contrast": lightness_score,
+        "chroma_coherence": chroma_score,
+        "temperature_coherence": temperature_score
+    }
+    score = sum(SCORE_WEIGHTS[name] * value for name, value in components.items())
+
+    return {
+        "harmony_score": int(round(score * 100)),
+        "harmony_type": harmony_type,
+        "components": {name: round(value, 3) for name, value in components.items()},
+        "temperature": temperature,
+        "lightness_range": round(lightness_range, 1)
+    }
@@ -0,0 +1,10 @@
+"""
+Benchmarks reproducibles del servidor de paletas
+
+- micro: funciones de colorimetría y generación de paletas
+- macro: todas las rutas de main.py en proceso, sobre almacenes sintéticos
+- carga: tráfico HTTP con mezclas ponderadas o trazas contra una instancia en marcha
+- comparar: diferencias de rendimiento entre dos resultados JSON
+
+Se ejecutan desde la raíz del repositorio, p. ej. python -m benchmarks.micro
+"""
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Generador de carga HTTP contra una instancia del servidor
+
+Sintetiza una mezcla ponderada de peticiones (create, show, generate, quick, harmony,
+quote) o reproduce una traza NDJSON grabada, a un ritmo objetivo (--rps) y con un
+máximo de peticiones en vuelo (--concurrency). Informa del throughput por segundo, de
+un histograma de latencias y de las tasas de error, en el mismo formato JSON que el
+resto de la suite (comparable con benchmarks.comparar).
+
+    python -m benchmarks.carga --url http://127.0.0.1:8000 --rps 200 --duration 60
+    python -m benchmarks.carga --mix show=8,quick=2 --concurrency 64 --duration 30
+    python -m benchmarks.carga --rps 100 --duration 60 --record traza.ndjson
+    python -m benchmarks.carga --trace traza.ndjson --speed 2
+
+Con --rps la carga es de lazo abierto: las peticiones se programan a ritmo fijo y la
+latencia se mide desde el instante programado, así que incluye la espera por un hueco
+cuando se alcanza --concurrency. Sin --rps, --concurrency clientes envían peticiones
+una tras otra tan rápido como responde el servidor.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from benchmarks.comun import build_results, percentile, print_table, summarize, synthetic_questionnaire, write_results
+
+LOAD_KINDS = ("create", "show", "generate", "quick", "harmony", "quote")
+DEFAULT_MIX = "create=1,show=4,generate=3,quick=6,harmony=2,quote=1"
+
+# Límites superiores (ms) de los cubos del histograma de latencias
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+PALETTE_TYPES = ["maquillaje", "ropa", "accesorios"]
+EVENT_TYPES = ["casual", "trabajo", "formal", "fiesta", "noche", "playa"]
+
+LoadRequest = Dict[str, Any]
+
+def log(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Interpretar 'show=4,quick=6,...' como pesos por tipo de petición"""
+    mix: Dict[str, float] = {}
+    for part in filter(None, (item.strip() for item in text.split(","))):
+        kind, _, weight = part.partition("=")
+        if kind not in LOAD_KINDS:
+            raise ValueError(f"Tipo de petición no válido: {kind} (opciones: {', '.join(LOAD_KINDS)})")
+        try:
+            mix[kind] = float(weight)
+        except ValueError:
+            raise ValueError(f"Peso no válido para {kind}: {weight!r}")
+        if mix[kind] < 0:
+            raise ValueError(f"El peso de {kind} no puede ser negativo")
+    if sum(mix.values()) <= 0:
+        raise ValueError("La mezcla necesita al menos un peso positivo")
+    return mix
+
+# ============================================================================
+# PETICIONES SINTÉTICAS Y TRAZAS
+# ============================================================================
+
+class RequestFactory:
+    """Peticiones sintéticas reproducibles a partir de la semilla
+
+    show y generate usan solo los perfiles de la fase de preparación, que existen seguro;
+    los perfiles de create tienen identificadores nuevos en cada petición.
+    """
+
+    def __init__(self, seed: int, setup_profiles: int):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.pool = [f"load_{seed}_{index}" for index in range(setup_profiles)]
+        self.created = 0
+
+    def setup_requests(self) -> List[LoadRequest]:
+        return [self._create(user_id) for user_id in self.pool]
+
+    def _create(self, user_id: str) -> LoadRequest:
+        return {"kind": "create", "method": "POST", "path": "/mcp/create-profile",
+                "json": synthetic_questionnaire(self.rng, user_id)}
+
+    def _existing_user(self) -> str:
+        if not self.pool:
+            raise ValueError("show y generate necesitan perfiles de preparación (--setup-profiles)")
+        return self.rng.choice(self.pool)
+
+    def make(self, kind: str) -> LoadRequest:
+        rng = self.rng
+        if kind == "create":
+            self.created += 1
+            return self._create(f"load_{self.seed}_new_{self.created}")
+        if kind == "show":
+            return {"kind": kind, "method": "GET", "path": f"/mcp/profile/{self._existing_user()}"}
+        if kind == "generate":
+            return {"kind": kind, "method": "POST", "path": "/mcp/generate-palette",
+                    "json": {"user_id": self._existing_user(), "palette_type": rng.choice(PALETTE_TYPES),
+                             "event_type": rng.choice(EVENT_TYPES)}}
+        if kind == "quick":
+            return {"kind": kind, "method": "POST", "path": "/mcp/quick-palette",
+                    "json": {"palette_type": rng.choice(PALETTE_TYPES), "event_type": rng.choice(EVENT_TYPES),
+                             "skin_tone": rng.choice(["clara", "media", "oscura"]),
+                             "undertone": rng.choice(["frio", "calido", "neutro"])}}
+        if kind == "harmony":
+            colors = [f"#{rng.randrange(0x1000000):06X}" for _ in range(rng.randint(2, 6))]
+            return {"kind": kind, "method": "POST", "path": "/api/analyze-harmony", "json": {"colors": colors}}
+        if kind == "quote":
+            return {"kind": kind, "method": "GET", "path": "/api/quote"}
+        raise ValueError(f"Tipo de petición no válido: {kind}")
+
+def synthetic_schedule(factory: RequestFactory, mix: Dict[str, float], rps: Optional[float],
+                       duration: Optional[float], total: Optional[int]) -> Iterator[Tuple[Optional[float], LoadRequest]]:
+    """Pares (segundo programado o None, petición) hasta agotar duration o total"""
+    kinds = [kind for kind in mix if mix[kind] > 0]
+    weights = [mix[kind] for kind in kinds]
+    index = 0
+    while total is None or index < total:
+        offset = index / rps if rps else None
+        if duration is not None and offset is not None and offset >= duration:
+            return
+        yield offset, factory.make(factory.rng.choices(kinds, weights)[0])
+        index += 1
+
+def read_trace(path: str) -> Tuple[List[LoadRequest], List[Tuple[Optional[float], LoadRequest]]]:
+    """Leer una traza NDJSON: líneas de preparación (phase=setup) y peticiones con su offset"""
+    setup: List[LoadRequest] = []
+    schedule: List[Tuple[Optional[float], LoadRequest]] = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                request = {"kind": entry.get("kind") or entry["path"], "method": entry.get("method", "GET"),
+                           "path": entry["path"]}
+            except (ValueError, KeyError, AttributeError):
+                raise ValueError(f"{path}:{line_number}: línea de traza no válida")
+            for key in ("json", "params"):
+                if key in entry:
+                    request[key] = entry[key]
+            if entry.get("phase") == "setup":
+                setup.append(request)
+            else:
+                schedule.append((entry.get("offset"), request))
+    return setup, schedule
+
+def write_trace_line(out: TextIO, request: LoadRequest, phase: str, offset: Optional[float] = None) -> None:
+    entry = {"phase": phase, **({"offset": round(offset, 6)} if offset is not None else {}), **request}
+    out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+# ============================================================================
+# EJECUCIÓN Y MEDICIÓN
+# ============================================================================
+
+class LoadStats:
+    """Latencias, errores y completadas por segundo, por tipo de petición"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.completed_per_second: Counter = Counter()
+
+    def record(self, kind: str, latency: float, error: Optional[str], second: int) -> None:
+        self.latencies[kind].append(latency)
+        if error:
+            self.errors[kind][error] += 1
+        self.completed_per_second[second] += 1
+
+    def _stats(self, latencies: List[float], errors: Counter, elapsed: float) -> Dict[str, Any]:
+        stats = summarize(latencies, sum(errors.values()), elapsed)
+        ordered = sorted(latencies)
+        stats["p90_us"] = round(percentile(ordered, 0.90) * 1e6, 2)
+        stats["error_rate"] = round(stats["errors"] / len(latencies), 4) if latencies else 0.0
+        stats["errors_by_type"] = dict(errors)
+        stats["histogram_ms"] = latency_histogram(ordered)
+        return stats
+
+    def report(self, elapsed: float) -> Dict[str, Dict[str, Any]]:
+        benchmarks = {kind: self._stats(self.latencies[kind], self.errors[kind], elapsed)
+                      for kind in sorted(self.latencies)}
+        all_errors: Counter = Counter()
+        for errors in self.errors.values():
+            all_errors.update(errors)
+        benchmarks["total"] = self._stats([latency for values in self.latencies.values() for latency in values],
+                                          all_errors, elapsed)
+        return benchmarks
+
+    def throughput_series(self) -> List[int]:
+        if not self.completed_per_second:
+            return []
+        return [self.completed_per_second[second] for second in range(max(self.completed_per_second) + 1)]
+
+def latency_histogram(sorted_latencies: List[float]) -> Dict[str, int]:
+    """Recuento por cubo de LATENCY_BUCKETS_MS ('<=5' = hasta 5 ms) más el desbordamiento"""
+    histogram = {f"<={bound}": 0 for bound in LATENCY_BUCKETS_MS}
+    histogram[f">{LATENCY_BUCKETS_MS[-1]}"] = 0
+    for latency in sorted_latencies:
+        ms = latency * 1000
+        for bound in LATENCY_BUCKETS_MS:
+            if ms <= bound:
+                histogram[f"<={bound}"] += 1
+                break
+        else:
+            histogram[f">{LATENCY_BUCKETS_MS[-1]}"] += 1
+    return histogram
+
+async def send(client, request: LoadRequest) -> Optional[str]:
+    """Enviar una petición; devuelve el tipo de error (código HTTP o excepción) o None"""
+    try:
+        response = await client.request(request["method"], request["path"],
+                                        json=request.get("json"), params=request.get("params"))
+        await response.aread()
+    except Exception as e:
+        return type(e).__name__
+    return None if response.status_code < 400 else str(response.status_code)
+
+async def run_unmeasured(client, requests: List[LoadRequest], concurrency: int,
+                         allowed_errors: Tuple[str, ...] = ()) -> int:
+    """Enviar peticiones de preparación o limpieza; devuelve los errores no tolerados"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(request: LoadRequest) -> bool:
+        async with semaphore:
+            error = await send(client, request)
+        return error is not None and error not in allowed_errors
+
+    return sum(await asyncio.gather(*(one(request) for request in requests)))
+
+async def run_schedule(client, schedule, concurrency: int, speed: float, stats: LoadStats,
+                       record: Optional[TextIO] = None) -> float:
+    """Ejecutar la carga medida; devuelve la duración en segundos"""
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = set()
+    started = loop.time()
+
+    async def one(request: LoadRequest, scheduled: float):
+        try:
+            error = await send(client, request)
+            finished = loop.time()
+            stats.record(request["kind"], finished - scheduled, error, int(finished - started))
+        finally:
+            semaphore.release()
+
+    for offset, request in schedule:
+        if record is not None:
+            write_trace_line(record, request, "run", offset)
+        if offset is not None:
+            scheduled = started + offset / speed
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await semaphore.acquire()
+        else:
+            await semaphore.acquire()
+            scheduled = loop.time()
+        task = asyncio.create_task(one(request, scheduled))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.wait(pending)
+    return loop.time() - started
+
+async def run_closed_loop(client, factory: RequestFactory, mix: Dict[str, float], concurrency: int,
+                          duration: Optional[float], total: Optional[int], stats: LoadStats,
+                          record: Optional[TextIO] = None) -> float:
+    """Sin ritmo objetivo: concurrency clientes envían peticiones una tras otra"""
+    schedule = synthetic_schedule(factory, mix, None, None, total)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + duration if duration is not None else None
+
+    async def client_loop():
+        while deadline is None or loop.time() < deadline:
+            entry = next(schedule, None)
+            if entry is None:
+                return
+            request = entry[1]
+            if record is not None:
+                write_trace_line(record, request, "run")
+            sent = loop.time()
+            error = await send(client, request)
+            finished = loop.time()
+            stats.record(request["kind"], finished - sent, error, int(finished - started))
+
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return loop.time() - started
+
+def print_histogram(stats: Dict[str, Any], series: List[int], stream=sys.stderr) -> None:
+    histogram = stats["histogram_ms"]
+    peak = max(histogram.values()) or 1
+    print("\nLatencias (ms)", file=stream)
+    for bucket, count in histogram.items():
+        print(f"{bucket:>8} {count:>9} {'█' * round(40 * count / peak)}", file=stream)
+    if series:
+        print(f"\nCompletadas por segundo: mín {min(series)}, máx {max(series)}, "
+              f"media {sum(series) / len(series):.1f}", file=stream)
+
+async def run(args: argparse.Namespace) -> int:
+    import httpx
+
+    if args.trace:
+        setup, trace_schedule = read_trace(args.trace)
+        factory = None
+        if args.rps:
+            # Ritmo fijo en lugar de los instantes grabados
+            trace_schedule = [(index / args.rps, request) for index, (_, request) in enumerate(trace_schedule)]
+        if args.requests:
+            trace_schedule = trace_schedule[:args.requests]
+    else:
+        factory = RequestFactory(args.seed, args.setup_profiles)
+        setup = factory.setup_requests()
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        if await send(client, {"method": "GET", "path": "/health"}) is not None:
+            log(f"❌ El servidor no responde en {args.url}/health")
+            return 1
+
+        record = open(args.record, "w", encoding="utf-8") if args.record else None
+        try:
+            if record is not None:
+                for request in setup:
+                    write_trace_line(record, request, "setup")
+            log(f"🏗️  Preparación: {len(setup)} perfiles")
+            # Un perfil que ya existe (400) vale: la preparación es idempotente
+            failed = await run_unmeasured(client, setup, args.concurrency, allowed_errors=("400",))
+            if failed:
+                log(f"❌ {failed} peticiones de preparación fallaron")
+                return 1
+
+            stats = LoadStats()
+            log(f"🚀 Carga contra {args.url} (concurrencia {args.concurrency}"
+                f"{f', {args.rps} rps' if args.rps else ''})")
+            if args.trace:
+                elapsed = await run_schedule(client, trace_schedule, args.concurrency, args.speed, stats, record)
+            elif args.rps:
+                schedule = synthetic_schedule(factory, args.mix, args.rps, args.duration, args.requests)
+                elapsed = await run_schedule(client, schedule, args.concurrency, 1.0, stats, record)
+            else:
+                elapsed = await run_closed_loop(client, factory, args.mix, args.concurrency,
+                                                args.duration, args.requests, stats, record)
+        finally:
+            if record is not None:
+                record.close()
+
+        if not args.keep_profiles:
+            created = {request["json"]["user_id"] for request in setup if request["path"] == "/mcp/create-profile"}
+            if factory is not None:
+                created.update(f"load_{args.seed}_new_{index}" for index in range(1, factory.created + 1))
+            elif args.trace:
+                created.update(request["json"]["user_id"] for _, request in trace_schedule
+                               if request["path"] == "/mcp/create-profile" and "json" in request)
+            log(f"🧹 Limpieza: {len(created)} perfiles")
+            await run_unmeasured(client, [{"method": "DELETE", "path": f"/mcp/profile/{user_id}"}
+                                          for user_id in sorted(created)], args.concurrency, allowed_errors=("404",))
+
+    benchmarks = stats.report(elapsed)
+    series = stats.throughput_series()
+    print_table(benchmarks)
+    print_histogram(benchmarks["total"], series)
+
+    settings = {
+        "url": args.url, "mix": None if args.trace else args.mix, "trace": args.trace, "rps": args.rps,
+        "concurrency": args.concurrency, "duration": args.duration, "requests": args.requests,
+        "speed": args.speed, "seed": args.seed, "setup_profiles": len(setup), "elapsed_seconds": round(elapsed, 3)
+    }
+    results = build_results("load", settings, benchmarks)
+    results["throughput_per_second"] = series
+    write_results(results, args.output)
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga con mezclas ponderadas o trazas grabadas")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="URL base de la instancia")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Pesos por tipo (por defecto {DEFAULT_MIX})")
+    parser.add_argument("--trace", help="Reproducir una traza NDJSON en lugar de sintetizar la mezcla")
+    parser.add_argument("--record", help="Grabar las peticiones enviadas como traza NDJSON")
+    parser.add_argument("--rps", type=float, help="Peticiones por segundo objetivo (lazo abierto)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Máximo de peticiones en vuelo")
+    parser.add_argument("--duration", type=float, help="Segundos de carga (por defecto 30 si no se indica --requests)")
+    parser.add_argument("--requests", type=int, help="Número total de peticiones")
+    parser.add_argument("--speed", type=float, default=1.0, help="Factor de velocidad al reproducir una traza")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout por petición en segundos")
+    parser.add_argument("--setup-profiles", type=int, default=200, help="Perfiles creados antes de medir")
+    parser.add_argument("--keep-profiles", action="store_true", help="No borrar los perfiles creados al terminar")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de la mezcla sintética")
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    args = parser.parse_args()
+
+    if args.concurrency < 1 or args.speed <= 0 or (args.rps is not None and args.rps <= 0):
+        parser.error("--concurrency, --speed y --rps deben ser positivos")
+    if args.duration is None and args.requests is None and not args.trace:
+        args.duration = 30.0
+    try:
+        args.mix = parse_mix(args.mix)
+        return asyncio.run(run(args))
+    except ValueError as e:
+        log(f"❌ {e}")
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Comparar dos resultados de benchmarks (p. ej. de dos commits)
+
+    python -m benchmarks.comparar base.json nuevo.json --threshold 0.10
+
+Sale con código 1 si algún benchmark empeora más que el umbral en throughput o en p99.
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+from benchmarks.comun import RESULTS_FORMAT_VERSION
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        results = json.load(f)
+    if results.get("format_version") != RESULTS_FORMAT_VERSION:
+        raise ValueError(f"{path}: formato de resultados {results.get('format_version')} no compatible")
+    return results
+
+def _change(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    """Variación relativa de new respecto a old"""
+    if not old or new is None:
+        return None
+    return (new - old) / old
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Una fila por benchmark común; regression indica si empeora más que threshold"""
+    rows = []
+    for name, old_stats in base["benchmarks"].items():
+        new_stats = new["benchmarks"].get(name)
+        if new_stats is None:
+            continue
+        throughput = _change(old_stats.get("ops_per_second"), new_stats.get("ops_per_second"))
+        p50 = _change(old_stats.get("p50_us"), new_stats.get("p50_us"))
+        p99 = _change(old_stats.get("p99_us"), new_stats.get("p99_us"))
+        rows.append({
+            "name": name,
+            "throughput": throughput,
+            "p50": p50,
+            "p99": p99,
+            "new_errors": new_stats.get("errors", 0) - old_stats.get("errors", 0),
+            "regression": ((throughput is not None and throughput < -threshold)
+                           or (p99 is not None and p99 > threshold)
+                           or new_stats.get("errors", 0) > old_stats.get("errors", 0))
+        })
+    return rows
+
+def _percent(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:+.1%}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparar dos resultados JSON de benchmarks")
+    parser.add_argument("base", help="Resultados de referencia")
+    parser.add_argument("nuevo", help="Resultados a comparar")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Empeoramiento relativo tolerado en ops/s y p99 (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    try:
+        base, new = load_results(args.base), load_results(args.nuevo)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+    if base["suite"] != new["suite"]:
+        print(f"❌ No se pueden comparar suites distintas: {base['suite']} y {new['suite']}")
+        return 2
+
+    print(f"🔎 {base['environment'].get('commit')} → {new['environment'].get('commit')} ({base['suite']})")
+    if base["environment"].get("platform") != new["environment"].get("platform"):
+        print("⚠️  Los resultados son de máquinas distintas")
+
+    rows = compare(base, new, args.threshold)
+    print(f"{'benchmark':<48} {'ops/s':>9} {'p50':>9} {'p99':>9}")
+    for row in rows:
+        flag = "  ❌" if row["regression"] else ""
+        print(f"{row['name']:<48} {_percent(row['throughput']):>9} {_percent(row['p50']):>9} "
+              f"{_percent(row['p99']):>9}{flag}")
+
+    missing = sorted(set(base["benchmarks"]) ^ set(new["benchmarks"]))
+    if missing:
+        print(f"⚠️  Benchmarks presentes solo en uno de los resultados: {', '.join(missing)}")
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"❌ {len(regressions)} regresiones por encima del {args.threshold:.0%}")
+        return 1
+    print(f"✅ Sin regresiones por encima del {args.threshold:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
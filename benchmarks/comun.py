@@ -0,0 +1,127 @@
+"""
+Utilidades compartidas de los benchmarks: medición, cuestionarios sintéticos y salida JSON
+"""
+
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Los módulos del servidor están en la raíz del repositorio
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Versión del formato de resultados (comparar.py rechaza versiones distintas)
+RESULTS_FORMAT_VERSION = "1"
+
+# Respuestas válidas del cuestionario según las reglas por defecto de reglas_color
+QUESTIONNAIRE_VALUES: Dict[str, List[str]] = {
+    "skin_tone": ["clara", "media", "oscura"],
+    "vein_color": ["azul", "azul_verdoso", "purpura", "verde", "verde_oliva", "indefinido"],
+    "jewelry_preference": ["plata", "oro", "ambos"],
+    "sun_reaction": ["se_quema", "broncea_despacio", "broncea_facil"],
+    "natural_lip_color": ["rosado", "coral", "durazno"],
+    "eye_color": ["azul", "verde", "cafe", "negro", "gris"],
+    "hair_color": ["negro", "rubio", "castano", "pelirrojo", "gris"],
+    "contrast_level": ["bajo", "medio", "alto"]
+}
+
+def synthetic_questionnaire(rng: random.Random, user_id: str) -> Dict[str, Any]:
+    """Cuestionario de create-profile con respuestas aleatorias (reproducibles con la semilla de rng)"""
+    args = {field: rng.choice(values) for field, values in QUESTIONNAIRE_VALUES.items()}
+    return {"user_id": user_id, "name": f"Usuaria {user_id}", **args}
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil por el método del rango más cercano sobre una lista ordenada"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+def summarize(latencies: List[float], errors: int = 0, elapsed: Optional[float] = None) -> Dict[str, Any]:
+    """Resumen de latencias en segundos: throughput y p50/p99 en microsegundos"""
+    ordered = sorted(latencies)
+    total = elapsed if elapsed is not None else sum(latencies)
+    return {
+        "iterations": len(latencies),
+        "errors": errors,
+        "total_seconds": round(total, 6),
+        "ops_per_second": round(len(latencies) / total, 2) if total > 0 else None,
+        "mean_us": round(sum(ordered) / len(ordered) * 1e6, 2) if ordered else None,
+        "p50_us": round(percentile(ordered, 0.50) * 1e6, 2),
+        "p99_us": round(percentile(ordered, 0.99) * 1e6, 2),
+        "max_us": round(ordered[-1] * 1e6, 2) if ordered else None
+    }
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int = 0) -> Dict[str, Any]:
+    """Ejecutar func iterations veces (tras warmup sin medir) y resumir sus latencias"""
+    for _ in range(warmup):
+        func()
+    latencies = []
+    clock = time.perf_counter
+    for _ in range(iterations):
+        started = clock()
+        func()
+        latencies.append(clock() - started)
+    return summarize(latencies)
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment_info() -> Dict[str, Any]:
+    """Datos del entorno necesarios para comparar resultados entre commits y máquinas"""
+    modules = {}
+    for name in ("numpy", "orjson", "fastapi", "httpx"):
+        try:
+            modules[name] = getattr(__import__(name), "__version__", "?")
+        except ImportError:
+            modules[name] = None
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "modules": modules,
+        "storage_backend": os.environ.get("BEAUTY_STORAGE", "sqlite")
+    }
+
+def build_results(suite: str, settings: Dict[str, Any], benchmarks: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "suite": suite,
+        "started_at": datetime.now().isoformat(),
+        "environment": environment_info(),
+        "settings": settings,
+        "benchmarks": benchmarks
+    }
+
+def write_results(results: Dict[str, Any], path: Optional[str]) -> None:
+    """Escribir los resultados en path, o en la salida estándar si no se indica"""
+    # json estándar a propósito: el formato de salida no depende de si orjson está instalado
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+def print_table(benchmarks: Dict[str, Dict[str, Any]], stream=sys.stderr) -> None:
+    """Tabla legible de los resultados (a stderr para no mezclarla con el JSON)"""
+    print(f"{'benchmark':<48} {'ops/s':>12} {'p50 µs':>11} {'p99 µs':>11} {'errores':>8}", file=stream)
+    for name, stats in benchmarks.items():
+        ops = stats.get("ops_per_second")
+        print(f"{name:<48} {ops if ops is not None else '-':>12} {stats['p50_us']:>11} "
+              f"{stats['p99_us']:>11} {stats.get('errors', 0):>8}", file=stream)
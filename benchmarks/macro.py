@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Macro-benchmarks de la API
+
+Recorre todas las rutas de main.py en proceso, con un cliente httpx sobre la app ASGI
+(sin red ni servidor), sobre almacenes sintéticos de distintos tamaños. Cada tamaño se
+mide en un subproceso propio, con su almacén en su propia carpeta, para que las cachés
+y el estado de un tamaño no contaminen al siguiente.
+
+    python -m benchmarks.macro --sizes 1000,100000 --output macro.json
+    BEAUTY_STORAGE=json python -m benchmarks.macro --sizes 1000
+
+Con --store-dir los almacenes se conservan y se reutilizan entre ejecuciones (construir
+el de 1M perfiles lleva minutos), lo que permite comparar commits sobre los mismos datos.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.comun import (
+    REPO_ROOT, build_results, print_table, summarize, synthetic_questionnaire, write_results
+)
+
+DEFAULT_SIZES = "1000,100000,1000000"
+
+# Perfiles por escritura al construir el almacén
+STORE_BATCH = 10000
+
+# Usuarios con historial de paletas precargado (y paletas por usuario)
+SEEDED_USERS = 1000
+SEEDED_PALETTES = 3
+
+PALETTE_TYPES = ["maquillaje", "ropa", "accesorios"]
+EVENT_TYPES = ["casual", "trabajo", "formal", "fiesta", "noche", "playa"]
+
+# Tiempo máximo de espera de la exportación completa
+EXPORT_TIMEOUT = 3600
+
+Request = Tuple[str, str, Dict[str, Any]]
+
+def store_user_id(index: int) -> str:
+    return f"bench_{index:07d}"
+
+def log(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+# ============================================================================
+# ALMACÉN SINTÉTICO
+# ============================================================================
+
+def build_store(size: int, seed: int) -> None:
+    """Llenar el almacenamiento configurado con size perfiles sintéticos y algo de historial"""
+    from metodos_server import build_profile, storage, tool_batch_generate_palettes
+
+    rng = random.Random(seed)
+    # Hay pocas combinaciones de respuestas: el análisis se calcula una vez por combinación
+    analyzed: Dict[Tuple, Dict[str, Any]] = {}
+    started = time.monotonic()
+    batch: List[Tuple[str, Dict[str, Any]]] = []
+    for index in range(size):
+        user_id = store_user_id(index)
+        args = synthetic_questionnaire(rng, user_id)
+        key = tuple(args[field] for field in sorted(args) if field not in ("user_id", "name"))
+        template = analyzed.get(key)
+        if template is None:
+            template = analyzed[key] = build_profile(args)
+        profile = dict(template)
+        profile["basic_info"] = {**template["basic_info"], "user_id": user_id, "name": args["name"]}
+        batch.append((user_id, profile))
+        if len(batch) >= STORE_BATCH:
+            storage.create_profiles(batch)
+            batch = []
+            log(f"⏳ {index + 1:,} de {size:,} perfiles ({time.monotonic() - started:.0f}s)")
+    if batch:
+        storage.create_profiles(batch)
+
+    requests = [
+        {"user_id": store_user_id(index), "palette_type": rng.choice(PALETTE_TYPES), "event_type": rng.choice(EVENT_TYPES)}
+        for index in range(min(size, SEEDED_USERS))
+        for _ in range(SEEDED_PALETTES)
+    ]
+    tool_batch_generate_palettes({"requests": requests})
+
+# ============================================================================
+# CASOS POR RUTA
+# ============================================================================
+
+class RouteCase:
+    """Una ruta a medir: genera cada petición y define los códigos de estado correctos"""
+
+    def __init__(self, name: str, make_request: Callable[[int], Request], iterations: int,
+                 expected: Tuple[int, ...] = (200,)):
+        self.name = name
+        self.make_request = make_request
+        self.iterations = iterations
+        self.expected = expected
+
+def build_cases(size: int, iterations: int, seed: int, created: List[str]) -> List[RouteCase]:
+    """Casos de todas las rutas de main.py salvo las de exportación completa (ver run_export_cases)"""
+    rng = random.Random(seed + 1)
+    seeded = min(size, SEEDED_USERS)
+    heavy = max(iterations // 10, 3)
+    bulk = max(iterations // 20, 2)
+
+    def existing_user() -> str:
+        return store_user_id(rng.randrange(size))
+
+    def seeded_user() -> str:
+        return store_user_id(rng.randrange(seeded))
+
+    def new_questionnaire(prefix: str, index: int) -> Dict[str, Any]:
+        user_id = f"{prefix}_{seed}_{index}"
+        created.append(user_id)
+        return synthetic_questionnaire(rng, user_id)
+
+    segments = [{"skin_tone": "media"}, {"undertone": "frio"}, {"season": "otono_profundo"},
+                {"skin_tone": "clara", "undertone": "calido"}]
+
+    def filters() -> Dict[str, str]:
+        return rng.choice([{}] + segments)
+
+    def colors(count: int) -> List[str]:
+        return [f"#{rng.randrange(0x1000000):06X}" for _ in range(count)]
+
+    def import_file(index: int) -> bytes:
+        from json_rapido import dumps
+        return b"".join(dumps(new_questionnaire(f"import_{index}", row)) + b"\n" for row in range(1000))
+
+    return [
+        RouteCase("GET /", lambda i: ("GET", "/", {}), iterations),
+        RouteCase("GET /health", lambda i: ("GET", "/health", {}), iterations),
+        RouteCase("POST /mcp/create-profile",
+                  lambda i: ("POST", "/mcp/create-profile", {"json": new_questionnaire("created", i)}), iterations),
+        RouteCase("GET /mcp/profile/{user_id}", lambda i: ("GET", f"/mcp/profile/{existing_user()}", {}), iterations),
+        RouteCase("GET /mcp/profiles",
+                  lambda i: ("GET", "/mcp/profiles", {"params": {"limit": 50, **filters()}}), iterations),
+        RouteCase("GET /mcp/profiles?format=ndjson",
+                  lambda i: ("GET", "/mcp/profiles", {"params": {"format": "ndjson", "limit": 1000, **filters()}}),
+                  heavy),
+        RouteCase("GET /mcp/segments",
+                  lambda i: ("GET", "/mcp/segments", {"params": {"limit": 50, **rng.choice(segments)}}), iterations),
+        RouteCase("POST /mcp/generate-palette",
+                  lambda i: ("POST", "/mcp/generate-palette", {"json": {
+                      "user_id": existing_user(), "palette_type": rng.choice(PALETTE_TYPES),
+                      "event_type": rng.choice(EVENT_TYPES)}}), iterations),
+        RouteCase("GET /mcp/palettes/{user_id}",
+                  lambda i: ("GET", f"/mcp/palettes/{seeded_user()}", {"params": {"limit": 20}}), iterations),
+        RouteCase("POST /mcp/quick-palette",
+                  lambda i: ("POST", "/mcp/quick-palette", {"json": {
+                      "palette_type": rng.choice(PALETTE_TYPES), "event_type": rng.choice(EVENT_TYPES),
+                      "skin_tone": rng.choice(["clara", "media", "oscura"]),
+                      "undertone": rng.choice(["frio", "calido", "neutro"])}}), iterations),
+        RouteCase("GET /mcp/rules", lambda i: ("GET", "/mcp/rules", {}), iterations),
+        RouteCase("POST /mcp/rules/reload", lambda i: ("POST", "/mcp/rules/reload", {}), iterations),
+        RouteCase("GET /mcp/export/{user_id}", lambda i: ("GET", f"/mcp/export/{seeded_user()}", {}), iterations),
+        RouteCase("POST /mcp/batch/create-profiles",
+                  lambda i: ("POST", "/mcp/batch/create-profiles", {"json": {
+                      "profiles": [new_questionnaire(f"batch_{i}", row) for row in range(100)]}}), heavy),
+        RouteCase("POST /mcp/batch/generate-palettes",
+                  lambda i: ("POST", "/mcp/batch/generate-palettes", {"json": {"requests": [
+                      {"user_id": existing_user(), "palette_type": rng.choice(PALETTE_TYPES),
+                       "event_type": rng.choice(EVENT_TYPES)} for _ in range(100)]}}), heavy),
+        RouteCase("POST /mcp/import-profiles",
+                  lambda i: ("POST", "/mcp/import-profiles", {"files": {
+                      "file": ("perfiles.ndjson", import_file(i), "application/x-ndjson")}}), bulk),
+        RouteCase("POST /api/generate-palette",
+                  lambda i: ("POST", "/api/generate-palette", {"json": {
+                      "profile": {"user_id": existing_user(), "skin_tone": rng.choice(["clara", "media", "oscura"])},
+                      "palette_type": rng.choice(PALETTE_TYPES), "event_type": rng.choice(EVENT_TYPES),
+                      "use_mcp_analysis": i % 2 == 0}}), iterations),
+        RouteCase("POST /api/analyze-harmony",
+                  lambda i: ("POST", "/api/analyze-harmony", {"json": {"colors": colors(rng.randint(2, 6))}}),
+                  iterations),
+        RouteCase("POST /api/nearest-colors",
+                  lambda i: ("POST", "/api/nearest-colors", {"json": {"colors": colors(4), "k": 3}}), iterations),
+        RouteCase("GET /api/quote", lambda i: ("GET", "/api/quote", {}), iterations),
+        # Borra los perfiles creados por POST /mcp/create-profile, en el mismo orden
+        RouteCase("DELETE /mcp/profile/{user_id}",
+                  lambda i: ("DELETE", f"/mcp/profile/created_{seed}_{i}", {}), iterations)
+    ]
+
+async def run_case(client, case: RouteCase) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    clock = time.perf_counter
+    for index in range(case.iterations):
+        method, url, kwargs = case.make_request(index)
+        started = clock()
+        try:
+            response = await client.request(method, url, **kwargs)
+            if response.status_code not in case.expected:
+                errors += 1
+        except Exception:
+            errors += 1
+        latencies.append(clock() - started)
+    return summarize(latencies, errors)
+
+async def run_export_cases(client, iterations: int) -> Dict[str, Dict[str, Any]]:
+    """Exportación completa: arranque del trabajo, duración total, estado, listado y descarga"""
+    results: Dict[str, Dict[str, Any]] = {}
+    started = time.perf_counter()
+    response = await client.post("/mcp/export-jobs", json={"compression": "gzip"})
+    results["POST /mcp/export-jobs"] = summarize([time.perf_counter() - started], int(response.status_code != 202))
+    if response.status_code != 202:
+        return results
+    job_id = response.json()["data"]["job_id"]
+
+    status = "running"
+    while status == "running" and time.perf_counter() - started < EXPORT_TIMEOUT:
+        await asyncio.sleep(0.05)
+        status = (await client.get(f"/mcp/export-jobs/{job_id}")).json()["data"]["status"]
+    results["export job (hasta completed)"] = summarize([time.perf_counter() - started], int(status != "completed"))
+
+    cases = [
+        RouteCase("GET /mcp/export-jobs", lambda i: ("GET", "/mcp/export-jobs", {}), iterations),
+        RouteCase("GET /mcp/export-jobs/{job_id}", lambda i: ("GET", f"/mcp/export-jobs/{job_id}", {}), iterations),
+        RouteCase("GET /mcp/export-jobs/{job_id}/download",
+                  lambda i: ("GET", f"/mcp/export-jobs/{job_id}/download", {}), max(iterations // 50, 3))
+    ]
+    for case in cases:
+        results[case.name] = await run_case(client, case)
+    return results
+
+async def run_routes(size: int, iterations: int, seed: int) -> Dict[str, Dict[str, Any]]:
+    import httpx
+    import main
+
+    created: List[str] = []
+    results: Dict[str, Dict[str, Any]] = {}
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            for case in build_cases(size, iterations, seed, created):
+                log(f"▶️  {case.name} ({case.iterations} peticiones)")
+                results[case.name] = await run_case(client, case)
+            log("▶️  Exportación completa")
+            results.update(await run_export_cases(client, iterations))
+
+    # Dejar el almacén como estaba para poder reutilizarlo
+    from metodos_server import storage
+    for user_id in created:
+        storage.delete_profile(user_id)
+    shutil.rmtree(os.environ.get("BEAUTY_EXPORT_DIR", "exports"), ignore_errors=True)
+    return results
+
+def run_worker(size: int, iterations: int, seed: int, output: str) -> int:
+    """Medir un tamaño de almacén (en el directorio actual, preparado por run_size)"""
+    from metodos_server import init_data_storage, storage
+
+    init_data_storage()
+    existing = storage.count_profiles()
+    build_seconds = None
+    if existing == 0:
+        log(f"🏗️  Construyendo almacén de {size:,} perfiles ({os.environ.get('BEAUTY_STORAGE', 'sqlite')})")
+        started = time.monotonic()
+        build_store(size, seed)
+        build_seconds = round(time.monotonic() - started, 2)
+    elif existing != size:
+        log(f"❌ El almacén de {os.getcwd()} tiene {existing:,} perfiles, no {size:,}; bórralo para reconstruirlo")
+        return 1
+
+    routes = asyncio.run(run_routes(size, iterations, seed))
+    result = {"store": {"profiles": size, "reused": build_seconds is None, "build_seconds": build_seconds},
+              "routes": routes}
+    write_results(result, output)
+    return 0
+
+def run_size(size: int, store_root: str, args: argparse.Namespace) -> Optional[Dict[str, Any]]:
+    """Ejecutar run_worker en un subproceso con su propio almacén y devolver sus resultados"""
+    backend = os.environ.get("BEAUTY_STORAGE", "sqlite")
+    store_dir = os.path.join(store_root, f"{backend}_{size}")
+    os.makedirs(store_dir, exist_ok=True)
+    output = os.path.join(store_dir, "resultado.json")
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])),
+        # Rutas relativas: todo queda dentro de store_dir
+        "BEAUTY_DB_FILE": "beauty_profiles.db",
+        "BEAUTY_EXPORT_DIR": "exports"
+    }
+    command = [sys.executable, "-m", "benchmarks.macro", "--worker-size", str(size),
+               "--iterations", str(args.iterations), "--seed", str(args.seed), "--worker-output", output]
+    if subprocess.run(command, cwd=store_dir, env=env).returncode != 0:
+        return None
+    with open(output, encoding="utf-8") as f:
+        result = json.load(f)
+    os.remove(output)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Macro-benchmarks de todas las rutas de la API")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Tamaños de almacén (por defecto {DEFAULT_SIZES})")
+    parser.add_argument("--iterations", type=int, default=200, help="Peticiones medidas por ruta (menos en las rutas pesadas)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de los datos y de las peticiones")
+    parser.add_argument("--store-dir", help="Carpeta donde conservar y reutilizar los almacenes sintéticos")
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    parser.add_argument("--worker-size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_size is not None:
+        return run_worker(args.worker_size, args.iterations, args.seed, args.worker_output)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    store_root = args.store_dir or tempfile.mkdtemp(prefix="beauty_bench_")
+    benchmarks: Dict[str, Dict[str, Any]] = {}
+    stores: Dict[str, Any] = {}
+    try:
+        for size in sizes:
+            log(f"📦 Almacén de {size:,} perfiles")
+            result = run_size(size, store_root, args)
+            if result is None:
+                return 1
+            stores[str(size)] = result["store"]
+            for name, stats in result["routes"].items():
+                benchmarks[f"{name} @{size}"] = stats
+    finally:
+        if args.store_dir is None:
+            shutil.rmtree(store_root, ignore_errors=True)
+
+    print_table(benchmarks)
+    settings = {"sizes": sizes, "iterations": args.iterations, "seed": args.seed}
+    results = build_results("macro", settings, benchmarks)
+    results["stores"] = stores
+    write_results(results, args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks de colorimetría y generación de paletas
+
+Mide ColorAnalyzer.analyze_undertone, determine_season y generate_harmony_palette,
+lighten_color y los generadores de paleta por tipo con entradas sintéticas fijadas
+por la semilla, y escribe los resultados en JSON.
+
+    python -m benchmarks.micro --output micro.json
+"""
+
+import argparse
+import itertools
+import random
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.comun import QUESTIONNAIRE_VALUES, build_results, measure, print_table, write_results
+
+# Entradas distintas por benchmark; se recorren en ciclo durante la medición
+INPUT_VARIANTS = 512
+
+def _random_hex(rng: random.Random) -> str:
+    return f"#{rng.randrange(0x1000000):06X}"
+
+def build_cases(seed: int) -> Dict[str, Callable[[], Any]]:
+    """Funciones sin argumentos a medir, cada una con su propio ciclo de entradas"""
+    # Importación diferida: benchmarks.comun ajusta sys.path antes
+    from metodos_server import (
+        ColorAnalyzer, generate_accessories_palette, generate_clothing_palette,
+        generate_makeup_palette, lighten_color
+    )
+
+    rng = random.Random(seed)
+    values = QUESTIONNAIRE_VALUES
+    seasons = list(ColorAnalyzer.SEASONS.values())
+
+    def cycle_call(func: Callable[..., Any], inputs: List[Tuple]) -> Callable[[], Any]:
+        arguments = itertools.cycle(inputs)
+        return lambda: func(*next(arguments))
+
+    undertone_inputs = [
+        (rng.choice(values["vein_color"]), rng.choice(values["jewelry_preference"]),
+         rng.choice(values["sun_reaction"]), rng.choice(values["natural_lip_color"]))
+        for _ in range(INPUT_VARIANTS)
+    ]
+    season_inputs = [
+        (rng.choice(values["skin_tone"]), rng.choice(["frio", "calido", "neutro"]),
+         rng.choice(values["eye_color"]), rng.choice(values["hair_color"]), rng.choice(values["contrast_level"]))
+        for _ in range(INPUT_VARIANTS)
+    ]
+    color_lists = [[_random_hex(rng) for _ in range(6)] for _ in range(INPUT_VARIANTS)]
+    palette_inputs = [
+        (colors, rng.choice(seasons), rng.choice(["casual", "trabajo", "formal", "fiesta", "noche", "playa"]))
+        for colors in color_lists
+    ]
+
+    cases = {
+        "analyze_undertone": cycle_call(ColorAnalyzer.analyze_undertone, undertone_inputs),
+        "determine_season": cycle_call(ColorAnalyzer.determine_season, season_inputs)
+    }
+    for harmony_type in ColorAnalyzer.HARMONY_HUE_STEPS:
+        cases[f"generate_harmony_palette[{harmony_type}]"] = cycle_call(
+            ColorAnalyzer.generate_harmony_palette, [(colors, harmony_type) for colors in color_lists]
+        )
+    cases["lighten_color"] = cycle_call(lighten_color, [(colors[0],) for colors in color_lists])
+    cases["generate_makeup_palette"] = cycle_call(generate_makeup_palette, palette_inputs)
+    cases["generate_clothing_palette"] = cycle_call(generate_clothing_palette, palette_inputs)
+    cases["generate_accessories_palette"] = cycle_call(generate_accessories_palette, palette_inputs)
+    return cases
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de colorimetría y paletas")
+    parser.add_argument("--iterations", type=int, default=20000, help="Llamadas medidas por benchmark")
+    parser.add_argument("--warmup", type=int, default=1000, help="Llamadas previas sin medir")
+    parser.add_argument("--repeat", type=int, default=3, help="Rondas por benchmark (se conserva la mejor)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de las entradas sintéticas")
+    parser.add_argument("--filter", help="Ejecutar solo los benchmarks cuyo nombre contenga este texto")
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    args = parser.parse_args()
+
+    cases = build_cases(args.seed)
+    if args.filter:
+        cases = {name: func for name, func in cases.items() if args.filter in name}
+
+    benchmarks = {}
+    for name, func in cases.items():
+        # Se conserva la mejor ronda (menor p50): el ruido del sistema solo puede empeorar los tiempos
+        rounds = [measure(func, args.iterations, args.warmup) for _ in range(args.repeat)]
+        benchmarks[name] = min(rounds, key=lambda stats: stats["p50_us"])
+
+    print_table(benchmarks)
+    settings = {"iterations": args.iterations, "warmup": args.warmup, "repeat": args.repeat, "seed": args.seed}
+    write_results(build_results("micro", settings, benchmarks), args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
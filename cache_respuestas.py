@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Caché de respuestas direccionada por contenido
+Las claves son el hash de la petición normalizada, con expiración TTL, desalojo LRU y contadores
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from json_rapido import dumps, loads
+
+try:
+    import redis
+except ImportError:  # Backend compartido opcional
+    redis = None
+
+CACHE_TTL = float(os.environ.get("BEAUTY_CACHE_TTL", 3600))
+CACHE_SIZE = int(os.environ.get("BEAUTY_CACHE_SIZE", 4096))
+CACHE_URL = os.environ.get("BEAUTY_CACHE_URL")
+
+def canonical_key(namespace: str, payload: Any) -> str:
+    """Hash estable de una petición normalizada (claves ordenadas, sin espacios)"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return f"{namespace}:{hashlib.sha256(encoded.encode('utf-8')).hexdigest()}"
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class CacheBackend:
+    """Interfaz mínima de almacenamiento clave-valor con TTL (estilo Redis)"""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+class MemoryCacheBackend(CacheBackend):
+    """Backend local en memoria con TTL y desalojo LRU; sustituto del backend compartido"""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+class RedisCacheBackend(CacheBackend):
+    """Backend compartido entre workers sobre Redis (requiere el paquete opcional redis)"""
+
+    def __init__(self, url: str, prefix: str = "beauty:"):
+        if redis is None:
+            raise RuntimeError("El backend compartido requiere el paquete 'redis'")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.client.set(self.prefix + key, dumps(value), ex=max(1, int(ttl)))
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+def create_cache_backend(url: Optional[str] = CACHE_URL) -> CacheBackend:
+    """Backend compartido si se configuró BEAUTY_CACHE_URL, o el sustituto local en memoria"""
+    if url:
+        return RedisCacheBackend(url)
+    return MemoryCacheBackend()
+
+# ============================================================================
+# CACHÉ DE RESPUESTAS
+# ============================================================================
+
+class ResponseCache:
+    """Caché de respuestas con contadores de aciertos y fallos por espacio de nombres"""
+
+    def __init__(self, backend: CacheBackend, ttl: float = CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, namespace: str, outcome: str) -> None:
+        with self._lock:
+            counters = self._stats.setdefault(namespace, {"hits": 0, "misses": 0})
+            counters[outcome] += 1
+
+    def get_or_compute(self, namespace: str, payload: Any, compute: Callable[[], Any],
+                       cacheable: Callable[[Any], bool] = lambda value: True) -> Any:
+        """Devolver el valor cacheado para la petición o calcularlo y guardarlo"""
+        key = canonical_key(namespace, payload)
+        value = self.backend.get(key)
+        if value is not None:
+            self._count(namespace, "hits")
+            return value
+
+        self._count(namespace, "misses")
+        value = compute()
+        if cacheable(value):
+            self.backend.set(key, value, self.ttl)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Aciertos, fallos y tasa de aciertos por espacio de nombres"""
+        with self._lock:
+            namespaces = {
+                namespace: dict(counters, hit_rate=round(
+                    counters["hits"] / max(1, counters["hits"] + counters["misses"]), 3
+                ))
+                for namespace, counters in self._stats.items()
+            }
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl_seconds": self.ttl,
+            "namespaces": namespaces
+        }
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._lock:
+            self._stats.clear()
+
+response_cache = ResponseCache(create_cache_backend())
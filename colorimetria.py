@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Conversiones entre espacios de color
+Hex, RGB, HLS, HSV, XYZ, Lab y LCh con tablas sRGB precalculadas, caché por color de 24 bits
+y APIs escalares y vectorizadas (NumPy)
+"""
+
+import colorsys
+import math
+import os
+from functools import lru_cache
+from typing import Any, List, Tuple
+
+import numpy as np
+
+# Tamaño de las cachés escalares (una entrada por color de 24 bits distinto)
+COLOR_CACHE_SIZE = int(os.environ.get("BEAUTY_COLOR_CACHE_SIZE", 65536))
+
+# Matriz sRGB (D65) -> XYZ y blanco de referencia D65
+RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041]
+])
+WHITE_D65 = np.array([0.95047, 1.0, 1.08883])
+
+# Tabla de linealización sRGB (gamma inversa) para cada valor de canal de 8 bits
+_CHANNELS = np.arange(256) / 255.0
+SRGB_TO_LINEAR = np.where(_CHANNELS <= 0.04045, _CHANNELS / 12.92, ((_CHANNELS + 0.055) / 1.055) ** 2.4)
+_SRGB_TO_LINEAR_LIST = SRGB_TO_LINEAR.tolist()
+_RGB_TO_XYZ_ROWS = RGB_TO_XYZ.tolist()
+_WHITE_D65_LIST = WHITE_D65.tolist()
+
+# Constantes CIE para f(t) de Lab
+_LAB_EPSILON = 216 / 24389
+_LAB_KAPPA = 24389 / 27
+
+# ============================================================================
+# HEX Y RGB
+# ============================================================================
+
+def hex_to_int(hex_color: str) -> int:
+    """Convertir '#rrggbb' al entero de 24 bits 0xRRGGBB"""
+    hex_color = hex_color.lstrip('#')
+    r, g, b = [int(hex_color[i:i+2], 16) for i in (0, 2, 4)]
+    return (r << 16) | (g << 8) | b
+
+def int_to_hex(value: int) -> str:
+    """Convertir un entero de 24 bits a '#rrggbb'"""
+    return f"#{value:06x}"
+
+def int_to_rgb(value: int) -> Tuple[int, int, int]:
+    """Separar un entero de 24 bits en canales RGB de 8 bits"""
+    return (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
+
+def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
+    """Convertir hex a RGB de 8 bits"""
+    return int_to_rgb(hex_to_int(hex_color))
+
+def rgb_to_hex(r: int, g: int, b: int) -> str:
+    """Convertir RGB de 8 bits a hex"""
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+# ============================================================================
+# CONVERSIONES ESCALARES (con caché por color de 24 bits)
+# ============================================================================
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def int_to_hls(value: int) -> Tuple[float, float, float]:
+    """HLS (colorsys) de un color de 24 bits"""
+    r, g, b = int_to_rgb(value)
+    return colorsys.rgb_to_hls(r / 255.0, g / 255.0, b / 255.0)
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def int_to_hsv(value: int) -> Tuple[float, float, float]:
+    """HSV (colorsys) de un color de 24 bits"""
+    r, g, b = int_to_rgb(value)
+    return colorsys.rgb_to_hsv(r / 255.0, g / 255.0, b / 255.0)
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def int_to_xyz(value: int) -> Tuple[float, float, float]:
+    """XYZ (D65) de un color de 24 bits usando la tabla de linealización"""
+    linear = [_SRGB_TO_LINEAR_LIST[channel] for channel in int_to_rgb(value)]
+    return tuple(sum(m * c for m, c in zip(row, linear)) for row in _RGB_TO_XYZ_ROWS)
+
+def _lab_f(t: float) -> float:
+    return math.pow(t, 1 / 3) if t > _LAB_EPSILON else (_LAB_KAPPA * t + 16) / 116
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def int_to_lab(value: int) -> Tuple[float, float, float]:
+    """CIELAB (D65) de un color de 24 bits"""
+    fx, fy, fz = [_lab_f(c / w) for c, w in zip(int_to_xyz(value), _WHITE_D65_LIST)]
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def int_to_lch(value: int) -> Tuple[float, float, float]:
+    """LCh (L, croma, matiz en grados) de un color de 24 bits"""
+    L, a, b = int_to_lab(value)
+    return L, math.hypot(a, b), math.degrees(math.atan2(b, a)) % 360.0
+
+def hex_to_hls(hex_color: str) -> Tuple[float, float, float]:
+    """Convertir hex a HLS"""
+    return int_to_hls(hex_to_int(hex_color))
+
+def hex_to_hsv(hex_color: str) -> Tuple[float, float, float]:
+    """Convertir hex a HSV"""
+    return int_to_hsv(hex_to_int(hex_color))
+
+def hex_to_xyz(hex_color: str) -> Tuple[float, float, float]:
+    """Convertir hex a XYZ"""
+    return int_to_xyz(hex_to_int(hex_color))
+
+def hex_to_lab(hex_color: str) -> Tuple[float, float, float]:
+    """Convertir hex a CIELAB"""
+    return int_to_lab(hex_to_int(hex_color))
+
+def hex_to_lch(hex_color: str) -> Tuple[float, float, float]:
+    """Convertir hex a LCh"""
+    return int_to_lch(hex_to_int(hex_color))
+
+def hls_to_hex(h: float, l: float, s: float) -> str:
+    """Convertir HLS a hex (truncando cada canal a 8 bits)"""
+    r, g, b = colorsys.hls_to_rgb(h, l, s)
+    return f"#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}"
+
+def hsv_to_hex(h: float, s: float, v: float) -> str:
+    """Convertir HSV a hex (truncando cada canal a 8 bits)"""
+    r, g, b = colorsys.hsv_to_rgb(h, s, v)
+    return f"#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}"
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def _lighten_int(value: int, factor: float) -> str:
+    r, g, b = [min(255, int(c + (255 - c) * factor)) for c in int_to_rgb(value)]
+    return rgb_to_hex(r, g, b)
+
+def lighten_hex(hex_color: str, factor: float = 0.3) -> str:
+    """Mezclar un color con blanco en la proporción indicada"""
+    return _lighten_int(hex_to_int(hex_color), factor)
+
+# ============================================================================
+# CONVERSIONES VECTORIZADAS
+# ============================================================================
+
+# Valor de cada dígito hexadecimal ASCII (-1 = carácter no válido)
+_HEX_DIGIT_VALUES = np.full(256, -1, dtype=np.int16)
+for _value, _char in enumerate(b"0123456789abcdef"):
+    _HEX_DIGIT_VALUES[_char] = _value
+    _HEX_DIGIT_VALUES[ord(chr(_char).upper())] = _value
+
+def hex_array_to_rgb(hex_colors: List[str]) -> np.ndarray:
+    """Convertir una lista de colores hex a un array (N, 3) de RGB en [0, 1]"""
+    raw = np.array([color.lstrip('#') for color in hex_colors], dtype='S6')
+    digits = _HEX_DIGIT_VALUES[raw.view(np.uint8).reshape(-1, 6)]
+    if (digits < 0).any():
+        raise ValueError("Color hex no válido")
+    return (digits[:, 0::2] * 16 + digits[:, 1::2]) / 255.0
+
+def ints_to_rgb_array(values: np.ndarray) -> np.ndarray:
+    """Separar enteros de 24 bits (...) en canales de 8 bits (..., 3)"""
+    values = np.asarray(values, dtype=np.int64)
+    return np.stack([(values >> 16) & 0xFF, (values >> 8) & 0xFF, values & 0xFF], axis=-1)
+
+def rgb_to_hls_array(rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Equivalente vectorizado de colorsys.rgb_to_hls sobre el último eje"""
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    maxc = np.maximum(np.maximum(r, g), b)
+    minc = np.minimum(np.minimum(r, g), b)
+    sumc = maxc + minc
+    rangec = maxc - minc
+    l = sumc / 2.0
+    gray = minc == maxc
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(l <= 0.5, rangec / sumc, rangec / (2.0 - maxc - minc))
+        rc = (maxc - r) / rangec
+        gc = (maxc - g) / rangec
+        bc = (maxc - b) / rangec
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.mod(h / 6.0, 1.0)
+
+    return np.where(gray, 0.0, h), l, np.where(gray, 0.0, s)
+
+def _hls_hue_channel(m1: np.ndarray, m2: np.ndarray, hue: np.ndarray) -> np.ndarray:
+    """Canal RGB de colorsys.hls_to_rgb (función _v) vectorizado"""
+    hue = np.mod(hue, 1.0)
+    return np.where(hue < 1.0 / 6.0, m1 + (m2 - m1) * hue * 6.0,
+           np.where(hue < 0.5, m2,
+           np.where(hue < 2.0 / 3.0, m1 + (m2 - m1) * (2.0 / 3.0 - hue) * 6.0, m1)))
+
+def hls_to_rgb_array(h: np.ndarray, l: np.ndarray, s: np.ndarray) -> np.ndarray:
+    """Equivalente vectorizado de colorsys.hls_to_rgb; devuelve RGB en el último eje"""
+    h, l, s = np.broadcast_arrays(h, l, s)
+    m2 = np.where(l <= 0.5, l * (1.0 + s), l + s - (l * s))
+    m1 = 2.0 * l - m2
+    rgb = np.stack([
+        _hls_hue_channel(m1, m2, h + 1.0 / 3.0),
+        _hls_hue_channel(m1, m2, h),
+        _hls_hue_channel(m1, m2, h - 1.0 / 3.0)
+    ], axis=-1)
+    gray = (s == 0.0)[..., None]
+    return np.where(gray, l[..., None], rgb)
+
+def rgb_to_hsv_array(rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Equivalente vectorizado de colorsys.rgb_to_hsv sobre el último eje"""
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    maxc = np.maximum(np.maximum(r, g), b)
+    minc = np.minimum(np.minimum(r, g), b)
+    rangec = maxc - minc
+    gray = minc == maxc
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = rangec / maxc
+        rc = (maxc - r) / rangec
+        gc = (maxc - g) / rangec
+        bc = (maxc - b) / rangec
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.mod(h / 6.0, 1.0)
+
+    return np.where(gray, 0.0, h), np.where(gray, 0.0, s), maxc
+
+def quantize_rgb(rgb: np.ndarray) -> np.ndarray:
+    """Truncar RGB en [0, 1] a enteros de 8 bits, igual que int(x*255)"""
+    return (rgb * 255).astype(np.int64)
+
+def ints_to_hex(rgb_ints: np.ndarray) -> List[Any]:
+    """Convertir enteros RGB (..., 3) en cadenas hex con la forma del array original"""
+    packed = (rgb_ints[..., 0] << 16) | (rgb_ints[..., 1] << 8) | rgb_ints[..., 2]
+    # Formatear solo los valores distintos y repartirlos con indexado
+    unique, inverse = np.unique(packed, return_inverse=True)
+    hex_table = np.array([f"#{value:06x}" for value in unique.tolist()])
+    return hex_table[inverse.reshape(packed.shape)].tolist()
+
+def rgb8_to_xyz_array(rgb_ints: np.ndarray) -> np.ndarray:
+    """XYZ (D65) de canales RGB de 8 bits (..., 3) usando la tabla de linealización"""
+    return SRGB_TO_LINEAR[rgb_ints] @ RGB_TO_XYZ.T
+
+def xyz_to_lab_array(xyz: np.ndarray) -> np.ndarray:
+    """XYZ (..., 3) a CIELAB (..., 3)"""
+    t = xyz / WHITE_D65
+    f = np.where(t > _LAB_EPSILON, np.cbrt(t), (_LAB_KAPPA * t + 16) / 116)
+    return np.stack([
+        116 * f[..., 1] - 16,
+        500 * (f[..., 0] - f[..., 1]),
+        200 * (f[..., 1] - f[..., 2])
+    ], axis=-1)
+
+def lab_to_lch_array(lab: np.ndarray) -> np.ndarray:
+    """CIELAB (..., 3) a LCh (..., 3) con el matiz en grados"""
+    a, b = lab[..., 1], lab[..., 2]
+    return np.stack([lab[..., 0], np.hypot(a, b), np.degrees(np.arctan2(b, a)) % 360.0], axis=-1)
+
+def ints_to_lab_array(values: np.ndarray) -> np.ndarray:
+    """CIELAB de enteros de 24 bits; cada color distinto se convierte una sola vez"""
+    unique, inverse = np.unique(np.asarray(values, dtype=np.int64), return_inverse=True)
+    lab = xyz_to_lab_array(rgb8_to_xyz_array(ints_to_rgb_array(unique)))
+    return lab[inverse.reshape(-1)].reshape(np.shape(values) + (3,))
+
+def ints_to_lch_array(values: np.ndarray) -> np.ndarray:
+    """LCh de enteros de 24 bits; cada color distinto se convierte una sola vez"""
+    return lab_to_lch_array(ints_to_lab_array(values))
+
+def hex_array_to_lch(hex_colors: List[str]) -> np.ndarray:
+    """Convertir una lista de colores hex a un array (N, 3) de L, C, h"""
+    return ints_to_lch_array([hex_to_int(color) for color in hex_colors])
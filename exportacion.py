@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Exportación completa del almacenamiento
+Vuelca todos los perfiles con sus paletas a NDJSON comprimido (gzip o zstd) en memoria constante,
+como trabajo en segundo plano cuyo estado puede consultarse desde cualquier worker
+"""
+
+import argparse
+import gzip
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # Compresión zstd opcional
+    zstandard = None
+
+from almacenamiento import BaseStorage, atomic_write_json
+from json_rapido import dumps, loads
+
+# Carpeta de los archivos exportados y de los estados de los trabajos
+EXPORT_DIR = os.environ.get("BEAUTY_EXPORT_DIR", "exports")
+EXPORT_FORMAT_VERSION = "1"
+EXPORT_PROGRESS_INTERVAL = 2.0
+
+# Líneas acumuladas antes de cada escritura en el compresor
+WRITE_BATCH_LINES = 1000
+
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+COMPRESSION_MEDIA_TYPES = {"gzip": "application/gzip", "zstd": "application/zstd"}
+
+_JOB_ID = re.compile(r"[0-9a-f]{12}")
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Existe pero pertenece a otro usuario
+    return True
+
+def available_compressions() -> List[str]:
+    return ["gzip"] + (["zstd"] if zstandard is not None else [])
+
+def open_compressed(path: str, compression: str) -> BinaryIO:
+    """Abrir un archivo de salida comprimido para escritura"""
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("La compresión zstd requiere el paquete 'zstandard'")
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"), closefd=True)
+    raise ValueError(f"Compresión no válida: {compression}")
+
+# ============================================================================
+# VOLCADO NDJSON
+# ============================================================================
+
+def iter_export_records(storage: BaseStorage) -> Iterator[Dict[str, Any]]:
+    """Registros del volcado: un encabezado y cada perfil seguido de sus paletas"""
+    yield {"type": "export_info", "exported_at": datetime.now().isoformat(), "version": EXPORT_FORMAT_VERSION}
+    for user_id, profile, palettes in storage.iter_profiles_with_palettes():
+        yield {"type": "profile", "user_id": user_id, "profile": profile}
+        for palette in palettes:
+            yield {"type": "palette", "user_id": user_id, "palette": palette}
+
+def write_export(storage: BaseStorage, path: str, compression: str = "gzip",
+                 progress: Optional[Callable[[Dict[str, int]], None]] = None) -> Dict[str, int]:
+    """
+    Escribir el volcado completo en path
+
+    Se escribe en un archivo temporal que se renombra al terminar, así que path nunca
+    queda a medias. progress recibe los contadores como mucho cada EXPORT_PROGRESS_INTERVAL s.
+    """
+    tmp_path = path + ".tmp"
+    counts = {"profiles": 0, "palettes": 0}
+    last_report = time.monotonic()
+    try:
+        with open_compressed(tmp_path, compression) as out:
+            lines: List[bytes] = []
+            for record in iter_export_records(storage):
+                lines.append(dumps(record) + b"\n")
+                if record["type"] == "profile":
+                    counts["profiles"] += 1
+                elif record["type"] == "palette":
+                    counts["palettes"] += 1
+                if len(lines) >= WRITE_BATCH_LINES:
+                    out.write(b"".join(lines))
+                    lines.clear()
+                    if progress is not None and time.monotonic() - last_report >= EXPORT_PROGRESS_INTERVAL:
+                        last_report = time.monotonic()
+                        progress(dict(counts))
+            out.write(b"".join(lines))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    counts["bytes"] = os.path.getsize(path)
+    return counts
+
+# ============================================================================
+# TRABAJOS EN SEGUNDO PLANO
+# ============================================================================
+
+class ExportJobs:
+    """Trabajos de exportación completa
+
+    El estado de cada trabajo se guarda en <directorio>/<job_id>.json, de modo que
+    cualquier worker puede consultarlo aunque el trabajo corra en otro.
+    """
+
+    def __init__(self, storage: BaseStorage, directory: str = EXPORT_DIR):
+        self.storage = storage
+        self.directory = directory
+
+    def _status_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _save(self, job: Dict[str, Any]) -> None:
+        atomic_write_json(self._status_path(job["job_id"]), job)
+
+    def start(self, compression: str = "gzip") -> Dict[str, Any]:
+        """Crear un trabajo y lanzarlo en un hilo propio; devuelve su estado inicial"""
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Compresión no válida: {compression} (opciones: {', '.join(COMPRESSION_EXTENSIONS)})")
+        if compression not in available_compressions():
+            raise ValueError(f"La compresión {compression} no está disponible en este servidor")
+
+        os.makedirs(self.directory, exist_ok=True)
+        job_id = uuid.uuid4().hex[:12]
+        started_at = datetime.now()
+        job = {
+            "job_id": job_id,
+            "status": "running",
+            "compression": compression,
+            "file": f"beauty_export_{started_at:%Y%m%d_%H%M%S}_{job_id}.ndjson{COMPRESSION_EXTENSIONS[compression]}",
+            "started_at": started_at.isoformat(),
+            "finished_at": None,
+            "profiles": 0,
+            "palettes": 0,
+            "bytes": None,
+            "error": None,
+            "pid": os.getpid()
+        }
+        self._save(job)
+        threading.Thread(target=self._run, args=(job,), name=f"beauty-export-{job_id}", daemon=True).start()
+        return dict(job)
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        def progress(counts: Dict[str, int]):
+            job.update(counts)
+            self._save(job)
+
+        try:
+            counts = write_export(self.storage, os.path.join(self.directory, job["file"]),
+                                  job["compression"], progress)
+            job.update(counts, status="completed")
+        except Exception as e:
+            job.update(status="failed", error=str(e))
+        job["finished_at"] = datetime.now().isoformat()
+        self._save(job)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Estado de un trabajo o None si no existe"""
+        if not _JOB_ID.fullmatch(job_id):
+            return None
+        try:
+            with open(self._status_path(job_id), "rb") as f:
+                job = loads(f.read())
+        except FileNotFoundError:
+            return None
+        if job["status"] == "running" and not _process_alive(job["pid"]):
+            # El worker que lo ejecutaba terminó antes de acabar (reinicio, despliegue...)
+            job.update(status="failed", error="Interrumpido: el proceso que lo ejecutaba terminó")
+        return job
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """Trabajos conocidos, del más reciente al más antiguo"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        jobs = [self.status(name[:-5]) for name in names if name.endswith(".json")]
+        return sorted((job for job in jobs if job), key=lambda job: job["started_at"], reverse=True)
+
+    def file_path(self, job_id: str) -> Optional[str]:
+        """Ruta del archivo de un trabajo terminado"""
+        job = self.status(job_id)
+        if not job or job["status"] != "completed":
+            return None
+        return os.path.join(self.directory, job["file"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportar todos los perfiles y paletas a NDJSON comprimido")
+    parser.add_argument("--output", help="Archivo de salida (por defecto en BEAUTY_EXPORT_DIR)")
+    parser.add_argument("--compression", default="gzip", choices=list(COMPRESSION_EXTENSIONS))
+    args = parser.parse_args()
+
+    # El almacenamiento configurado del servidor, con su códec de registros
+    from metodos_server import init_data_storage, storage
+    init_data_storage()
+
+    path = args.output
+    if path is None:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        path = os.path.join(EXPORT_DIR, f"beauty_export_{datetime.now():%Y%m%d_%H%M%S}.ndjson"
+                                        f"{COMPRESSION_EXTENSIONS[args.compression]}")
+
+    def progress(counts: Dict[str, int]):
+        print(f"⏳ {counts['profiles']} perfiles, {counts['palettes']} paletas", flush=True)
+
+    started = time.monotonic()
+    counts = write_export(storage, path, args.compression, progress)
+    print(f"✅ Exportados {counts['profiles']} perfiles y {counts['palettes']} paletas a {path} "
+          f"({counts['bytes']:,} bytes, {time.monotonic() - started:.1f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Importación masiva de cuestionarios de perfil
+Lee un archivo NDJSON o CSV fila a fila, valida cada fila como tool_create_profile, analiza los
+perfiles en un pool de procesos y los guarda por bloques, con un informe de aceptados y rechazados
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from almacenamiento import BaseStorage
+from json_rapido import loads
+from metodos_server import build_profile, init_data_storage, profile_cache, storage, validate_profile_args
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+# Filas por bloque de análisis y de escritura, y procesos de análisis (1 = sin pool)
+IMPORT_BATCH_SIZE = int(os.environ.get("BEAUTY_IMPORT_BATCH_SIZE", 1000))
+IMPORT_WORKERS = int(os.environ.get("BEAUTY_IMPORT_WORKERS", os.cpu_count() or 1))
+
+# Rechazos detallados en el informe (el recuento siempre es completo)
+IMPORT_MAX_REPORTED_ERRORS = 100
+
+Row = Tuple[int, Dict[str, Any]]
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    """Deducir el formato por la extensión o el tipo de contenido"""
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+def iter_rows(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    """Recorrer (línea, fila, error de formato) sin cargar el archivo en memoria"""
+    if fmt == "ndjson":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, loads(line), None
+            except ValueError:
+                yield line_number, None, "JSON no válido"
+    elif fmt == "csv":
+        reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+        for row in reader:
+            # Las celdas vacías cuentan como campos ausentes; las columnas sobrantes se ignoran
+            yield reader.line_num, {key: value for key, value in row.items() if key and value}, None
+    else:
+        raise ValueError(f"Formato no válido: {fmt} (opciones: {', '.join(IMPORT_FORMATS)})")
+
+def validate_row(row: Any) -> Optional[str]:
+    """Mismas comprobaciones que tool_create_profile, más un user_id de texto"""
+    if not isinstance(row, dict):
+        return "La fila debe ser un objeto"
+    error = validate_profile_args(row)
+    if error:
+        return error
+    if not isinstance(row["user_id"], str) or not row["user_id"]:
+        return "user_id debe ser un texto no vacío"
+    return None
+
+def analyze_rows(rows: List[Row]) -> List[Tuple[int, str, Optional[Dict[str, Any]], Optional[str]]]:
+    """Analizar un bloque de filas válidas (se ejecuta en los procesos del pool)"""
+    results = []
+    for line_number, row in rows:
+        try:
+            results.append((line_number, row["user_id"], build_profile(row), None))
+        except Exception as e:
+            results.append((line_number, row["user_id"], None, f"Error analizando perfil: {str(e)}"))
+    return results
+
+def import_profiles(stream: BinaryIO, fmt: str, target: Optional[BaseStorage] = None,
+                    workers: int = IMPORT_WORKERS, batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Importar perfiles desde un archivo NDJSON o CSV
+
+    Los bloques se analizan en paralelo pero se guardan en el orden del archivo. Un
+    user_id que ya existe (en el almacenamiento o antes en el archivo) se rechaza.
+    """
+    if fmt not in IMPORT_FORMATS:
+        return {"error": f"Formato no válido: {fmt} (opciones: {', '.join(IMPORT_FORMATS)})"}
+    target = target or storage
+    started = time.monotonic()
+    report: Dict[str, Any] = {"format": fmt, "total_rows": 0, "accepted": 0, "rejected": 0, "rejections": []}
+
+    def reject(line_number: int, user_id: Any, error: str):
+        report["rejected"] += 1
+        if len(report["rejections"]) < IMPORT_MAX_REPORTED_ERRORS:
+            report["rejections"].append({"line": line_number, "user_id": user_id, "error": error})
+
+    def valid_batches() -> Iterator[List[Row]]:
+        batch: List[Row] = []
+        for line_number, row, error in iter_rows(stream, fmt):
+            report["total_rows"] += 1
+            error = error or validate_row(row)
+            if error:
+                reject(line_number, row.get("user_id") if isinstance(row, dict) else None, error)
+                continue
+            batch.append((line_number, row))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def commit(results: List[Tuple[int, str, Optional[Dict[str, Any]], Optional[str]]]):
+        analyzed = []
+        for line_number, user_id, profile, error in results:
+            if error:
+                reject(line_number, user_id, error)
+            else:
+                analyzed.append((line_number, user_id, profile))
+        before = profile_cache.write_version()
+        created = target.create_profiles([(user_id, profile) for _, user_id, profile in analyzed])
+        for (line_number, user_id, _), was_created in zip(analyzed, created):
+            if was_created:
+                report["accepted"] += 1
+            else:
+                reject(line_number, user_id, f"El perfil {user_id} ya existe")
+        if any(created) and target is storage:
+            profile_cache.mark_written(before)
+
+    batches = valid_batches()
+    # Un archivo que cabe en dos bloques se analiza aquí mismo: no compensa arrancar el pool
+    head = list(itertools.islice(batches, 2))
+    if workers <= 1 or len(head) < 2:
+        for batch in itertools.chain(head, batches):
+            commit(analyze_rows(batch))
+    else:
+        # spawn: el servidor tiene hilos activos y hacer fork de un proceso con hilos no es seguro
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            # Acotar los bloques en vuelo para mantener la memoria constante
+            pending = deque()
+            for batch in itertools.chain(head, batches):
+                pending.append(pool.submit(analyze_rows, batch))
+                if len(pending) >= workers * 2:
+                    commit(pending.popleft().result())
+            while pending:
+                commit(pending.popleft().result())
+
+    elapsed = time.monotonic() - started
+    report["rejections"].sort(key=lambda rejection: rejection["line"])
+    report["elapsed_seconds"] = round(elapsed, 2)
+    report["rows_per_second"] = round(report["total_rows"] / max(elapsed, 1e-9))
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Importar cuestionarios de perfil desde NDJSON o CSV")
+    parser.add_argument("archivo", help="Archivo .ndjson/.jsonl o .csv")
+    parser.add_argument("--format", choices=list(IMPORT_FORMATS), help="Formato (por defecto según la extensión)")
+    parser.add_argument("--workers", type=int, default=IMPORT_WORKERS, help="Procesos de análisis (1 = sin pool)")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Filas por bloque de escritura")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.archivo)
+    if fmt is None:
+        parser.error("No se pudo deducir el formato; usa --format")
+
+    init_data_storage()
+    with open(args.archivo, "rb") as f:
+        report = import_profiles(f, fmt, workers=args.workers, batch_size=args.batch_size)
+    if "error" in report:
+        print(f"❌ {report['error']}")
+        return 1
+    for rejection in report["rejections"][:10]:
+        print(f"⚠️  Línea {rejection['line']} ({rejection['user_id']}): {rejection['error']}")
+    print(f"✅ {report['accepted']} de {report['total_rows']} perfiles importados, {report['rejected']} rechazados "
+          f"en {report['elapsed_seconds']}s ({report['rows_per_second']:,} filas/s)")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
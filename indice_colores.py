@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Índice espacial de colores conocidos
+Búsqueda de vecinos más cercanos en espacio Lab (ΔE76) sobre las muestras de las estaciones
+y de la base de datos de colores, para clasificar colores arbitrarios
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from colorimetria import hex_to_int, ints_to_lab_array
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # Sin SciPy se usa búsqueda exhaustiva vectorizada
+    cKDTree = None
+
+# Filas de consulta procesadas a la vez en la búsqueda exhaustiva (acota la memoria)
+BRUTE_FORCE_CHUNK = 4096
+
+# Máximo de colores por petición a /api/nearest-colors
+NEAREST_MAX_COLORS = int(os.environ.get("BEAUTY_NEAREST_MAX_COLORS", 100000))
+
+def collect_swatches(seasons: Dict[str, Dict[str, Any]],
+                     color_database: Optional[Dict[str, Any]] = None) -> List[Dict[str, str]]:
+    """Reunir todas las muestras conocidas con su procedencia"""
+    swatches = []
+    for season_key, season in seasons.items():
+        for group in ("best_colors", "avoid_colors"):
+            for color in season.get(group, []):
+                swatches.append({
+                    "hex": color, "source": "season", "season": season_key,
+                    "season_name": season["name"], "group": group
+                })
+
+    if color_database:
+        for skin_tone, info in color_database.get("skin_tones", {}).items():
+            for group in ("base_colors", "best_colors", "avoid_colors"):
+                for color in info.get(group, []):
+                    swatches.append({"hex": color, "source": "skin_tone", "skin_tone": skin_tone, "group": group})
+        for event_type, info in color_database.get("event_palettes", {}).items():
+            for group, colors in info.items():
+                if isinstance(colors, list):
+                    for color in colors:
+                        swatches.append({"hex": color, "source": "event", "event_type": event_type, "group": group})
+
+    return swatches
+
+class ColorIndex:
+    """Índice de vecinos más cercanos sobre coordenadas Lab (KD-tree si SciPy está disponible)"""
+
+    def __init__(self, swatches: List[Dict[str, str]]):
+        if not swatches:
+            raise ValueError("El índice necesita al menos una muestra")
+        self.swatches = swatches
+        self.lab = ints_to_lab_array([hex_to_int(swatch["hex"]) for swatch in swatches])
+        self._lab_sq = (self.lab ** 2).sum(axis=1)
+        self._tree = cKDTree(self.lab) if cKDTree is not None else None
+
+    def __len__(self) -> int:
+        return len(self.swatches)
+
+    @property
+    def method(self) -> str:
+        return "kd_tree" if self._tree is not None else "brute_force"
+
+    def query_lab(self, points: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Distancias (M, k) e índices (M, k) de las k muestras más cercanas a cada punto Lab"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        k = max(1, min(k, len(self)))
+
+        if self._tree is not None:
+            distances, indices = self._tree.query(points, k=k)
+            return distances.reshape(len(points), k), indices.reshape(len(points), k)
+
+        distances = np.empty((len(points), k))
+        indices = np.empty((len(points), k), dtype=np.int64)
+        for start in range(0, len(points), BRUTE_FORCE_CHUNK):
+            chunk = points[start:start + BRUTE_FORCE_CHUNK]
+            # |p - q|² = |p|² - 2 p·q + |q|²
+            d2 = (chunk ** 2).sum(axis=1)[:, None] - 2.0 * chunk @ self.lab.T + self._lab_sq[None, :]
+            np.maximum(d2, 0.0, out=d2)
+            if k < len(self):
+                candidates = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            else:
+                candidates = np.broadcast_to(np.arange(len(self)), d2.shape)
+            candidate_d2 = np.take_along_axis(d2, candidates, axis=1)
+            order = np.argsort(candidate_d2, axis=1, kind="stable")
+            indices[start:start + len(chunk)] = np.take_along_axis(candidates, order, axis=1)
+            distances[start:start + len(chunk)] = np.sqrt(np.take_along_axis(candidate_d2, order, axis=1))
+        return distances, indices
+
+    def query_colors(self, colors: List[str], k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Como query_lab, para colores hex; cada color distinto se busca una sola vez"""
+        values = np.array([hex_to_int(color) for color in colors], dtype=np.int64)
+        unique, inverse = np.unique(values, return_inverse=True)
+        distances, indices = self.query_lab(ints_to_lab_array(unique), k)
+        inverse = inverse.reshape(-1)
+        return distances[inverse], indices[inverse]
+
+    def nearest(self, colors: List[str], k: int = 1) -> List[List[Dict[str, Any]]]:
+        """Las k muestras más cercanas a cada color, con su procedencia y distancia ΔE76"""
+        distances, indices = self.query_colors(colors, k)
+        return [
+            [dict(self.swatches[index], distance=round(float(distance), 2))
+             for distance, index in zip(row_distances.tolist(), row_indices.tolist())]
+            for row_distances, row_indices in zip(distances, indices)
+        ]
+
+def build_season_index(seasons: Dict[str, Dict[str, Any]]) -> ColorIndex:
+    """Índice solo con los colores recomendados de cada estación, para clasificar"""
+    return ColorIndex([swatch for swatch in collect_swatches(seasons) if swatch["group"] == "best_colors"])
+
+def nearest_colors(index: ColorIndex, season_index: ColorIndex, colors: List[str], k: int = 3) -> List[Dict[str, Any]]:
+    """Vecinos más cercanos y estación recomendada más cercana para cada color"""
+    matches = index.nearest(colors, k)
+    seasons = season_index.nearest(colors, 1)
+    return [
+        {
+            "color": color,
+            "season": {
+                "key": season[0]["season"],
+                "name": season[0]["season_name"],
+                "swatch": season[0]["hex"],
+                "distance": season[0]["distance"]
+            },
+            "matches": color_matches
+        }
+        for color, color_matches, season in zip(colors, matches, seasons)
+    ]
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Serialización JSON rápida
+Usa orjson si está instalado y la biblioteca estándar si no; las respuestas de FastAPI y el
+almacenamiento comparten el mismo codificador
+"""
+
+import json
+from typing import Any, Optional, Union
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional: mismo formato con json estándar
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj: Any, indent: Optional[int] = None) -> bytes:
+        """Codificar a JSON UTF-8 compacto (o con sangría de 2 espacios)"""
+        if indent is None:
+            return orjson.dumps(obj, option=_OPTIONS)
+        if indent == 2:
+            return orjson.dumps(obj, option=_OPTIONS | orjson.OPT_INDENT_2)
+        return json.dumps(obj, ensure_ascii=False, indent=indent).encode("utf-8")
+
+    loads = orjson.loads
+else:
+    def dumps(obj: Any, indent: Optional[int] = None) -> bytes:
+        """Codificar a JSON UTF-8 compacto (o con sangría de 2 espacios)"""
+        separators = (",", ":") if indent is None else None
+        return json.dumps(obj, ensure_ascii=False, indent=indent, separators=separators).encode("utf-8")
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+def dumps_str(obj: Any) -> str:
+    """Codificar a una cadena JSON compacta (columnas de texto, líneas de diario)"""
+    return dumps(obj).decode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """Respuesta JSON codificada con el serializador rápido
+
+    Devolverla directamente desde un endpoint evita además el paso por jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -4,17 +4,18 @@ Beauty Palette Server Integrado
 Combina servidor FastAPI existente con funcionalidad MCP avanzada
 """
 
-import json
 import os
-import colorsys
+import functools
+import itertools
 import random
-from typing import Dict, List, Any, Optional
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, File, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-import uvicorn
+from fastapi.responses import FileResponse, HTMLResponse, Response, StreamingResponse
 
 # Importar funciones del servidor MCP
 from metodos_server import (
@@ -22,12 +23,51 @@ from metodos_server import (
     tool_create_profile,
     tool_show_profile,
     tool_list_profiles,
+    list_limit_error,
+    iter_profile_summaries,
+    tool_query_segment,
     tool_delete_profile,
     tool_generate_palette,
+    tool_list_palettes,
     tool_quick_palette,
-    tool_export_data,
-    ColorAnalyzer
+    get_cached_profile,
+    export_info,
+    export_summary,
+    iter_export_palettes,
+    export_jobs,
+    tool_start_export_job,
+    tool_export_job_status,
+    tool_batch_create_profiles,
+    tool_batch_generate_palettes,
+    quick_palette_key,
+    cached_quick_palette,
+    stamp_quick_palette,
+    prewarm_palette_cache,
+    QUICK_PALETTE_TYPES,
+    QUICK_SKIN_TONES,
+    QUICK_UNDERTONES,
+    QUICK_EVENT_TYPES,
+    ColorAnalyzer,
+    color_rules
 )
+from json_rapido import FastJSONResponse, dumps
+from exportacion import COMPRESSION_MEDIA_TYPES
+from importacion import IMPORT_FORMATS, detect_format, import_profiles
+from servicios import get_executor, run_tool, shutdown_tools
+from armonia import score_harmony
+from cache_respuestas import response_cache
+from indice_colores import (
+    ColorIndex, collect_swatches, build_season_index, nearest_colors, NEAREST_MAX_COLORS
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Ciclo de vida: precalentar las cachés de este worker y liberar el pool de herramientas al apagar"""
+    precompute_quick_palette_responses()
+    prewarm_palette_cache()
+    get_executor()
+    yield
+    shutdown_tools()
 
 # Configuración del servidor
 app = FastAPI(
@@ -35,7 +75,9 @@ app = FastAPI(
     description="Servidor completo con análisis MCP avanzado y API REST",
     version="3.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Configurar CORS
@@ -138,6 +180,22 @@ class IntegratedBeautyServer:
             }
         ]
     
+    def analyze_color_harmony_cached(self, colors: List[str]) -> Dict[str, Any]:
+        """Análisis de armonía desde la caché de respuestas
+        
+        La puntuación no depende del orden de los colores y la armonía generada solo
+        del primero, así que la clave es el color base más el conjunto ordenado.
+        """
+        payload = {
+            "base": colors[0] if colors else None,
+            "colors": sorted(str(color).upper() for color in colors)
+        }
+        return response_cache.get_or_compute(
+            "harmony", payload,
+            lambda: self.analyze_color_harmony_advanced(colors),
+            cacheable=lambda analysis: "error" not in analysis
+        )
+    
     def analyze_color_harmony_advanced(self, colors: List[str]) -> Dict[str, Any]:
         """Análisis de armonía usando ColorAnalyzer del MCP"""
         if len(colors) < 2:
@@ -147,12 +205,15 @@ class IntegratedBeautyServer:
             # Usar el analizador MCP más avanzado
             harmony_palette = ColorAnalyzer.generate_harmony_palette(colors, "complementary")
             
-            # Análisis básico de compatibilidad
-            score = random.randint(70, 95)  # Simulado, puedes implementar lógica real
+            # Puntuación determinista en espacio perceptual (LCh)
+            harmony = score_harmony(colors)
+            score = harmony["harmony_score"]
             
             return {
                 "harmony_score": score,
-                "harmony_type": "Análisis MCP Avanzado",
+                "harmony_type": harmony["harmony_type"],
+                "components": harmony["components"],
+                "temperature": harmony["temperature"],
                 "generated_harmony": harmony_palette[:5],
                 "analysis": f"Paleta analizada con algoritmo MCP. Score: {score}%",
                 "mcp_integration": True
@@ -163,6 +224,37 @@ class IntegratedBeautyServer:
 # Instancia del servidor integrado
 server = IntegratedBeautyServer()
 
+# Índices de vecinos más cercanos sobre todas las muestras conocidas (espacio Lab)
+color_index = ColorIndex(collect_swatches(ColorAnalyzer.SEASONS, server.color_database))
+season_color_index = build_season_index(ColorAnalyzer.SEASONS)
+
+# === RESPUESTAS PRE-SERIALIZADAS DE /mcp/quick-palette ===
+
+# Marcador único que se reemplaza por la marca de tiempo de cada petición
+_TIMESTAMP_MARKER = f"generated_at-{uuid.uuid4().hex}"
+
+@functools.lru_cache(maxsize=1024)
+def quick_palette_response_parts(palette_type: str, skin_tone: str, undertone: str,
+                                 event_type: str) -> Tuple[bytes, bytes]:
+    """Cuerpo JSON de /mcp/quick-palette partido alrededor de generated_at"""
+    body = cached_quick_palette(palette_type, skin_tone, undertone, event_type)
+    content = {
+        "success": True,
+        "data": stamp_quick_palette(body, _TIMESTAMP_MARKER),
+        "type": "Quick MCP Palette"
+    }
+    encoded = dumps(content)
+    prefix, suffix = encoded.split(_TIMESTAMP_MARKER.encode("utf-8"))
+    return prefix, suffix
+
+def precompute_quick_palette_responses():
+    """Serializar por adelantado todas las respuestas rápidas conocidas"""
+    for palette_type in QUICK_PALETTE_TYPES:
+        for skin_tone in QUICK_SKIN_TONES:
+            for undertone in QUICK_UNDERTONES:
+                for event_type in QUICK_EVENT_TYPES:
+                    quick_palette_response_parts(palette_type, skin_tone, undertone, event_type)
+
 # === ENDPOINTS EXISTENTES (mantener compatibilidad) ===
 
 @app.get("/", response_class=HTMLResponse)
@@ -203,7 +295,12 @@ async def root():
         
         <div class="section new">
             <div class="method">GET /mcp/profiles</div>
-            <p>Listar todos los perfiles</p>
+            <p>Listar perfiles paginados (limit, cursor, filtros skin_tone/undertone/season, format=ndjson)</p>
+        </div>
+        
+        <div class="section new">
+            <div class="method">GET /mcp/segments</div>
+            <p>Segmentos de usuarios por estación, subtono o tono de piel (índices secundarios)</p>
         </div>
         
         <div class="section new">
@@ -211,6 +308,31 @@ async def root():
             <p>Generar paleta con análisis MCP avanzado</p>
         </div>
         
+        <div class="section new">
+            <div class="method">GET /mcp/palettes/{{user_id}}</div>
+            <p>Historial de paletas paginado, de la más reciente a la más antigua (limit, cursor)</p>
+        </div>
+        
+        <div class="section new">
+            <div class="method">POST /mcp/export-jobs | GET /mcp/export-jobs/{{job_id}}</div>
+            <p>Exportación completa del almacenamiento a NDJSON comprimido en segundo plano, con estado y descarga</p>
+        </div>
+        
+        <div class="section new">
+            <div class="method">POST /mcp/batch/create-profiles | POST /mcp/batch/generate-palettes</div>
+            <p>Creación de perfiles y generación de paletas por lotes en una sola escritura</p>
+        </div>
+        
+        <div class="section new">
+            <div class="method">POST /mcp/import-profiles</div>
+            <p>Importación masiva de cuestionarios desde un archivo NDJSON o CSV, con informe de aceptados y rechazados</p>
+        </div>
+        
+        <div class="section new">
+            <div class="method">GET /mcp/rules | POST /mcp/rules/reload</div>
+            <p>Versión de las reglas de colorimetría y recarga en caliente</p>
+        </div>
+        
         <h2>🔄 Endpoints Existentes (compatibilidad)</h2>
         
         <div class="section">
@@ -228,6 +350,11 @@ async def root():
             <p>Análisis de armonía (ahora con integración MCP)</p>
         </div>
         
+        <div class="section">
+            <div class="method">POST /api/nearest-colors</div>
+            <p>Muestras y estación más cercanas a uno o varios colores (k vecinos en espacio Lab)</p>
+        </div>
+        
         <h2>📚 Documentación</h2>
         <p><a href="/docs">📖 Swagger UI</a> | <a href="/redoc">📘 ReDoc</a></p>
         
@@ -255,7 +382,8 @@ async def health_check():
             "original": 5,
             "mcp": 6,
             "total": 11
-        }
+        },
+        "response_cache": response_cache.stats()
     }
 
 # === NUEVOS ENDPOINTS MCP ===
@@ -264,7 +392,7 @@ async def health_check():
 async def create_mcp_profile(request: Dict[str, Any]):
     """Crear perfil usando el sistema MCP avanzado"""
     try:
-        result = tool_create_profile(request)
+        result = await run_tool(tool_create_profile, request)
         
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
@@ -283,31 +411,88 @@ async def create_mcp_profile(request: Dict[str, Any]):
 async def get_mcp_profile(user_id: str):
     """Obtener perfil MCP completo"""
     try:
-        result = tool_show_profile({"user_id": user_id})
+        result = await run_tool(tool_show_profile, {"user_id": user_id})
         
         if "error" in result:
             raise HTTPException(status_code=404, detail=result["error"])
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": result["profile"],
             "analysis_type": "MCP Advanced"
-        }
+        })
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/mcp/profiles")
-async def list_mcp_profiles():
-    """Listar todos los perfiles MCP"""
+async def list_mcp_profiles(limit: Optional[int] = None, cursor: Optional[str] = None,
+                            skin_tone: Optional[str] = None, undertone: Optional[str] = None,
+                            season: Optional[str] = None, format: str = "json"):
+    """Listar perfiles MCP paginados por cursor (format=ndjson para recibirlos en streaming)"""
+    args = {
+        "limit": limit,
+        "cursor": cursor,
+        "skin_tone": skin_tone,
+        "undertone": undertone,
+        "season": season
+    }
+    
+    if format == "ndjson":
+        # Validar antes de empezar la respuesta: un error a mitad del stream no llega al cliente
+        error = list_limit_error(limit)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+        
+        def stream_summaries():
+            summaries = iter_profile_summaries(args)
+            if limit is not None:
+                summaries = itertools.islice(summaries, limit)
+            for summary in summaries:
+                yield dumps(summary) + b"\n"
+        
+        return StreamingResponse(stream_summaries(), media_type="application/x-ndjson")
+    
     try:
-        result = tool_list_profiles({})
-        return {
+        result = await run_tool(tool_list_profiles, args)
+        
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        
+        return FastJSONResponse({
             "success": True,
             "data": result,
             "source": "MCP System"
-        }
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/mcp/segments")
+async def query_mcp_segment(skin_tone: Optional[str] = None, undertone: Optional[str] = None,
+                            season: Optional[str] = None, limit: Optional[int] = None,
+                            cursor: Optional[str] = None):
+    """Consultar segmentos de usuarios mediante los índices secundarios"""
+    try:
+        result = await run_tool(tool_query_segment, {
+            "skin_tone": skin_tone,
+            "undertone": undertone,
+            "season": season,
+            "limit": limit,
+            "cursor": cursor
+        })
+        
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        
+        return FastJSONResponse({
+            "success": True,
+            "data": result
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -315,7 +500,7 @@ async def list_mcp_profiles():
 async def delete_mcp_profile(user_id: str):
     """Eliminar perfil MCP"""
     try:
-        result = tool_delete_profile({"user_id": user_id})
+        result = await run_tool(tool_delete_profile, {"user_id": user_id})
         
         if "error" in result:
             raise HTTPException(status_code=404, detail=result["error"])
@@ -333,16 +518,34 @@ async def delete_mcp_profile(user_id: str):
 async def generate_mcp_palette(request: Dict[str, Any]):
     """Generar paleta usando el sistema MCP"""
     try:
-        result = tool_generate_palette(request)
+        result = await run_tool(tool_generate_palette, request)
         
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": result["palette"],
             "analysis_type": "MCP Advanced Colorimetry"
-        }
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/mcp/palettes/{user_id}")
+async def list_mcp_palettes(user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None):
+    """Historial de paletas de un usuario ordenado por generated_at (más recientes primero)"""
+    try:
+        result = await run_tool(tool_list_palettes, {"user_id": user_id, "limit": limit, "cursor": cursor})
+        
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        
+        return FastJSONResponse({
+            "success": True,
+            "data": result
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -352,6 +555,13 @@ async def generate_mcp_palette(request: Dict[str, Any]):
 async def generate_quick_mcp_palette(request: Dict[str, Any]):
     """Generar paleta rápida MCP sin perfil"""
     try:
+        key = quick_palette_key(request)
+        if all(isinstance(value, str) for value in key):
+            # Servir desde memoria: solo se inserta la marca de tiempo
+            prefix, suffix = quick_palette_response_parts(*key)
+            timestamp = datetime.now().isoformat().encode("utf-8")
+            return Response(content=prefix + timestamp + suffix, media_type="application/json")
+        
         result = tool_quick_palette(request)
         return {
             "success": True,
@@ -361,25 +571,159 @@ async def generate_quick_mcp_palette(request: Dict[str, Any]):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/mcp/rules")
+async def get_mcp_rules():
+    """Versión y origen de las reglas de colorimetría vigentes"""
+    color_rules.get()  # Detectar cambios pendientes en el archivo de reglas
+    return {"success": True, "rules": color_rules.info()}
+
+@app.post("/mcp/rules/reload")
+async def reload_mcp_rules():
+    """Recargar las reglas desde BEAUTY_RULES_FILE sin reiniciar el servidor"""
+    try:
+        await run_tool(color_rules.reload)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Reglas no válidas: {e}")
+    return {"success": True, "rules": color_rules.info()}
+
 @app.get("/mcp/export/{user_id}")
 async def export_mcp_data(user_id: str):
-    """Exportar datos completos del usuario"""
+    """Exportar datos completos del usuario
+    
+    El documento es el mismo de siempre, pero las paletas se leen y se envían de una en
+    una: la memoria no depende del tamaño del historial.
+    """
     try:
-        result = tool_export_data({"user_id": user_id})
+        profile = await run_tool(get_cached_profile, user_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not profile:
+        raise HTTPException(status_code=404, detail=f"Perfil {user_id} no encontrado")
+    
+    def stream_export():
+        yield (b'{"success":true,"data":{"export_info":' + dumps(export_info(user_id))
+               + b',"profile":' + dumps(profile) + b',"palettes":[')
+        total = 0
+        for palette in iter_export_palettes(user_id):
+            yield (b"," if total else b"") + dumps(palette)
+            total += 1
+        yield b']},"summary":' + dumps(export_summary(profile, total)) + b"}"
+    
+    return StreamingResponse(stream_export(), media_type="application/json")
+
+@app.post("/mcp/export-jobs", status_code=202)
+async def start_export_job(request: Optional[Dict[str, Any]] = None):
+    """Iniciar la exportación completa del almacenamiento (NDJSON gzip/zstd en segundo plano)"""
+    result = await run_tool(tool_start_export_job, request or {})
+    
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    
+    return {
+        "success": True,
+        "data": result["job"],
+        "status_url": f"/mcp/export-jobs/{result['job']['job_id']}"
+    }
+
+@app.get("/mcp/export-jobs")
+async def list_export_jobs():
+    """Trabajos de exportación completa, del más reciente al más antiguo"""
+    return {"success": True, "data": await run_tool(export_jobs.list_jobs)}
+
+@app.get("/mcp/export-jobs/{job_id}")
+async def get_export_job(job_id: str):
+    """Estado y progreso de un trabajo de exportación"""
+    result = await run_tool(tool_export_job_status, {"job_id": job_id})
+    
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    
+    job = result["job"]
+    return {
+        "success": True,
+        "data": job,
+        "download_url": f"/mcp/export-jobs/{job_id}/download" if job["status"] == "completed" else None
+    }
+
+@app.get("/mcp/export-jobs/{job_id}/download")
+async def download_export_job(job_id: str):
+    """Descargar el archivo de un trabajo de exportación terminado"""
+    path = await run_tool(export_jobs.file_path, job_id)
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"Exportación {job_id} no disponible")
+    
+    compression = "zstd" if path.endswith(".zst") else "gzip"
+    return FileResponse(path, media_type=COMPRESSION_MEDIA_TYPES[compression], filename=os.path.basename(path))
+
+@app.post("/mcp/batch/create-profiles")
+async def batch_create_mcp_profiles(request: Dict[str, Any]):
+    """Crear muchos perfiles en una sola escritura (resultado por elemento)"""
+    try:
+        result = await run_tool(tool_batch_create_profiles, request)
         
         if "error" in result:
-            raise HTTPException(status_code=404, detail=result["error"])
+            raise HTTPException(status_code=400, detail=result["error"])
         
-        return {
+        return FastJSONResponse({
             "success": True,
-            "data": result["exported_data"],
-            "summary": result["summary"]
-        }
+            "data": result,
+            "message": f"{result['created']} de {result['total']} perfiles creados"
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/mcp/batch/generate-palettes")
+async def batch_generate_mcp_palettes(request: Dict[str, Any]):
+    """Generar paletas para muchos perfiles en una sola escritura (resultado por elemento)"""
+    try:
+        result = await run_tool(tool_batch_generate_palettes, request)
+        
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        
+        return FastJSONResponse({
+            "success": True,
+            "data": result,
+            "analysis_type": "MCP Advanced Colorimetry"
+        })
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/mcp/import-profiles")
+async def import_mcp_profiles(file: UploadFile = File(...), format: Optional[str] = None):
+    """Importar perfiles desde un archivo NDJSON o CSV subido (multipart, campo 'file')"""
+    fmt = format or detect_format(file.filename, file.content_type)
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato no reconocido; indica format ({', '.join(IMPORT_FORMATS)}) o usa extensión .ndjson/.csv"
+        )
+    
+    try:
+        # El archivo subido ya está en disco (o en memoria si es pequeño): se lee fila a fila
+        result = await run_tool(import_profiles, file.file, fmt)
+        
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        
+        return FastJSONResponse({
+            "success": True,
+            "data": result,
+            "message": f"{result['accepted']} de {result['total_rows']} perfiles importados"
+        })
+    except HTTPException:
+        raise
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="El archivo debe estar codificado en UTF-8")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await file.close()
+
 # === ENDPOINTS EXISTENTES MEJORADOS ===
 
 @app.post("/api/generate-palette")
@@ -400,7 +744,7 @@ async def generate_palette_original(request: Dict[str, Any]):
                     "palette_type": palette_type,
                     "event_type": event_type
                 }
-                mcp_result = tool_generate_palette(mcp_request)
+                mcp_result = await run_tool(tool_generate_palette, mcp_request)
                 
                 if "error" not in mcp_result:
                     return {
@@ -454,7 +798,7 @@ async def analyze_harmony_enhanced(request: Dict[str, Any]):
         
         if use_mcp:
             # Usar análisis MCP avanzado
-            analysis = server.analyze_color_harmony_advanced(colors)
+            analysis = await run_tool(server.analyze_color_harmony_cached, colors)
         else:
             # Análisis básico original
             analysis = {
@@ -463,16 +807,49 @@ async def analyze_harmony_enhanced(request: Dict[str, Any]):
                 "analysis": "Análisis básico de compatibilidad"
             }
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": analysis,
             "colors_analyzed": len(colors),
             "analysis_method": "MCP Advanced" if use_mcp else "Basic"
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/nearest-colors")
+async def find_nearest_colors(request: Dict[str, Any]):
+    """Muestras conocidas y estación más cercanas (ΔE en Lab) para uno o varios colores"""
+    try:
+        colors = request.get("colors")
+        if colors is None and request.get("color"):
+            colors = [request["color"]]
+        k = request.get("k", 3)
+        
+        if not isinstance(colors, list) or not colors:
+            raise HTTPException(status_code=400, detail="Se requiere 'colors' (lista de colores hex)")
+        if len(colors) > NEAREST_MAX_COLORS:
+            raise HTTPException(status_code=400, detail=f"Máximo {NEAREST_MAX_COLORS} colores por petición")
+        if not isinstance(k, int) or k < 1:
+            raise HTTPException(status_code=400, detail="'k' debe ser un entero positivo")
+        
+        try:
+            results = await run_tool(nearest_colors, color_index, season_color_index, colors, k)
+        except (ValueError, AttributeError, TypeError):
+            raise HTTPException(status_code=400, detail="Color hex no válido")
+        
+        return FastJSONResponse({
+            "success": True,
+            "k": min(k, len(color_index)),
+            "index_method": color_index.method,
+            "total_swatches": len(color_index),
+            "results": results
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/quote")
 async def get_quote_original(category: str = None):
     """Citas inspiracionales (endpoint original)"""
@@ -499,17 +876,6 @@ async def get_quote_original(category: str = None):
 
 # Configuración del servidor
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 8000))
-    
-    print("🚀 Iniciando Beauty Server Integrado...")
-    print(f"📍 Puerto: {port}")
-    print("🌐 URL: https://beauty-pallet-server.railway.app")
-    print("🔬 Funcionalidades: FastAPI + MCP Advanced")
-    print("📚 Docs: /docs")
-    
-    uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=port,
-        log_level="info"
-    )
\ No newline at end of file
+    # Mismo arranque que en producción (workers, uvloop/httptools, apagado ordenado)
+    from servidor_produccion import run
+    run()
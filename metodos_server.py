@@ -4,35 +4,143 @@ Sistema Avanzado de Análisis de Belleza y Colorimetría Profesional
 Basado en la teoría de las estaciones de color y análisis científico de subtonos
 """
 
-import json
+import functools
+import itertools
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
-import colorsys
-import math
+from typing import Dict, Any, List, Optional, Tuple, Iterator, Union
+
+import numpy as np
+
+from almacenamiento import JSONFileStorage, SQLiteStorage, create_storage
+from cache_respuestas import response_cache
+from reglas_color import RulesRegistry
+from modelos import Profile, SeasonRecordCodec, compact_profile, expand
+from exportacion import ExportJobs, available_compressions
+from colorimetria import (
+    hex_to_hls, hls_to_hex, hex_array_to_rgb, rgb_to_hls_array, hls_to_rgb_array,
+    quantize_rgb, ints_to_hex, lighten_hex
+)
 
 # Archivo de almacenamiento
 DATA_FILE = "beauty_profiles.json"
+DB_FILE = os.environ.get("BEAUTY_DB_FILE", "beauty_profiles.db")
+STORAGE_BACKEND = os.environ.get("BEAUTY_STORAGE", "sqlite")
+
+storage = create_storage(STORAGE_BACKEND, json_path=DATA_FILE, db_path=DB_FILE)
 
 def init_data_storage():
-    """Inicializar el archivo de almacenamiento de datos"""
-    if not os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump({"profiles": {}, "palettes": {}}, f, ensure_ascii=False, indent=2)
+    """Inicializar el almacenamiento de datos (importa el JSON anterior si la base está vacía)"""
+    storage.init()
+    if isinstance(storage, SQLiteStorage) and os.path.exists(DATA_FILE) and storage.is_empty():
+        storage.import_if_empty(JSONFileStorage(DATA_FILE, codec=record_codec))
+
+# ============================================================================
+# CACHÉ DE PERFILES EN MEMORIA
+# ============================================================================
+
+PROFILE_CACHE_SIZE = int(os.environ.get("BEAUTY_PROFILE_CACHE_SIZE", 1024))
+
+class ProfileCache:
+    """Caché LRU acotada de perfiles, invalidada cuando cambia el almacenamiento subyacente
+    
+    Guarda los perfiles como modelos compactos (modelos.Profile) y los expande al leerlos.
+    """
+    
+    def __init__(self, maxsize: int = PROFILE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, Union[Profile, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+    
+    def _sync_version(self):
+        """Vaciar la caché si otro proceso o herramienta modificó los perfiles"""
+        version = storage.profiles_version()
+        if version != self._version:
+            self._items.clear()
+            self._version = version
+    
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._sync_version()
+            profile = self._items.get(user_id)
+            if profile is None:
+                return None
+            self._items.move_to_end(user_id)
+        return expand(profile, ColorAnalyzer.SEASONS)
+    
+    def put(self, user_id: str, profile: Dict[str, Any], read_version: Any = None):
+        """Guardar un perfil recién leído o escrito (write-through)
+        
+        read_version es la versión del almacenamiento anterior a la lectura del perfil:
+        si cambió desde entonces, el perfil leído puede estar obsoleto y no se guarda.
+        """
+        if self.maxsize <= 0:
+            return
+        compact = compact_profile(profile, ColorAnalyzer.SEASONS)
+        with self._lock:
+            if read_version is not None:
+                self._sync_version()
+                if self._version != read_version:
+                    return
+            self._items[user_id] = compact
+            self._items.move_to_end(user_id)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+    
+    def discard(self, user_id: str):
+        with self._lock:
+            self._items.pop(user_id, None)
+    
+    def write_version(self) -> Any:
+        """Versión del almacenamiento justo antes de una escritura propia (para mark_written)"""
+        return storage.profiles_version()
+    
+    def mark_written(self, before: Any):
+        """Registrar una escritura propia hecha sobre la versión before
+        
+        La caché se conserva solo si el motor cuenta las escrituras (storage.counts_versions,
+        el contador de SQLite), estaba al día con before y la versión avanzó exactamente en
+        esa escritura. Si otro worker escribió entre medias, o el motor no cuenta las
+        escrituras (el mtime del JSON no dice cuántas hubo), se vacía.
+        """
+        with self._lock:
+            after = storage.profiles_version()
+            own_write_only = (
+                storage.counts_versions and before == self._version and after in (before, before + 1)
+            )
+            if not own_write_only:
+                self._items.clear()
+            self._version = after
+    
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._version = None
+
+profile_cache = ProfileCache()
+
+def get_cached_profile(user_id: str) -> Optional[Dict[str, Any]]:
+    """Obtener un perfil desde la caché, leyendo del almacenamiento solo si hace falta"""
+    profile = profile_cache.get(user_id)
+    if profile is None:
+        # Versión previa a la lectura: una escritura posterior descarta el perfil leído
+        version = storage.profiles_version()
+        profile = storage.get_profile(user_id)
+        if profile is not None:
+            profile_cache.put(user_id, profile, read_version=version)
+    return profile
 
 def load_data() -> Dict[str, Any]:
-    """Cargar datos del archivo"""
-    try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        init_data_storage()
-        return {"profiles": {}, "palettes": {}}
+    """Cargar todos los datos (compatibilidad; preferir las operaciones por perfil de storage)"""
+    return storage.load_all()
 
 def save_data(data: Dict[str, Any]):
-    """Guardar datos al archivo"""
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    """Guardar todos los datos (compatibilidad; preferir las operaciones por perfil de storage)"""
+    storage.save_all(data)
+    profile_cache.clear()
 
 # ============================================================================
 # SISTEMA DE COLORIMETRÍA PROFESIONAL
@@ -130,34 +238,9 @@ class ColorAnalyzer:
         - Bronceado fácil = cálido, quemado = frío
         - Labios rosados = frío, durazno = cálido
         """
-        score = 0  # Negativo = frío, Positivo = cálido
-        
-        # Análisis de color de venas (40% del peso)
-        vein_scores = {
-            "azul": -2, "azul_verdoso": -1, "purpura": -1,
-            "verde": 2, "verde_oliva": 2, "indefinido": 0
-        }
-        score += vein_scores.get(vein_color, 0) * 2
-        
-        # Preferencia de joyería (30% del peso)
-        jewelry_scores = {"plata": -1.5, "oro": 1.5, "ambos": 0}
-        score += jewelry_scores.get(jewelry_preference, 0)
-        
-        # Reacción al sol (20% del peso)
-        sun_scores = {"se_quema": -1, "broncea_despacio": -0.5, "broncea_facil": 1}
-        score += sun_scores.get(sun_reaction, 0)
-        
-        # Color natural de labios (10% del peso)
-        lip_scores = {"rosado": -0.5, "coral": 0, "durazno": 0.5}
-        score += lip_scores.get(natural_lip_color, 0)
-        
-        # Determinar subtono
-        if score <= -1:
-            undertone = "frio"
-        elif score >= 1:
-            undertone = "calido"  
-        else:
-            undertone = "neutro"
+        rules = color_rules.get()
+        score = rules.undertone_score(vein_color, jewelry_preference, sun_reaction, natural_lip_color)
+        undertone = rules.classify_undertone(score)
             
         return {
             "undertone": undertone,
@@ -179,61 +262,28 @@ class ColorAnalyzer:
         - INVIERNO: Cualquier piel + subtono frío + contraste alto
         """
         
-        # Matriz de decisión basada en teoría de colorimetría
-        season_matrix = {
-            ("clara", "calido", "bajo"): "primavera_clara",
-            ("clara", "calido", "medio"): "primavera_calida", 
-            ("clara", "calido", "alto"): "primavera_calida",
-            ("clara", "frio", "bajo"): "verano_suave",
-            ("clara", "frio", "medio"): "verano_frio",
-            ("clara", "frio", "alto"): "invierno_brillante",
-            ("clara", "neutro", "bajo"): "verano_suave",
-            ("clara", "neutro", "medio"): "verano_frio",
-            ("clara", "neutro", "alto"): "invierno_brillante",
-            
-            ("media", "calido", "bajo"): "otono_suave",
-            ("media", "calido", "medio"): "primavera_calida",
-            ("media", "calido", "alto"): "otono_profundo",
-            ("media", "frio", "bajo"): "verano_suave", 
-            ("media", "frio", "medio"): "verano_frio",
-            ("media", "frio", "alto"): "invierno_profundo",
-            ("media", "neutro", "bajo"): "otono_suave",
-            ("media", "neutro", "medio"): "verano_frio", 
-            ("media", "neutro", "alto"): "invierno_profundo",
-            
-            ("oscura", "calido", "bajo"): "otono_suave",
-            ("oscura", "calido", "medio"): "otono_profundo",
-            ("oscura", "calido", "alto"): "otono_profundo", 
-            ("oscura", "frio", "bajo"): "invierno_profundo",
-            ("oscura", "frio", "medio"): "invierno_profundo",
-            ("oscura", "frio", "alto"): "invierno_profundo",
-            ("oscura", "neutro", "bajo"): "invierno_profundo",
-            ("oscura", "neutro", "medio"): "invierno_profundo",
-            ("oscura", "neutro", "alto"): "invierno_profundo",
-        }
-        
-        # Ajustar contraste basado en color de ojos y cabello
-        contrast_adjustments = {
-            ("negro", "azul"): "alto",
-            ("negro", "verde"): "alto", 
-            ("rubio", "cafe"): "medio",
-            ("rubio", "azul"): "bajo",
-            ("castano", "verde"): "medio",
-            ("pelirrojo", "verde"): "alto"
-        }
-        
-        adjusted_contrast = contrast_adjustments.get((hair_color, eye_color), contrast_level)
-        
-        season_key = (skin_tone, undertone, adjusted_contrast)
-        season = season_matrix.get(season_key, "verano_suave")  # Default
+        # Matriz de decisión y ajustes de contraste compilados en reglas_color
+        rules = color_rules.get()
+        adjusted_contrast = rules.adjusted_contrast(hair_color, eye_color, contrast_level)
+        season = rules.season_for(skin_tone, undertone, adjusted_contrast)
+        season_info = ColorAnalyzer.SEASONS[season]
         
         return {
             "season": season,
-            "season_info": ColorAnalyzer.SEASONS[season],
-            "confidence": 85,  # Alta confianza con este análisis detallado
-            "reasoning": f"Piel {skin_tone} + subtono {undertone} + contraste {adjusted_contrast} = {ColorAnalyzer.SEASONS[season]['name']}"
+            "season_info": season_info,
+            "confidence": rules.confidence,  # Alta confianza con este análisis detallado
+            "reasoning": f"Piel {skin_tone} + subtono {undertone} + contraste {adjusted_contrast} = {season_info['name']}",
+            "rules_version": rules.version
         }
 
+    # Desplazamientos de matiz (fracción de la rueda) encadenados para cada miembro de la armonía
+    HARMONY_HUE_STEPS = {
+        "complementary": [(0.5,)],
+        "analogous": [(0.083,), (-0.083,)],                  # ±30°
+        "triadic": [(0.333,), (0.667,)],                     # +120°, +240°
+        "split_complementary": [(0.5, 0.083), (0.5, -0.083)]  # Complementario ±30°
+    }
+
     @staticmethod
     def generate_harmony_palette(base_colors: List[str], harmony_type: str = "complementary") -> List[str]:
         """
@@ -245,160 +295,286 @@ class ColorAnalyzer:
         - triadic: Tres colores equidistantes
         - split_complementary: Base + dos colores a los lados del complementario
         """
-        
-        def hex_to_hsl(hex_color: str) -> Tuple[float, float, float]:
-            """Convertir hex a HSL"""
-            hex_color = hex_color.lstrip('#')
-            r, g, b = [int(hex_color[i:i+2], 16)/255.0 for i in (0, 2, 4)]
-            return colorsys.rgb_to_hls(r, g, b)
-        
-        def hsl_to_hex(h: float, l: float, s: float) -> str:
-            """Convertir HSL a hex"""
-            r, g, b = colorsys.hls_to_rgb(h, l, s)
-            return f"#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}"
-        
         if not base_colors:
             return []
             
         # Usar el primer color como base
         base_hex = base_colors[0]
-        h, l, s = hex_to_hsl(base_hex)
+        h, l, s = hex_to_hls(base_hex)
         
         harmonies = []
         
-        if harmony_type == "complementary":
-            comp_h = (h + 0.5) % 1.0
-            harmonies = [base_hex, hsl_to_hex(comp_h, l, s)]
-            
-        elif harmony_type == "analogous":
-            harmonies = [
-                base_hex,
-                hsl_to_hex((h + 0.083) % 1.0, l, s),  # +30°
-                hsl_to_hex((h - 0.083) % 1.0, l, s)   # -30°
-            ]
-            
-        elif harmony_type == "triadic":
-            harmonies = [
-                base_hex,
-                hsl_to_hex((h + 0.333) % 1.0, l, s),  # +120°
-                hsl_to_hex((h + 0.667) % 1.0, l, s)   # +240°
-            ]
-            
-        elif harmony_type == "split_complementary":
-            comp_h = (h + 0.5) % 1.0
-            harmonies = [
-                base_hex,
-                hsl_to_hex((comp_h + 0.083) % 1.0, l, s),  # Comp +30°
-                hsl_to_hex((comp_h - 0.083) % 1.0, l, s)   # Comp -30°
-            ]
+        if harmony_type in ColorAnalyzer.HARMONY_HUE_STEPS:
+            harmonies = [base_hex]
+            for steps in ColorAnalyzer.HARMONY_HUE_STEPS[harmony_type]:
+                hue = h
+                for step in steps:
+                    hue = (hue + step) % 1.0
+                harmonies.append(hls_to_hex(hue, l, s))
         
         # Agregar variaciones de luminosidad
         variations = []
         for color in harmonies:
-            h, l, s = hex_to_hsl(color)
+            h, l, s = hex_to_hls(color)
             variations.extend([
                 color,  # Original
-                hsl_to_hex(h, min(l + 0.2, 1.0), s),  # Más claro
-                hsl_to_hex(h, max(l - 0.2, 0.0), s)   # Más oscuro
+                hls_to_hex(h, min(l + 0.2, 1.0), s),  # Más claro
+                hls_to_hex(h, max(l - 0.2, 0.0), s)   # Más oscuro
             ])
         
-        return list(set(variations))  # Remover duplicados
+        return list(dict.fromkeys(variations))  # Remover duplicados conservando el orden
+
+    @staticmethod
+    def generate_harmony_palettes_batch(base_colors: List[str],
+                                        harmony_types: List[str]) -> List[Dict[str, List[str]]]:
+        """
+        Generar armonías para N colores base y varios tipos de armonía en una sola pasada
+        
+        Todo el cálculo (parseo hex, conversión HLS, rotación de matiz y variaciones de
+        luminosidad) se hace con operaciones de arrays NumPy. Devuelve, alineado con
+        base_colors, un diccionario {tipo_de_armonía: colores} por color base, con los
+        mismos colores y el mismo orden que generate_harmony_palette.
+        """
+        if not base_colors:
+            return []
+        
+        base_rgb = hex_array_to_rgb(base_colors)
+        h, l, s = rgb_to_hls_array(base_rgb)
+        results: List[Dict[str, List[str]]] = [{} for _ in base_colors]
+        
+        for harmony_type in harmony_types:
+            if harmony_type not in ColorAnalyzer.HARMONY_HUE_STEPS:
+                for result in results:
+                    result[harmony_type] = []
+                continue
+            
+            # Miembros generados: (N, k) matices rotados, cuantizados a 8 bits como en la versión escalar
+            hues = []
+            for steps in ColorAnalyzer.HARMONY_HUE_STEPS[harmony_type]:
+                hue = h
+                for step in steps:
+                    hue = np.mod(hue + step, 1.0)
+                hues.append(hue)
+            hues = np.stack(hues, axis=1)
+            member_ints = quantize_rgb(hls_to_rgb_array(hues, l[:, None], s[:, None]))
+            
+            # HLS de todos los miembros (el color base conserva su valor original)
+            mh, ml, ms = rgb_to_hls_array(member_ints / 255.0)
+            all_h = np.concatenate([h[:, None], mh], axis=1)
+            all_l = np.concatenate([l[:, None], ml], axis=1)
+            all_s = np.concatenate([s[:, None], ms], axis=1)
+            
+            lighter = quantize_rgb(hls_to_rgb_array(all_h, np.minimum(all_l + 0.2, 1.0), all_s))
+            darker = quantize_rgb(hls_to_rgb_array(all_h, np.maximum(all_l - 0.2, 0.0), all_s))
+            
+            member_hex = ints_to_hex(member_ints)
+            lighter_hex = ints_to_hex(lighter)
+            darker_hex = ints_to_hex(darker)
+            
+            for i, base_hex in enumerate(base_colors):
+                variations = [base_hex, lighter_hex[i][0], darker_hex[i][0]]
+                for j, color in enumerate(member_hex[i]):
+                    variations.extend([color, lighter_hex[i][j + 1], darker_hex[i][j + 1]])
+                results[i][harmony_type] = list(dict.fromkeys(variations))
+        
+        return results
+
+# Reglas de subtono y estación vigentes (recargables en caliente con BEAUTY_RULES_FILE)
+color_rules = RulesRegistry(season_keys=ColorAnalyzer.SEASONS)
+
+# Perfiles y paletas se guardan con la estación por clave; sus datos se unen desde SEASONS al leer
+record_codec = SeasonRecordCodec(ColorAnalyzer.SEASONS)
+storage.codec = record_codec
 
 # ============================================================================
 # HERRAMIENTAS DEL SERVIDOR MCP  
 # ============================================================================
 
+PROFILE_REQUIRED_FIELDS = [
+    "user_id", "name", "skin_tone", "vein_color", "jewelry_preference", 
+    "sun_reaction", "eye_color", "hair_color", "natural_lip_color", "contrast_level"
+]
+
+# Máximo de elementos aceptados por las herramientas por lotes
+BATCH_MAX_ITEMS = int(os.environ.get("BEAUTY_BATCH_MAX_ITEMS", 10000))
+
+def validate_profile_args(args: Dict[str, Any]) -> Optional[str]:
+    """Devolver el mensaje de error si faltan campos requeridos del perfil"""
+    for field in PROFILE_REQUIRED_FIELDS:
+        if field not in args:
+            return f"Campo requerido faltante: {field}"
+    return None
+
+def analyze_color_profile(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Análisis de subtono y estación a partir de las características físicas y preferencias"""
+    # Análisis de subtono científico
+    undertone_analysis = ColorAnalyzer.analyze_undertone(
+        args["vein_color"], 
+        args["jewelry_preference"],
+        args["sun_reaction"],
+        args["natural_lip_color"]
+    )
+    
+    # Determinación de estación de color
+    season_analysis = ColorAnalyzer.determine_season(
+        args["skin_tone"],
+        undertone_analysis["undertone"], 
+        args["eye_color"],
+        args["hair_color"],
+        args["contrast_level"]
+    )
+    
+    return {
+        "undertone_analysis": undertone_analysis,
+        "season_analysis": season_analysis,
+        "recommended_colors": season_analysis["season_info"]["best_colors"],
+        "colors_to_avoid": season_analysis["season_info"]["avoid_colors"]
+    }
+
+def recompute_color_analysis(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Recalcular el análisis de color de un perfil guardado con las reglas vigentes"""
+    return analyze_color_profile({**profile["physical_characteristics"], **profile["preferences"]})
+
+def build_profile(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Analizar subtono y estación y construir el perfil completo (sin guardarlo)"""
+    color_analysis = analyze_color_profile(args)
+    
+    return {
+        "basic_info": {
+            "user_id": args["user_id"],
+            "name": args["name"],
+            "created_at": datetime.now().isoformat()
+        },
+        "physical_characteristics": {
+            "skin_tone": args["skin_tone"],
+            "vein_color": args["vein_color"], 
+            "eye_color": args["eye_color"],
+            "hair_color": args["hair_color"],
+            "natural_lip_color": args["natural_lip_color"],
+            "contrast_level": args["contrast_level"]
+        },
+        "preferences": {
+            "jewelry_preference": args["jewelry_preference"],
+            "sun_reaction": args["sun_reaction"],
+            "style_preference": args.get("style_preference", "moderno")
+        },
+        "color_analysis": color_analysis
+    }
+
+def summarize_color_analysis(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Resumen legible del análisis colorimétrico de un perfil"""
+    undertone_analysis = profile["color_analysis"]["undertone_analysis"]
+    season_analysis = profile["color_analysis"]["season_analysis"]
+    return {
+        "subtono": undertone_analysis["undertone"],
+        "confianza_subtono": f"{undertone_analysis['confidence']:.1f}%",
+        "estacion": season_analysis["season_info"]["name"],
+        "caracteristicas_estacion": season_analysis["season_info"]["characteristics"],
+        "explicacion": season_analysis["reasoning"]
+    }
+
 def tool_create_profile(args: Dict[str, Any]) -> Dict[str, Any]:
     """
     Crear perfil avanzado de belleza con análisis colorimétrico completo
     """
-    required_fields = [
-        "user_id", "name", "skin_tone", "vein_color", "jewelry_preference", 
-        "sun_reaction", "eye_color", "hair_color", "natural_lip_color", "contrast_level"
-    ]
-    
-    for field in required_fields:
-        if field not in args:
-            return {"error": f"Campo requerido faltante: {field}"}
+    error = validate_profile_args(args)
+    if error:
+        return {"error": error}
     
     try:
-        data = load_data()
-        
-        if args["user_id"] in data["profiles"]:
+        if storage.has_profile(args["user_id"]):
             return {"error": f"El perfil {args['user_id']} ya existe"}
         
-        # Análisis de subtono científico
-        undertone_analysis = ColorAnalyzer.analyze_undertone(
-            args["vein_color"], 
-            args["jewelry_preference"],
-            args["sun_reaction"],
-            args["natural_lip_color"]
-        )
+        profile = build_profile(args)
         
-        # Determinación de estación de color
-        season_analysis = ColorAnalyzer.determine_season(
-            args["skin_tone"],
-            undertone_analysis["undertone"], 
-            args["eye_color"],
-            args["hair_color"],
-            args["contrast_level"]
-        )
-        
-        # Crear perfil completo
-        profile = {
-            "basic_info": {
-                "user_id": args["user_id"],
-                "name": args["name"],
-                "created_at": datetime.now().isoformat()
-            },
-            "physical_characteristics": {
-                "skin_tone": args["skin_tone"],
-                "vein_color": args["vein_color"], 
-                "eye_color": args["eye_color"],
-                "hair_color": args["hair_color"],
-                "natural_lip_color": args["natural_lip_color"],
-                "contrast_level": args["contrast_level"]
-            },
-            "preferences": {
-                "jewelry_preference": args["jewelry_preference"],
-                "sun_reaction": args["sun_reaction"],
-                "style_preference": args.get("style_preference", "moderno")
-            },
-            "color_analysis": {
-                "undertone_analysis": undertone_analysis,
-                "season_analysis": season_analysis,
-                "recommended_colors": season_analysis["season_info"]["best_colors"],
-                "colors_to_avoid": season_analysis["season_info"]["avoid_colors"]
-            }
-        }
-        
-        data["profiles"][args["user_id"]] = profile
-        save_data(data)
+        # Inserción atómica: otro worker pudo crear el mismo perfil mientras se analizaba
+        before = profile_cache.write_version()
+        if not storage.create_profile(args["user_id"], profile):
+            return {"error": f"El perfil {args['user_id']} ya existe"}
+        profile_cache.mark_written(before)
+        profile_cache.put(args["user_id"], profile)
         
         return {
             "success": True,
             "message": f"Perfil creado exitosamente para {args['name']}",
             "profile": profile,
-            "color_analysis_summary": {
-                "subtono": undertone_analysis["undertone"],
-                "confianza_subtono": f"{undertone_analysis['confidence']:.1f}%",
-                "estacion": season_analysis["season_info"]["name"],
-                "caracteristicas_estacion": season_analysis["season_info"]["characteristics"],
-                "explicacion": season_analysis["reasoning"]
-            }
+            "color_analysis_summary": summarize_color_analysis(profile)
         }
         
     except Exception as e:
         return {"error": f"Error creando perfil: {str(e)}"}
 
+def tool_batch_create_profiles(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Crear muchos perfiles en una sola operación
+    
+    Valida y analiza cada elemento por separado y guarda todos los perfiles válidos
+    en una única transacción. Devuelve un resultado por elemento, en el mismo orden.
+    """
+    items = args.get("profiles")
+    if not isinstance(items, list):
+        return {"error": "Se requiere una lista 'profiles'"}
+    if len(items) > BATCH_MAX_ITEMS:
+        return {"error": f"Máximo {BATCH_MAX_ITEMS} perfiles por lote"}
+    
+    try:
+        results: List[Dict[str, Any]] = []
+        pending: List[Tuple[int, str, Dict[str, Any]]] = []
+        seen = set()
+        
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results.append({"index": index, "error": "El elemento debe ser un objeto"})
+                continue
+            error = validate_profile_args(item)
+            if not error and item["user_id"] in seen:
+                error = f"user_id duplicado en el lote: {item['user_id']}"
+            if error:
+                results.append({"index": index, "user_id": item.get("user_id"), "error": error})
+                continue
+            
+            seen.add(item["user_id"])
+            try:
+                profile = build_profile(item)
+            except Exception as e:
+                results.append({"index": index, "user_id": item["user_id"], "error": f"Error analizando perfil: {str(e)}"})
+                continue
+            results.append({"index": index, "user_id": item["user_id"]})
+            pending.append((len(results) - 1, item["user_id"], profile))
+        
+        # Persistir todo en una sola escritura
+        before = profile_cache.write_version()
+        created = storage.create_profiles([(user_id, profile) for _, user_id, profile in pending])
+        if any(created):
+            profile_cache.mark_written(before)
+        
+        for (position, user_id, profile), was_created in zip(pending, created):
+            if was_created:
+                profile_cache.put(user_id, profile)
+                results[position]["success"] = True
+                results[position]["color_analysis_summary"] = summarize_color_analysis(profile)
+            else:
+                results[position]["error"] = f"El perfil {user_id} ya existe"
+        
+        total_created = sum(1 for result in results if result.get("success"))
+        return {
+            "success": True,
+            "total": len(items),
+            "created": total_created,
+            "failed": len(items) - total_created,
+            "results": results
+        }
+        
+    except Exception as e:
+        return {"error": f"Error creando perfiles por lote: {str(e)}"}
+
 def tool_show_profile(args: Dict[str, Any]) -> Dict[str, Any]:
     """Mostrar perfil completo con análisis detallado"""
     if "user_id" not in args:
         return {"error": "Se requiere user_id"}
     
     try:
-        data = load_data()
-        profile = data["profiles"].get(args["user_id"])
+        profile = get_cached_profile(args["user_id"])
         
         if not profile:
             return {"error": f"Perfil {args['user_id']} no encontrado"}
@@ -411,49 +587,134 @@ def tool_show_profile(args: Dict[str, Any]) -> Dict[str, Any]:
     except Exception as e:
         return {"error": f"Error mostrando perfil: {str(e)}"}
 
+# Paginación de tool_list_profiles
+LIST_DEFAULT_LIMIT = 100
+LIST_MAX_LIMIT = 1000
+
+def list_limit_error(limit: Any) -> Optional[str]:
+    """Mensaje de error si limit no es un entero entre 1 y LIST_MAX_LIMIT (None = valor por defecto)"""
+    if limit is None:
+        return None
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        return "limit debe ser un número entero"
+    if limit < 1 or limit > LIST_MAX_LIMIT:
+        return f"limit debe estar entre 1 y {LIST_MAX_LIMIT}"
+    return None
+
+def _season_filter_key(season: str) -> str:
+    """Aceptar tanto la clave ("otono_profundo") como el nombre ("Otoño Profundo") de la estación"""
+    for key, info in ColorAnalyzer.SEASONS.items():
+        if season == info["name"]:
+            return key
+    return season
+
+def _summary_filters(args: Dict[str, Any]) -> Dict[str, str]:
+    """Extraer los filtros skin_tone/undertone/season presentes en los argumentos"""
+    filters = {key: args[key] for key in ("skin_tone", "undertone", "season") if args.get(key)}
+    if "season" in filters:
+        filters["season"] = _season_filter_key(filters["season"])
+    return filters
+
+def iter_profile_summaries(args: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Recorrer resúmenes de perfiles ordenados por user_id sin cargar todos en memoria
+    
+    Admite los filtros skin_tone, undertone y season, y 'cursor' para continuar
+    después de un user_id.
+    """
+    filters = _summary_filters(args)
+    
+    for summary in storage.iter_profile_summaries(filters, after=args.get("cursor")):
+        season_info = ColorAnalyzer.SEASONS.get(summary["season"])
+        yield {
+            "user_id": summary["user_id"],
+            "name": summary["name"],
+            "created_at": summary["created_at"],
+            "skin_tone": summary["skin_tone"],
+            "undertone": summary["undertone"],
+            "season": season_info["name"] if season_info else summary["season"],
+            "season_key": summary["season"]
+        }
+
 def tool_list_profiles(args: Dict[str, Any]) -> Dict[str, Any]:
-    """Listar todos los perfiles con resumen de análisis"""
+    """Listar perfiles con resumen de análisis, paginados por cursor y con filtros opcionales"""
     try:
-        data = load_data()
-        profiles = data["profiles"]
-        
-        if not profiles:
-            return {"success": True, "message": "No hay perfiles creados", "profiles": []}
-        
-        profile_list = []
-        for user_id, profile in profiles.items():
-            summary = {
-                "user_id": user_id,
-                "name": profile["basic_info"]["name"],
-                "created_at": profile["basic_info"]["created_at"],
-                "skin_tone": profile["physical_characteristics"]["skin_tone"],
-                "undertone": profile["color_analysis"]["undertone_analysis"]["undertone"],
-                "season": profile["color_analysis"]["season_analysis"]["season_info"]["name"]
-            }
-            profile_list.append(summary)
+        error = list_limit_error(args.get("limit"))
+        if error:
+            return {"error": error}
+        limit = LIST_DEFAULT_LIMIT if args.get("limit") is None else int(args["limit"])
+        
+        # Leer un elemento extra para saber si hay otra página
+        profile_list = list(itertools.islice(iter_profile_summaries(args), limit + 1))
+        next_cursor = None
+        if len(profile_list) > limit:
+            profile_list = profile_list[:limit]
+            next_cursor = profile_list[-1]["user_id"]
+        
+        if not profile_list and not args.get("cursor"):
+            return {"success": True, "message": "No hay perfiles creados", "profiles": [], "next_cursor": None}
         
         return {
             "success": True,
             "total_profiles": len(profile_list),
-            "profiles": profile_list
+            "profiles": profile_list,
+            "next_cursor": next_cursor
         }
         
     except Exception as e:
         return {"error": f"Error listando perfiles: {str(e)}"}
 
+def tool_query_segment(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Consultar un segmento de usuarios (p. ej. todos los de Otoño Profundo)
+    
+    Usa los índices secundarios de skin_tone, undertone y season, por lo que el costo
+    depende del tamaño del segmento y no del total de perfiles.
+    """
+    filters = _summary_filters(args)
+    if not filters:
+        return {"error": "Se requiere al menos un filtro: skin_tone, undertone o season"}
+    
+    try:
+        error = list_limit_error(args.get("limit"))
+        if error:
+            return {"error": error}
+        limit = LIST_DEFAULT_LIMIT if args.get("limit") is None else int(args["limit"])
+        
+        summaries = list(itertools.islice(
+            storage.iter_profile_summaries(filters, after=args.get("cursor")), limit + 1
+        ))
+        next_cursor = None
+        if len(summaries) > limit:
+            summaries = summaries[:limit]
+            next_cursor = summaries[-1]["user_id"]
+        
+        return {
+            "success": True,
+            "filters": filters,
+            "total_matches": storage.count_profiles(filters),
+            "user_ids": [summary["user_id"] for summary in summaries],
+            "next_cursor": next_cursor
+        }
+        
+    except Exception as e:
+        return {"error": f"Error consultando segmento: {str(e)}"}
+
 def tool_delete_profile(args: Dict[str, Any]) -> Dict[str, Any]:
     """Eliminar perfil"""
     if "user_id" not in args:
         return {"error": "Se requiere user_id"}
     
     try:
-        data = load_data()
+        before = profile_cache.write_version()
+        deleted = storage.delete_profile(args["user_id"])
+        profile_cache.discard(args["user_id"])
         
-        if args["user_id"] not in data["profiles"]:
+        if not deleted:
             return {"error": f"Perfil {args['user_id']} no encontrado"}
-        
-        del data["profiles"][args["user_id"]]
-        save_data(data)
+        profile_cache.mark_written(before)
         
         return {
             "success": True,
@@ -463,6 +724,69 @@ def tool_delete_profile(args: Dict[str, Any]) -> Dict[str, Any]:
     except Exception as e:
         return {"error": f"Error eliminando perfil: {str(e)}"}
 
+def _compute_palette_content(season_info: Dict[str, Any], palette_type: str,
+                             event_type: str) -> Optional[Dict[str, Any]]:
+    """Calcular la parte de la paleta que depende solo de la estación, el tipo y el evento"""
+    base_colors = season_info["best_colors"]
+    
+    # Generar paleta específica para el tipo solicitado
+    if palette_type == "maquillaje":
+        palette = generate_makeup_palette(base_colors, season_info, event_type)
+    elif palette_type == "ropa":
+        palette = generate_clothing_palette(base_colors, season_info, event_type)
+    elif palette_type == "accesorios":
+        palette = generate_accessories_palette(base_colors, season_info, event_type)
+    else:
+        return None
+    
+    # Agregar armonías de color
+    harmony_palette = ColorAnalyzer.generate_harmony_palette(base_colors, "complementary")
+    
+    return {
+        "base_season": season_info["name"],
+        "main_palette": palette,
+        "harmony_colors": harmony_palette[:8],  # Limitar a 8 colores
+        "color_theory": {
+            "temperature": season_info["temperature"],
+            "saturation": season_info["saturation"], 
+            "contrast": season_info["contrast"],
+            "explanation": season_info["characteristics"]
+        }
+    }
+
+def cached_palette_content(season_info: Dict[str, Any], palette_type: str,
+                           event_type: str) -> Optional[Dict[str, Any]]:
+    """Contenido de la paleta desde la caché de respuestas (clave: datos de la estación + tipo + evento)"""
+    return response_cache.get_or_compute(
+        "palette",
+        {"season_info": season_info, "palette_type": palette_type, "event_type": event_type},
+        lambda: _compute_palette_content(season_info, palette_type, event_type),
+        cacheable=lambda value: value is not None
+    )
+
+def build_palette_result(user_id: str, profile: Dict[str, Any], palette_type: str,
+                         event_type: str) -> Optional[Dict[str, Any]]:
+    """Construir la paleta personalizada de un perfil; None si el tipo de paleta no es válido
+    
+    El contenido se cachea por el contenido de la estación del perfil (no por usuario),
+    así que todos los perfiles de la misma estación comparten la entrada.
+    """
+    season_analysis = profile["color_analysis"]["season_analysis"]
+    content = cached_palette_content(season_analysis["season_info"], palette_type, event_type)
+    if content is None:
+        return None
+    
+    palette_result = {
+        "user_id": user_id,
+        "palette_type": palette_type,
+        "event_type": event_type,
+        "generated_at": datetime.now().isoformat()
+    }
+    if "rules_version" in season_analysis:
+        palette_result["rules_version"] = season_analysis["rules_version"]
+    palette_result.update(content)
+    return palette_result
+
 def tool_generate_palette(args: Dict[str, Any]) -> Dict[str, Any]:
     """
     Generar paleta personalizada basada en análisis colorimétrico del perfil
@@ -473,54 +797,20 @@ def tool_generate_palette(args: Dict[str, Any]) -> Dict[str, Any]:
             return {"error": f"Campo requerido: {field}"}
     
     try:
-        data = load_data()
-        profile = data["profiles"].get(args["user_id"])
+        profile = get_cached_profile(args["user_id"])
         
         if not profile:
             return {"error": f"Perfil {args['user_id']} no encontrado"}
         
-        season_info = profile["color_analysis"]["season_analysis"]["season_info"]
-        base_colors = season_info["best_colors"]
         palette_type = args["palette_type"]
-        event_type = args.get("event_type", "casual")
-        
-        # Generar paleta específica para el tipo solicitado
-        if palette_type == "maquillaje":
-            palette = generate_makeup_palette(base_colors, season_info, event_type)
-        elif palette_type == "ropa":
-            palette = generate_clothing_palette(base_colors, season_info, event_type)
-        elif palette_type == "accesorios":
-            palette = generate_accessories_palette(base_colors, season_info, event_type)
-        else:
+        palette_result = build_palette_result(
+            args["user_id"], profile, palette_type, args.get("event_type", "casual")
+        )
+        if palette_result is None:
             return {"error": f"Tipo de paleta no válido: {palette_type}"}
         
-        # Agregar armonías de color
-        harmony_palette = ColorAnalyzer.generate_harmony_palette(base_colors, "complementary")
-        
-        palette_result = {
-            "user_id": args["user_id"],
-            "palette_type": palette_type,
-            "event_type": event_type,
-            "generated_at": datetime.now().isoformat(),
-            "base_season": season_info["name"],
-            "main_palette": palette,
-            "harmony_colors": harmony_palette[:8],  # Limitar a 8 colores
-            "color_theory": {
-                "temperature": season_info["temperature"],
-                "saturation": season_info["saturation"], 
-                "contrast": season_info["contrast"],
-                "explanation": season_info["characteristics"]
-            }
-        }
-        
         # Guardar paleta generada
-        if "palettes" not in data:
-            data["palettes"] = {}
-        if args["user_id"] not in data["palettes"]:
-            data["palettes"][args["user_id"]] = []
-        
-        data["palettes"][args["user_id"]].append(palette_result)
-        save_data(data)
+        storage.append_palette(args["user_id"], palette_result)
         
         return {
             "success": True,
@@ -530,30 +820,132 @@ def tool_generate_palette(args: Dict[str, Any]) -> Dict[str, Any]:
     except Exception as e:
         return {"error": f"Error generando paleta: {str(e)}"}
 
-def tool_quick_palette(args: Dict[str, Any]) -> Dict[str, Any]:
-    """Generar paleta rápida sin perfil específico"""
-    palette_type = args.get("palette_type", "ropa")
-    skin_tone = args.get("skin_tone", "media")
-    undertone = args.get("undertone", "neutro")
-    event_type = args.get("event_type", "casual")
+def tool_batch_generate_palettes(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generar paletas para muchos perfiles en una sola operación
     
-    # Usar análisis simplificado para determinar estación aproximada
-    season_key = f"{skin_tone}_{undertone}_medio"  # Usar contraste medio por defecto
+    Cada elemento de 'requests' tiene la forma de tool_generate_palette. Todas las
+    paletas generadas se guardan en una única escritura.
+    """
+    items = args.get("requests")
+    if not isinstance(items, list):
+        return {"error": "Se requiere una lista 'requests'"}
+    if len(items) > BATCH_MAX_ITEMS:
+        return {"error": f"Máximo {BATCH_MAX_ITEMS} paletas por lote"}
     
-    # Mapeo simplificado
-    season_mapping = {
-        "clara_frio_medio": "verano_frio",
-        "clara_calido_medio": "primavera_calida", 
-        "clara_neutro_medio": "verano_suave",
-        "media_frio_medio": "verano_frio",
-        "media_calido_medio": "otono_suave",
-        "media_neutro_medio": "verano_suave", 
-        "oscura_frio_medio": "invierno_profundo",
-        "oscura_calido_medio": "otono_profundo",
-        "oscura_neutro_medio": "invierno_profundo"
+    try:
+        results: List[Dict[str, Any]] = []
+        generated: List[Tuple[str, Dict[str, Any]]] = []
+        
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results.append({"index": index, "error": "El elemento debe ser un objeto"})
+                continue
+            missing = [field for field in ("user_id", "palette_type") if field not in item]
+            if missing:
+                results.append({"index": index, "user_id": item.get("user_id"), "error": f"Campo requerido: {missing[0]}"})
+                continue
+            
+            profile = get_cached_profile(item["user_id"])
+            if not profile:
+                results.append({"index": index, "user_id": item["user_id"], "error": f"Perfil {item['user_id']} no encontrado"})
+                continue
+            
+            palette_result = build_palette_result(
+                item["user_id"], profile, item["palette_type"], item.get("event_type", "casual")
+            )
+            if palette_result is None:
+                results.append({"index": index, "user_id": item["user_id"], "error": f"Tipo de paleta no válido: {item['palette_type']}"})
+                continue
+            
+            generated.append((item["user_id"], palette_result))
+            results.append({"index": index, "user_id": item["user_id"], "success": True, "palette": palette_result})
+        
+        # Persistir todas las paletas en una sola escritura
+        storage.append_palettes(generated)
+        
+        return {
+            "success": True,
+            "total": len(items),
+            "generated": len(generated),
+            "failed": len(items) - len(generated),
+            "results": results
+        }
+        
+    except Exception as e:
+        return {"error": f"Error generando paletas por lote: {str(e)}"}
+
+# Paginación de tool_list_palettes (cada paleta ocupa varios KB)
+PALETTE_PAGE_DEFAULT_LIMIT = 20
+PALETTE_PAGE_MAX_LIMIT = 100
+
+def tool_list_palettes(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Historial de paletas de un usuario, de la más reciente a la más antigua
+
+    Solo incluye las paletas retenidas (BEAUTY_PALETTE_MAX_PER_USER / BEAUTY_PALETTE_MAX_AGE_DAYS);
+    'cursor' es el next_cursor de la página anterior.
+    """
+    if "user_id" not in args:
+        return {"error": "Se requiere user_id"}
+
+    try:
+        limit = args.get("limit")
+        limit = PALETTE_PAGE_DEFAULT_LIMIT if limit is None else int(limit)
+        if limit < 1 or limit > PALETTE_PAGE_MAX_LIMIT:
+            return {"error": f"limit debe estar entre 1 y {PALETTE_PAGE_MAX_LIMIT}"}
+    except (TypeError, ValueError):
+        return {"error": "limit debe ser un número entero"}
+
+    try:
+        palettes, next_cursor = storage.get_palettes_page(args["user_id"], limit, args.get("cursor"))
+    except ValueError as e:
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": f"Error listando paletas: {str(e)}"}
+
+    return {
+        "success": True,
+        "user_id": args["user_id"],
+        "total_palettes": len(palettes),
+        "palettes": palettes,
+        "next_cursor": next_cursor,
+        "retention": storage.retention.info()
     }
-    
-    season = season_mapping.get(season_key, "verano_suave")
+
+# Espacio de entradas conocido de tool_quick_palette (se precalcula completo al importar)
+QUICK_SKIN_TONES = ("clara", "media", "oscura")
+QUICK_UNDERTONES = ("frio", "calido", "neutro")
+QUICK_PALETTE_TYPES = ("maquillaje", "ropa", "accesorios")
+QUICK_EVENT_TYPES = ("casual", "trabajo", "formal", "fiesta", "noche", "playa")
+
+# Mapeo simplificado (contraste medio por defecto)
+QUICK_SEASON_MAPPING = {
+    "clara_frio_medio": "verano_frio",
+    "clara_calido_medio": "primavera_calida", 
+    "clara_neutro_medio": "verano_suave",
+    "media_frio_medio": "verano_frio",
+    "media_calido_medio": "otono_suave",
+    "media_neutro_medio": "verano_suave", 
+    "oscura_frio_medio": "invierno_profundo",
+    "oscura_calido_medio": "otono_profundo",
+    "oscura_neutro_medio": "invierno_profundo"
+}
+
+def quick_palette_key(args: Dict[str, Any]) -> Tuple[Any, Any, Any, Any]:
+    """Normalizar los argumentos de tool_quick_palette a (palette_type, skin_tone, undertone, event_type)"""
+    return (
+        args.get("palette_type", "ropa"),
+        args.get("skin_tone", "media"),
+        args.get("undertone", "neutro"),
+        args.get("event_type", "casual")
+    )
+
+def _build_quick_palette(palette_type: str, skin_tone: str, undertone: str, event_type: str) -> Dict[str, Any]:
+    """Construir la paleta rápida completa (sin marca de tiempo)"""
+    # Usar análisis simplificado para determinar estación aproximada
+    season_key = f"{skin_tone}_{undertone}_medio"  # Usar contraste medio por defecto
+    season = QUICK_SEASON_MAPPING.get(season_key, "verano_suave")
     season_info = ColorAnalyzer.SEASONS[season]
     
     # Generar paleta
@@ -571,56 +963,130 @@ def tool_quick_palette(args: Dict[str, Any]) -> Dict[str, Any]:
         }
     
     return {
-        "success": True,
-        "palette": {
-            "palette_type": palette_type,
-            "event_type": event_type,
-            "estimated_season": season_info["name"],
-            "generated_at": datetime.now().isoformat(),
-            "colors": palette,
-            "color_theory": {
-                "temperature": season_info["temperature"],
-                "saturation": season_info["saturation"],
-                "explanation": f"Paleta basada en {season_info['name']}: {season_info['characteristics']}"
-            }
+        "palette_type": palette_type,
+        "event_type": event_type,
+        "estimated_season": season_info["name"],
+        "colors": palette,
+        "color_theory": {
+            "temperature": season_info["temperature"],
+            "saturation": season_info["saturation"],
+            "explanation": f"Paleta basada en {season_info['name']}: {season_info['characteristics']}"
         }
     }
 
+@functools.lru_cache(maxsize=1024)
+def cached_quick_palette(palette_type: str, skin_tone: str, undertone: str, event_type: str) -> Dict[str, Any]:
+    """Paleta rápida memoizada; el resultado es compartido y no debe modificarse"""
+    return _build_quick_palette(palette_type, skin_tone, undertone, event_type)
+
+def precompute_quick_palettes():
+    """Precalcular todo el espacio de entradas conocido de tool_quick_palette"""
+    for key in itertools.product(QUICK_PALETTE_TYPES, QUICK_SKIN_TONES, QUICK_UNDERTONES, QUICK_EVENT_TYPES):
+        cached_quick_palette(*key)
+
+def prewarm_palette_cache():
+    """Precalcular el contenido de paleta de cada estación para los tipos y eventos conocidos"""
+    for season_info in ColorAnalyzer.SEASONS.values():
+        for palette_type in QUICK_PALETTE_TYPES:
+            for event_type in QUICK_EVENT_TYPES:
+                cached_palette_content(season_info, palette_type, event_type)
+
+def stamp_quick_palette(body: Dict[str, Any], generated_at: str) -> Dict[str, Any]:
+    """Agregar la marca de tiempo a una paleta rápida precalculada"""
+    return {
+        "palette_type": body["palette_type"],
+        "event_type": body["event_type"],
+        "estimated_season": body["estimated_season"],
+        "generated_at": generated_at,
+        "colors": body["colors"],
+        "color_theory": body["color_theory"]
+    }
+
+def tool_quick_palette(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Generar paleta rápida sin perfil específico"""
+    key = quick_palette_key(args)
+    
+    if all(isinstance(value, str) for value in key):
+        body = cached_quick_palette(*key)
+    else:
+        body = _build_quick_palette(*key)  # Valores no hashables: calcular sin memoizar
+    
+    # Solo la marca de tiempo cambia entre peticiones
+    return {
+        "success": True,
+        "palette": stamp_quick_palette(body, datetime.now().isoformat())
+    }
+
+def export_info(user_id: str) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "exported_at": datetime.now().isoformat(),
+        "version": "2.0"
+    }
+
+def export_summary(profile: Dict[str, Any], total_palettes: int) -> Dict[str, Any]:
+    return {
+        "profile_created": profile["basic_info"]["created_at"],
+        "total_palettes": total_palettes,
+        "color_season": profile["color_analysis"]["season_analysis"]["season_info"]["name"]
+    }
+
+def iter_export_palettes(user_id: str) -> Iterator[Dict[str, Any]]:
+    """Paletas del usuario para la exportación, leídas del almacenamiento por páginas"""
+    return storage.iter_palettes(user_id)
+
 def tool_export_data(args: Dict[str, Any]) -> Dict[str, Any]:
-    """Exportar todos los datos del usuario"""
+    """Exportar todos los datos del usuario (/mcp/export envía lo mismo en streaming)"""
     if "user_id" not in args:
         return {"error": "Se requiere user_id"}
     
     try:
-        data = load_data()
         user_id = args["user_id"]
+        profile = get_cached_profile(user_id)
         
-        if user_id not in data["profiles"]:
+        if not profile:
             return {"error": f"Perfil {user_id} no encontrado"}
         
         export_data = {
-            "export_info": {
-                "user_id": user_id,
-                "exported_at": datetime.now().isoformat(),
-                "version": "2.0"
-            },
-            "profile": data["profiles"][user_id],
-            "palettes": data.get("palettes", {}).get(user_id, [])
+            "export_info": export_info(user_id),
+            "profile": profile,
+            "palettes": list(iter_export_palettes(user_id))
         }
         
         return {
             "success": True,
             "exported_data": export_data,
-            "summary": {
-                "profile_created": data["profiles"][user_id]["basic_info"]["created_at"],
-                "total_palettes": len(export_data["palettes"]),
-                "color_season": data["profiles"][user_id]["color_analysis"]["season_analysis"]["season_info"]["name"]
-            }
+            "summary": export_summary(profile, len(export_data["palettes"]))
         }
         
     except Exception as e:
         return {"error": f"Error exportando datos: {str(e)}"}
 
+# Exportaciones completas en segundo plano (estado compartido entre workers vía archivos)
+export_jobs = ExportJobs(storage)
+
+def tool_start_export_job(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Iniciar la exportación completa del almacenamiento a NDJSON comprimido"""
+    compression = args.get("compression") or "gzip"
+    try:
+        job = export_jobs.start(compression)
+    except ValueError as e:
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": f"Error iniciando exportación: {str(e)}"}
+    
+    return {"success": True, "job": job, "compressions": available_compressions()}
+
+def tool_export_job_status(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Estado de un trabajo de exportación completa"""
+    if "job_id" not in args:
+        return {"error": "Se requiere job_id"}
+    
+    job = export_jobs.status(args["job_id"])
+    if job is None:
+        return {"error": f"Trabajo de exportación {args['job_id']} no encontrado"}
+    return {"success": True, "job": job}
+
 # ============================================================================
 # FUNCIONES AUXILIARES PARA GENERACIÓN DE PALETAS ESPECÍFICAS
 # ============================================================================
@@ -714,12 +1180,7 @@ def determine_foundation_shade(season_info: Dict) -> str:
 def lighten_color(hex_color: str, factor: float = 0.3) -> str:
     """Aclarar un color hex"""
     try:
-        hex_color = hex_color.lstrip('#')
-        r, g, b = [int(hex_color[i:i+2], 16) for i in (0, 2, 4)]
-        r = min(255, int(r + (255 - r) * factor))
-        g = min(255, int(g + (255 - g) * factor))  
-        b = min(255, int(b + (255 - b) * factor))
-        return f"#{r:02x}{g:02x}{b:02x}"
+        return lighten_hex(hex_color, factor)
     except:
         return "#FFFFFF"
 
@@ -782,4 +1243,6 @@ def get_makeup_technique(season_info: Dict, event_type: str) -> str:
     elif season_info["saturation"] == "alta":
         return "Colores vibrantes, difuminados suaves"
     else:
-        return "Maquillaje suave, técnica de difuminado natural"
\ No newline at end of file
+        return "Maquillaje suave, técnica de difuminado natural"
+
+precompute_quick_palettes()
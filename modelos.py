@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Modelos compactos en memoria para perfiles y forma persistida de perfiles y paletas
+El perfil compacto usa __slots__, guarda la estación por clave y los colores como enteros de
+24 bits, y se expande a la forma JSON de la API solo al devolverlo
+"""
+
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+from almacenamiento import RecordCodec
+
+# Bit extra que recuerda si el hex original estaba en mayúsculas ("#FF6B35" frente a "#ff9771")
+_UPPER_FLAG = 1 << 24
+
+def pack_color(hex_color: str) -> int:
+    """Empaquetar '#rrggbb' en un entero de 24 bits (más el indicador de mayúsculas)"""
+    digits = hex_color[1:] if hex_color.startswith('#') else None
+    if digits is None or len(digits) != 6:
+        raise ValueError(f"Color hex no válido: {hex_color}")
+    value = int(digits, 16)
+    return value | _UPPER_FLAG if digits != digits.lower() else value
+
+def unpack_color(value: int) -> str:
+    return f"#{value & 0xFFFFFF:06X}" if value & _UPPER_FLAG else f"#{value:06x}"
+
+def pack_colors(colors: List[str]) -> array:
+    return array('L', (pack_color(color) for color in colors))
+
+def unpack_colors(values: array) -> List[str]:
+    return [unpack_color(value) for value in values]
+
+def _intern(value: Any) -> Any:
+    """Compartir las cadenas de vocabulario cerrado (tonos, subtonos, estaciones...)"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+# ============================================================================
+# PERFIL
+# ============================================================================
+
+@dataclass
+class Profile:
+    """Perfil compacto; season_info, colores recomendados y textos derivados se reconstruyen al expandir"""
+
+    __slots__ = (
+        "user_id", "name", "created_at",
+        "skin_tone", "vein_color", "eye_color", "hair_color", "natural_lip_color", "contrast_level",
+        "jewelry_preference", "sun_reaction", "style_preference",
+        "undertone", "undertone_score", "season_key", "season_confidence", "adjusted_contrast",
+        "rules_version", "recommended_colors", "colors_to_avoid"
+    )
+
+    user_id: str
+    name: str
+    created_at: str
+    skin_tone: str
+    vein_color: str
+    eye_color: str
+    hair_color: str
+    natural_lip_color: str
+    contrast_level: str
+    jewelry_preference: str
+    sun_reaction: str
+    style_preference: str
+    undertone: str
+    undertone_score: float
+    season_key: str
+    season_confidence: int
+    adjusted_contrast: str
+    rules_version: Optional[str]
+    recommended_colors: array
+    colors_to_avoid: array
+
+    @classmethod
+    def from_dict(cls, profile: Dict[str, Any]) -> "Profile":
+        basic = profile["basic_info"]
+        physical = profile["physical_characteristics"]
+        preferences = profile["preferences"]
+        analysis = profile["color_analysis"]
+        undertone = analysis["undertone_analysis"]
+        season = analysis["season_analysis"]
+        # "Piel X + subtono Y + contraste Z = Nombre": el contraste ajustado solo queda en el texto
+        adjusted_contrast = season["reasoning"].split(" + contraste ", 1)[1].rsplit(" = ", 1)[0]
+
+        return cls(
+            basic["user_id"], basic["name"], basic["created_at"],
+            *(_intern(physical[field]) for field in (
+                "skin_tone", "vein_color", "eye_color", "hair_color", "natural_lip_color", "contrast_level")),
+            *(_intern(preferences[field]) for field in (
+                "jewelry_preference", "sun_reaction", "style_preference")),
+            _intern(undertone["undertone"]), undertone["score"],
+            _intern(season["season"]), season["confidence"], _intern(adjusted_contrast),
+            _intern(season.get("rules_version")),
+            pack_colors(analysis["recommended_colors"]), pack_colors(analysis["colors_to_avoid"])
+        )
+
+    def to_dict(self, seasons: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Expandir a la forma JSON completa uniendo los datos de la estación"""
+        season_info = seasons[self.season_key]
+        score = self.undertone_score
+        season_analysis = {
+            "season": self.season_key,
+            "season_info": season_info,
+            "confidence": self.season_confidence,
+            "reasoning": f"Piel {self.skin_tone} + subtono {self.undertone} + "
+                         f"contraste {self.adjusted_contrast} = {season_info['name']}"
+        }
+        if self.rules_version is not None:
+            season_analysis["rules_version"] = self.rules_version
+
+        return {
+            "basic_info": {
+                "user_id": self.user_id,
+                "name": self.name,
+                "created_at": self.created_at
+            },
+            "physical_characteristics": {
+                "skin_tone": self.skin_tone,
+                "vein_color": self.vein_color,
+                "eye_color": self.eye_color,
+                "hair_color": self.hair_color,
+                "natural_lip_color": self.natural_lip_color,
+                "contrast_level": self.contrast_level
+            },
+            "preferences": {
+                "jewelry_preference": self.jewelry_preference,
+                "sun_reaction": self.sun_reaction,
+                "style_preference": self.style_preference
+            },
+            "color_analysis": {
+                "undertone_analysis": {
+                    "undertone": self.undertone,
+                    "score": score,
+                    "confidence": min(abs(score) * 20, 100),
+                    "analysis": f"Puntuación: {score:.1f} - {self.undertone.upper()}"
+                },
+                "season_analysis": season_analysis,
+                "recommended_colors": unpack_colors(self.recommended_colors),
+                "colors_to_avoid": unpack_colors(self.colors_to_avoid)
+            }
+        }
+
+# ============================================================================
+# CONVERSIÓN SEGURA
+# ============================================================================
+
+def compact_profile(profile: Dict[str, Any], seasons: Dict[str, Dict[str, Any]]) -> Union[Profile, Dict[str, Any]]:
+    """Compactar un perfil si se puede reconstruir exactamente; si no, conservar el diccionario"""
+    try:
+        compact = Profile.from_dict(profile)
+        if compact.to_dict(seasons) == profile:
+            return compact
+    except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+        pass
+    return profile
+
+def expand(item: Union[Profile, Dict[str, Any]], seasons: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Forma JSON de un modelo compacto (los diccionarios se devuelven tal cual)"""
+    return item if isinstance(item, dict) else item.to_dict(seasons)
+
+# ============================================================================
+# FORMA PERSISTIDA
+# ============================================================================
+
+class SeasonRecordCodec(RecordCodec):
+    """Guardar perfiles y paletas con la estación por clave y unir sus datos al leer
+
+    Un perfil guardado no incluye season_info, recommended_colors ni colors_to_avoid, y
+    una paleta guarda "season" en lugar de base_season y color_theory. Los registros
+    completos de versiones anteriores se leen tal cual y se reducen al volver a escribirse.
+    """
+
+    def __init__(self, seasons: Dict[str, Dict[str, Any]]):
+        self.seasons = seasons
+        self._keys_by_name = {info["name"]: key for key, info in seasons.items()}
+
+    def encode_profile(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        analysis = profile.get("color_analysis")
+        season = analysis.get("season_analysis") if isinstance(analysis, dict) else None
+        if not isinstance(season, dict) or season.get("season") not in self.seasons:
+            return profile  # Sin estación conocida no se podría reconstruir
+        stored_analysis = {key: value for key, value in analysis.items()
+                           if key not in ("recommended_colors", "colors_to_avoid")}
+        stored_analysis["season_analysis"] = {key: value for key, value in season.items() if key != "season_info"}
+        return {**profile, "color_analysis": stored_analysis}
+
+    def decode_profile(self, stored: Dict[str, Any]) -> Dict[str, Any]:
+        analysis = stored.get("color_analysis")
+        season = analysis.get("season_analysis") if isinstance(analysis, dict) else None
+        if not isinstance(season, dict) or "season_info" in season:
+            return stored  # Formato anterior (o incompleto): ya trae los datos de la estación
+        season_info = self.seasons.get(season.get("season"))
+        if season_info is None:
+            return stored
+        return {
+            **stored,
+            "color_analysis": {
+                **analysis,
+                "season_analysis": {"season": season["season"], "season_info": season_info,
+                                    **{key: value for key, value in season.items() if key != "season"}},
+                "recommended_colors": season_info["best_colors"],
+                "colors_to_avoid": season_info["avoid_colors"]
+            }
+        }
+
+    def encode_palette(self, palette: Dict[str, Any]) -> Dict[str, Any]:
+        if "base_season" not in palette:
+            return palette
+        season_key = self._keys_by_name.get(palette["base_season"])
+        if season_key is None:
+            return palette
+        stored = {}
+        for key, value in palette.items():
+            if key == "base_season":
+                stored["season"] = season_key
+            elif key != "color_theory":
+                stored[key] = value
+        return stored
+
+    def decode_palette(self, stored: Dict[str, Any]) -> Dict[str, Any]:
+        season_info = self.seasons.get(stored.get("season"))
+        if season_info is None or "base_season" in stored:
+            return stored
+        palette = {}
+        for key, value in stored.items():
+            if key == "season":
+                palette["base_season"] = season_info["name"]
+            else:
+                palette[key] = value
+        palette["color_theory"] = {
+            "temperature": season_info["temperature"],
+            "saturation": season_info["saturation"],
+            "contrast": season_info["contrast"],
+            "explanation": season_info["characteristics"]
+        }
+        return palette
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Recálculo masivo de perfiles tras un cambio de reglas de colorimetría
+Recorre los perfiles en orden de user_id, recalcula el análisis de color en un pool de procesos
+y escribe por bloques solo los perfiles que cambiaron, con progreso y reanudación tras un fallo.
+Puede ejecutarse con el servidor en marcha: un perfil borrado o modificado después de leerlo no se
+sobrescribe (se cuenta como omitido).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from almacenamiento import BaseStorage, atomic_write_json, create_storage
+from metodos_server import (
+    DATA_FILE, DB_FILE, STORAGE_BACKEND, color_rules, recompute_color_analysis, record_codec
+)
+
+CHUNK_SIZE = 1000
+PROGRESS_INTERVAL = 2.0
+
+Change = Tuple[str, Dict[str, Any], Dict[str, Any]]
+
+def analysis_results(color_analysis: Any) -> Any:
+    """Resultados comparables de un análisis: todo salvo la versión de reglas que lo produjo"""
+    season_analysis = color_analysis.get("season_analysis") if isinstance(color_analysis, dict) else None
+    if not isinstance(season_analysis, dict):
+        return color_analysis
+    season_analysis = {key: value for key, value in season_analysis.items() if key != "rules_version"}
+    return dict(color_analysis, season_analysis=season_analysis)
+
+def recompute_chunk(chunk: List[Tuple[str, Dict[str, Any]]]) -> Tuple[int, List[Change], int]:
+    """
+    Recalcular un bloque; devuelve (procesados, cambios (user_id, leído, nuevo), errores)
+
+    Solo cuenta como cambio un resultado distinto: con una versión de reglas nueva que
+    clasifica igual, el perfil conserva su análisis y su rules_version anterior.
+    """
+    changed = []
+    errors = 0
+    for user_id, profile in chunk:
+        try:
+            color_analysis = recompute_color_analysis(profile)
+        except (KeyError, TypeError):
+            errors += 1  # Perfil incompleto: se deja como está
+            continue
+        if analysis_results(color_analysis) != analysis_results(profile.get("color_analysis")):
+            changed.append((user_id, profile, dict(profile, color_analysis=color_analysis)))
+    return len(chunk), changed, errors
+
+def chunked(items: Iterator[Tuple[str, Dict[str, Any]]], size: int) -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+# ============================================================================
+# PUNTO DE CONTROL
+# ============================================================================
+
+def load_checkpoint(path: str, rules_version: str) -> Optional[Dict[str, Any]]:
+    """Leer el punto de control si corresponde a la misma versión de reglas"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if checkpoint.get("rules_version") != rules_version:
+        print(f"⚠️  Punto de control de otra versión de reglas ({checkpoint.get('rules_version')}); se empieza de cero")
+        return None
+    return checkpoint
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    checkpoint["updated_at"] = datetime.now().isoformat()
+    atomic_write_json(path, checkpoint)
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+def recalculate_profiles(storage: BaseStorage, checkpoint_path: str, workers: int = os.cpu_count() or 1,
+                         chunk_size: int = CHUNK_SIZE, dry_run: bool = False, restart: bool = False,
+                         progress_interval: float = PROGRESS_INTERVAL) -> Dict[str, Any]:
+    """
+    Recalcular el análisis de color de todos los perfiles
+
+    Los bloques se procesan en paralelo pero se escriben en orden, de modo que el punto de
+    control (último user_id escrito) siempre delimita un prefijo completamente recalculado.
+    """
+    rules_version = color_rules.get().version
+    checkpoint = None if (restart or dry_run) else load_checkpoint(checkpoint_path, rules_version)
+    if checkpoint is None:
+        checkpoint = {"rules_version": rules_version, "last_user_id": None,
+                      "processed": 0, "changed": 0, "skipped": 0, "errors": 0,
+                      "started_at": datetime.now().isoformat()}
+    elif checkpoint["last_user_id"] is not None:
+        print(f"↩️  Reanudando después de {checkpoint['last_user_id']} ({checkpoint['processed']} ya procesados)")
+
+    total = storage.count_profiles()
+    chunks = chunked(storage.iter_profiles(after=checkpoint["last_user_id"]), chunk_size)
+    started = time.monotonic()
+    processed_at_start = checkpoint["processed"]
+    last_report = 0.0
+
+    def commit(last_user_id: str, processed: int, changed: List[Change], errors: int):
+        nonlocal last_report
+        written = len(changed)
+        if changed and not dry_run:
+            # Escritura condicional: no resucita perfiles borrados ni pisa ediciones hechas mientras tanto
+            written = sum(storage.update_profiles(changed))
+        checkpoint["last_user_id"] = last_user_id
+        checkpoint["processed"] += processed
+        checkpoint["changed"] += written
+        checkpoint["skipped"] = checkpoint.get("skipped", 0) + len(changed) - written
+        checkpoint["errors"] += errors
+        if not dry_run:
+            save_checkpoint(checkpoint_path, checkpoint)
+
+        now = time.monotonic()
+        if now - last_report >= progress_interval:
+            last_report = now
+            rate = (checkpoint["processed"] - processed_at_start) / max(now - started, 1e-9)
+            remaining = max(total - checkpoint["processed"], 0)
+            print(f"⏳ {checkpoint['processed']}/{total} perfiles, {checkpoint['changed']} cambiados, "
+                  f"{rate:,.0f}/s, restante ~{remaining / max(rate, 1e-9):,.0f}s", flush=True)
+
+    if workers <= 1:
+        for chunk in chunks:
+            commit(chunk[-1][0], *recompute_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Acotar los bloques en vuelo para no cargar toda la base en memoria
+            pending = deque()
+            for chunk in chunks:
+                pending.append((chunk[-1][0], pool.submit(recompute_chunk, chunk)))
+                if len(pending) >= workers * 2:
+                    last_user_id, future = pending.popleft()
+                    commit(last_user_id, *future.result())
+            while pending:
+                last_user_id, future = pending.popleft()
+                commit(last_user_id, *future.result())
+
+    elapsed = time.monotonic() - started
+    checkpoint["finished_at"] = datetime.now().isoformat()
+    if not dry_run and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)  # Terminado: la próxima ejecución empieza de cero
+    return dict(checkpoint, elapsed_seconds=round(elapsed, 2), dry_run=dry_run)
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcular el análisis de color de todos los perfiles")
+    parser.add_argument("--backend", default=STORAGE_BACKEND, choices=["json", "sqlite"], help="Motor de almacenamiento")
+    parser.add_argument("--json", default=DATA_FILE, help="Archivo JSON (motor json)")
+    parser.add_argument("--db", default=DB_FILE, help="Base SQLite (motor sqlite)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos de cálculo (1 = sin pool)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Perfiles por bloque de escritura")
+    parser.add_argument("--checkpoint", help="Archivo de punto de control (por defecto junto al almacenamiento)")
+    parser.add_argument("--restart", action="store_true", help="Ignorar el punto de control y empezar de cero")
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar los perfiles que cambiarían")
+    args = parser.parse_args()
+
+    store_path = args.json if args.backend == "json" else args.db
+    storage = create_storage(args.backend, json_path=args.json, db_path=args.db, codec=record_codec)
+    storage.init()
+
+    result = recalculate_profiles(
+        storage,
+        checkpoint_path=args.checkpoint or f"{store_path}.recalculo.json",
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        dry_run=args.dry_run,
+        restart=args.restart
+    )
+    verb = "cambiarían" if args.dry_run else "actualizados"
+    print(f"✅ Reglas {result['rules_version']}: {result['processed']} perfiles procesados, "
+          f"{result['changed']} {verb}, {result['skipped']} omitidos por cambios concurrentes, "
+          f"{result['errors']} con errores, en {result['elapsed_seconds']}s")
+    return 0 if result["errors"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
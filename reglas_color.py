@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Reglas de colorimetría compiladas y versionadas
+Tablas de puntuación de subtono y matriz de decisión de estaciones, compiladas una sola vez
+a búsquedas planas codificadas con enteros y recargables en caliente desde un archivo JSON/YAML
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:  # YAML opcional para los archivos de reglas
+    yaml = None
+
+# Archivo de reglas (opcional) y cada cuántos segundos se revisa su fecha de modificación
+RULES_FILE = os.environ.get("BEAUTY_RULES_FILE")
+RULES_CHECK_INTERVAL = float(os.environ.get("BEAUTY_RULES_CHECK_INTERVAL", 5))
+
+# Reglas por defecto, equivalentes a las tablas originales de ColorAnalyzer
+DEFAULT_RULES: Dict[str, Any] = {
+    "version": "2024.1",
+    "undertone": {
+        # Peso de cada indicador y puntuación de cada respuesta (negativo = frío, positivo = cálido)
+        "factors": {
+            "vein_color": {
+                "weight": 2,
+                "scores": {"azul": -2, "azul_verdoso": -1, "purpura": -1,
+                           "verde": 2, "verde_oliva": 2, "indefinido": 0}
+            },
+            "jewelry_preference": {"weight": 1, "scores": {"plata": -1.5, "oro": 1.5, "ambos": 0}},
+            "sun_reaction": {"weight": 1, "scores": {"se_quema": -1, "broncea_despacio": -0.5, "broncea_facil": 1}},
+            "natural_lip_color": {"weight": 1, "scores": {"rosado": -0.5, "coral": 0, "durazno": 0.5}}
+        },
+        "cold_max": -1,
+        "warm_min": 1
+    },
+    "season": {
+        "default": "verano_suave",
+        "confidence": 85,
+        # tono de piel -> subtono -> contraste -> estación
+        "matrix": {
+            "clara": {
+                "calido": {"bajo": "primavera_clara", "medio": "primavera_calida", "alto": "primavera_calida"},
+                "frio": {"bajo": "verano_suave", "medio": "verano_frio", "alto": "invierno_brillante"},
+                "neutro": {"bajo": "verano_suave", "medio": "verano_frio", "alto": "invierno_brillante"}
+            },
+            "media": {
+                "calido": {"bajo": "otono_suave", "medio": "primavera_calida", "alto": "otono_profundo"},
+                "frio": {"bajo": "verano_suave", "medio": "verano_frio", "alto": "invierno_profundo"},
+                "neutro": {"bajo": "otono_suave", "medio": "verano_frio", "alto": "invierno_profundo"}
+            },
+            "oscura": {
+                "calido": {"bajo": "otono_suave", "medio": "otono_profundo", "alto": "otono_profundo"},
+                "frio": {"bajo": "invierno_profundo", "medio": "invierno_profundo", "alto": "invierno_profundo"},
+                "neutro": {"bajo": "invierno_profundo", "medio": "invierno_profundo", "alto": "invierno_profundo"}
+            }
+        },
+        # Ajuste de contraste por color de cabello -> color de ojos
+        "contrast_adjustments": {
+            "negro": {"azul": "alto", "verde": "alto"},
+            "rubio": {"cafe": "medio", "azul": "bajo"},
+            "castano": {"verde": "medio"},
+            "pelirrojo": {"verde": "alto"}
+        }
+    }
+}
+
+def _codes(values: Iterable[str]) -> Dict[str, int]:
+    return {value: code for code, value in enumerate(values)}
+
+class CompiledRules:
+    """Conjunto de reglas compilado e inmutable; todas las búsquedas son O(1)"""
+
+    __slots__ = (
+        "version", "source", "factor_scores", "cold_max", "warm_min",
+        "skin_codes", "undertone_codes", "contrast_codes", "contrast_names",
+        "season_keys", "season_table", "default_season", "confidence", "contrast_adjustments"
+    )
+
+    def __init__(self, rules: Dict[str, Any], source: str = "default",
+                 season_keys: Optional[Iterable[str]] = None):
+        self.version = str(rules["version"])
+        self.source = source
+
+        # Subtono: cada factor es un diccionario respuesta -> puntuación ya ponderada
+        undertone = rules["undertone"]
+        self.factor_scores: Tuple[Dict[str, float], ...] = tuple(
+            {answer: score * factor["weight"] for answer, score in factor["scores"].items()}
+            for factor in (undertone["factors"][name] for name in
+                           ("vein_color", "jewelry_preference", "sun_reaction", "natural_lip_color"))
+        )
+        self.cold_max = undertone["cold_max"]
+        self.warm_min = undertone["warm_min"]
+
+        # Estación: dimensiones codificadas como enteros y una tabla plana
+        # season_table[(piel * n_subtonos + subtono) * n_contrastes + contraste] -> índice de estación
+        season = rules["season"]
+        matrix = season["matrix"]
+        undertones = sorted({u for by_undertone in matrix.values() for u in by_undertone})
+        contrasts = sorted({c for by_undertone in matrix.values() for by_contrast in by_undertone.values()
+                            for c in by_contrast})
+        self.skin_codes = _codes(sorted(matrix))
+        self.undertone_codes = _codes(undertones)
+        self.contrast_codes = _codes(contrasts)
+        self.contrast_names: List[str] = contrasts
+
+        self.default_season = season["default"]
+        season_names = sorted({s for by_undertone in matrix.values() for by_contrast in by_undertone.values()
+                               for s in by_contrast.values()} | {self.default_season})
+        if season_keys is not None:
+            unknown = set(season_names) - set(season_keys)
+            if unknown:
+                raise ValueError(f"Estaciones desconocidas en las reglas: {', '.join(sorted(unknown))}")
+        self.season_keys: List[str] = season_names
+        season_codes = _codes(season_names)
+
+        default_code = season_codes[self.default_season]
+        table = [default_code] * (len(self.skin_codes) * len(undertones) * len(contrasts))
+        for skin_tone, by_undertone in matrix.items():
+            for undertone_name, by_contrast in by_undertone.items():
+                for contrast, season_key in by_contrast.items():
+                    table[self._cell(self.skin_codes[skin_tone], self.undertone_codes[undertone_name],
+                                     self.contrast_codes[contrast])] = season_codes[season_key]
+        self.season_table = tuple(table)
+        self.confidence = season.get("confidence", 85)
+
+        # (cabello, ojos) -> contraste ajustado
+        self.contrast_adjustments: Dict[Tuple[str, str], str] = {
+            (hair, eye): contrast
+            for hair, by_eye in season["contrast_adjustments"].items()
+            for eye, contrast in by_eye.items()
+        }
+
+    def _cell(self, skin: int, undertone: int, contrast: int) -> int:
+        return (skin * len(self.undertone_codes) + undertone) * len(self.contrast_codes) + contrast
+
+    def undertone_score(self, vein_color: str, jewelry_preference: str, sun_reaction: str,
+                        natural_lip_color: str) -> float:
+        """Puntuación ponderada de subtono (negativo = frío, positivo = cálido)"""
+        vein, jewelry, sun, lip = self.factor_scores
+        return (vein.get(vein_color, 0) + jewelry.get(jewelry_preference, 0)
+                + sun.get(sun_reaction, 0) + lip.get(natural_lip_color, 0))
+
+    def classify_undertone(self, score: float) -> str:
+        if score <= self.cold_max:
+            return "frio"
+        if score >= self.warm_min:
+            return "calido"
+        return "neutro"
+
+    def adjusted_contrast(self, hair_color: str, eye_color: str, contrast_level: str) -> str:
+        return self.contrast_adjustments.get((hair_color, eye_color), contrast_level)
+
+    def season_for(self, skin_tone: str, undertone: str, contrast: str) -> str:
+        """Estación para (piel, subtono, contraste ajustado); la estación por defecto si no hay regla"""
+        skin = self.skin_codes.get(skin_tone)
+        tone = self.undertone_codes.get(undertone)
+        level = self.contrast_codes.get(contrast)
+        if skin is None or tone is None or level is None:
+            return self.default_season
+        return self.season_keys[self.season_table[self._cell(skin, tone, level)]]
+
+def merge_rules(defaults: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Completar overrides con defaults sección a sección (los diccionarios anidados se combinan)"""
+    merged = dict(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(defaults.get(key), dict):
+            merged[key] = merge_rules(defaults[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+def read_rules_file(path: str) -> Dict[str, Any]:
+    """Leer un archivo de reglas JSON o YAML y completarlo con las reglas por defecto
+
+    Un archivo puede cambiar solo parte de una sección (p. ej. season.confidence); el
+    resto de claves conserva su valor por defecto.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise RuntimeError("Los archivos de reglas YAML requieren el paquete 'PyYAML'")
+            loaded = yaml.safe_load(f)
+        else:
+            loaded = json.load(f)
+    if not isinstance(loaded, dict) or "version" not in loaded:
+        raise ValueError("El archivo de reglas debe ser un objeto con 'version'")
+    return merge_rules(DEFAULT_RULES, loaded)
+
+class RulesRegistry:
+    """Reglas vigentes, recargadas en caliente cuando cambia el archivo de reglas"""
+
+    def __init__(self, path: Optional[str] = RULES_FILE, season_keys: Optional[Iterable[str]] = None,
+                 check_interval: float = RULES_CHECK_INTERVAL):
+        self.path = path
+        self.season_keys = list(season_keys) if season_keys is not None else None
+        self.check_interval = check_interval
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._next_check = 0.0
+        self._rules = CompiledRules(DEFAULT_RULES, "default", self.season_keys)
+        if path:
+            self.reload()
+
+    def get(self) -> CompiledRules:
+        """Reglas vigentes; revisa el archivo como mucho una vez cada check_interval segundos"""
+        if self.path and time.monotonic() >= self._next_check:
+            self._check_file()
+        return self._rules
+
+    def _check_file(self):
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                return
+            if mtime == self._mtime:
+                return
+            self._mtime = mtime
+        try:
+            self._load()
+        except Exception as e:
+            # Conservar las reglas anteriores si el archivo nuevo no es válido
+            self.last_error = str(e)
+
+    def _load(self):
+        rules = CompiledRules(read_rules_file(self.path), self.path, self.season_keys)
+        self._rules = rules
+        self.last_error = None
+
+    def reload(self) -> CompiledRules:
+        """Forzar la recarga del archivo de reglas; lanza excepción si no es válido"""
+        if not self.path:
+            return self._rules
+        with self._lock:
+            try:
+                self._mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                pass
+            self._next_check = time.monotonic() + self.check_interval
+        try:
+            self._load()
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+        return self._rules
+
+    def info(self) -> Dict[str, Any]:
+        rules = self._rules
+        return {
+            "version": rules.version,
+            "source": rules.source,
+            "file": self.path,
+            "last_error": self.last_error,
+            "seasons": len(rules.season_keys),
+            "matrix_cells": len(rules.season_table)
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Reglas de colorimetría")
+    parser.add_argument("--dump", action="store_true", help="Imprimir las reglas por defecto en JSON")
+    parser.add_argument("--check", metavar="ARCHIVO", help="Validar y compilar un archivo de reglas")
+    args = parser.parse_args()
+
+    if args.check:
+        rules = CompiledRules(read_rules_file(args.check), args.check)
+        print(f"✅ Reglas {rules.version} válidas: {len(rules.season_table)} celdas, {len(rules.season_keys)} estaciones")
+    else:
+        print(json.dumps(DEFAULT_RULES, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
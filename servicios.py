@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Capa de servicios asíncrona
+Ejecuta las herramientas MCP (E/S de almacenamiento y análisis) fuera del event loop de asyncio
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+# Tamaño del pool dedicado a las herramientas MCP
+TOOL_WORKERS = int(os.environ.get("BEAUTY_TOOL_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+def get_executor() -> ThreadPoolExecutor:
+    """Obtener (o crear) el pool acotado de hilos para las herramientas"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="beauty-tool")
+    return _executor
+
+async def run_tool(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Ejecutar una función bloqueante en el pool de herramientas sin bloquear el event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+def shutdown_tools(wait: bool = True):
+    """Detener el pool de herramientas esperando las tareas en curso"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Lanzador de producción
+Ejecuta varios workers de uvicorn (uno por núcleo por defecto) con el event loop y el parser HTTP
+más rápidos disponibles, ajustes de keep-alive/backlog y apagado ordenado
+"""
+
+import importlib.util
+import os
+from typing import Any, Dict
+
+import uvicorn
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+def worker_count() -> int:
+    """Workers desde BEAUTY_WORKERS / WEB_CONCURRENCY o, si no, uno por núcleo"""
+    return max(1, _env_int("BEAUTY_WORKERS", _env_int("WEB_CONCURRENCY", os.cpu_count() or 1)))
+
+def server_config() -> Dict[str, Any]:
+    """Configuración de uvicorn a partir del entorno"""
+    return {
+        "host": os.environ.get("HOST", "0.0.0.0"),
+        "port": _env_int("PORT", 8000),
+        "workers": worker_count(),
+        # uvloop y httptools si están instalados (uvicorn[standard]); si no, las versiones puras
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11",
+        # Mantener las conexiones más tiempo que el timeout típico de los balanceadores (60s)
+        "timeout_keep_alive": _env_int("BEAUTY_KEEPALIVE", 65),
+        "backlog": _env_int("BEAUTY_BACKLOG", 2048),
+        "timeout_graceful_shutdown": _env_int("BEAUTY_GRACEFUL_TIMEOUT", 30),
+        "limit_concurrency": _env_int("BEAUTY_LIMIT_CONCURRENCY", 0) or None,
+        "proxy_headers": True,
+        "forwarded_allow_ips": os.environ.get("FORWARDED_ALLOW_IPS", "*"),
+        "access_log": os.environ.get("BEAUTY_ACCESS_LOG", "1") != "0",
+        "log_level": os.environ.get("BEAUTY_LOG_LEVEL", "info")
+    }
+
+def run():
+    """Preparar el almacenamiento una sola vez y arrancar los workers"""
+    config = server_config()
+
+    # Crear el esquema e importar el JSON anterior antes de lanzar los workers, para que
+    # no compitan por la migración inicial (los motores ya son seguros entre procesos)
+    from metodos_server import init_data_storage
+    init_data_storage()
+
+    print("🚀 Iniciando Beauty Server Integrado...")
+    print(f"📍 Puerto: {config['port']}")
+    print(f"⚙️  Workers: {config['workers']} | loop: {config['loop']} | http: {config['http']}")
+    print("📚 Docs: /docs")
+
+    # Con varios workers uvicorn necesita la aplicación como cadena de importación;
+    # cada worker importa main y precalienta sus cachés en el lifespan
+    uvicorn.run("main:app", **config)
+
+if __name__ == "__main__":
+    run()
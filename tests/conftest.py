@@ -0,0 +1,48 @@
+"""
+Fixtures comunes: almacenes temporales de ambos motores y cuestionarios válidos
+"""
+
+import os
+import sys
+
+import pytest
+
+# Los módulos del servidor están en la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from almacenamiento import JSONFileStorage, SQLiteStorage
+
+BACKENDS = ("json", "sqlite")
+
+def make_storage(backend: str, directory, **kwargs):
+    """Motor indicado sobre archivos dentro de directory; otra llamada con el mismo directorio abre el mismo almacén"""
+    if backend == "json":
+        return JSONFileStorage(str(directory / "perfiles.json"), **kwargs)
+    return SQLiteStorage(str(directory / "perfiles.db"), **kwargs)
+
+def questionnaire(user_id: str, **overrides):
+    """Respuestas válidas de create-profile"""
+    args = {
+        "user_id": user_id,
+        "name": f"Usuaria {user_id}",
+        "skin_tone": "clara",
+        "vein_color": "azul",
+        "eye_color": "azul",
+        "hair_color": "rubio",
+        "natural_lip_color": "rosado",
+        "contrast_level": "medio",
+        "jewelry_preference": "plata",
+        "sun_reaction": "se_quema"
+    }
+    args.update(overrides)
+    return args
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    return request.param
+
+@pytest.fixture
+def store(backend, tmp_path):
+    storage = make_storage(backend, tmp_path)
+    storage.init()
+    return storage
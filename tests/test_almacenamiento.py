@@ -0,0 +1,191 @@
+"""
+Operaciones comunes de los motores de almacenamiento JSON y SQLite
+"""
+
+import pytest
+
+from almacenamiento import PaletteRetention, migrate_json_to_sqlite
+from metodos_server import build_profile
+from conftest import make_storage, questionnaire
+
+def profile_for(user_id: str, **overrides):
+    return build_profile(questionnaire(user_id, **overrides))
+
+def palette_for(user_id: str, number: int):
+    return {
+        "user_id": user_id,
+        "palette_type": "maquillaje",
+        "event_type": "casual",
+        "generated_at": f"2026-01-01T00:00:{number:02d}",
+        "main_palette": {"labios": ["#FF0000"]},
+        "harmony_colors": [f"#0000{number:02X}"]
+    }
+
+def test_create_get_delete(store):
+    assert store.is_empty()
+    profile = profile_for("ana")
+
+    assert store.create_profile("ana", profile)
+    assert not store.create_profile("ana", profile_for("ana", name="Otra"))
+    assert store.get_profile("ana") == profile
+    assert store.has_profile("ana")
+    assert not store.is_empty()
+
+    assert store.delete_profile("ana")
+    assert not store.delete_profile("ana")
+    assert store.get_profile("ana") is None
+    assert not store.has_profile("ana")
+
+def test_create_profiles_reports_duplicates(store):
+    store.create_profile("b", profile_for("b"))
+
+    created = store.create_profiles([("a", profile_for("a")), ("b", profile_for("b")), ("c", profile_for("c"))])
+
+    assert created == [True, False, True]
+    assert [user_id for user_id, _ in store.iter_profiles()] == ["a", "b", "c"]
+
+def test_put_profile_replaces(store):
+    store.create_profile("ana", profile_for("ana"))
+    replacement = profile_for("ana", name="Ana María")
+
+    store.put_profile("ana", replacement)
+
+    assert store.get_profile("ana")["basic_info"]["name"] == "Ana María"
+    assert store.count_profiles() == 1
+
+def test_profiles_are_shared_between_instances(backend, tmp_path):
+    writer = make_storage(backend, tmp_path)
+    writer.init()
+    writer.create_profile("ana", profile_for("ana"))
+
+    assert make_storage(backend, tmp_path).get_profile("ana") == writer.get_profile("ana")
+
+def test_iter_profiles_after_cursor(store):
+    store.create_profiles([(user_id, profile_for(user_id)) for user_id in ("d", "a", "c", "b")])
+
+    assert [user_id for user_id, _ in store.iter_profiles(after="b")] == ["c", "d"]
+
+def test_summaries_filters_and_cursor(store):
+    store.create_profiles([
+        ("a", profile_for("a", skin_tone="clara")),
+        ("b", profile_for("b", skin_tone="oscura")),
+        ("c", profile_for("c", skin_tone="clara")),
+        ("d", profile_for("d", skin_tone="clara"))
+    ])
+
+    summaries = list(store.iter_profile_summaries({"skin_tone": "clara"}))
+    assert [summary["user_id"] for summary in summaries] == ["a", "c", "d"]
+    assert summaries[0]["name"] == "Usuaria a"
+    assert [summary["user_id"] for summary in store.iter_profile_summaries({"skin_tone": "clara"}, after="a")] == ["c", "d"]
+    assert store.count_profiles({"skin_tone": "clara"}) == 3
+    assert store.count_profiles() == 4
+
+    store.delete_profile("c")
+    assert store.count_profiles({"skin_tone": "clara"}) == 2
+
+def test_palette_pages_newest_first(store):
+    store.create_profile("ana", profile_for("ana"))
+    store.append_palettes([("ana", palette_for("ana", number)) for number in range(5)])
+
+    assert [palette["generated_at"][-2:] for palette in store.get_palettes("ana")] == ["00", "01", "02", "03", "04"]
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = store.get_palettes_page("ana", 2, cursor)
+        seen.append([palette["generated_at"][-2:] for palette in page])
+        if cursor is None:
+            break
+    assert seen == [["04", "03"], ["02", "01"], ["00"]]
+    assert store.get_palettes("nadie") == []
+
+def test_retention_keeps_newest_palettes(backend, tmp_path):
+    store = make_storage(backend, tmp_path, retention=PaletteRetention(max_per_user=3))
+    store.init()
+    store.create_profile("ana", profile_for("ana"))
+    store.append_palettes([("ana", palette_for("ana", number)) for number in range(5)])
+
+    assert [palette["generated_at"][-2:] for palette in store.get_palettes("ana")] == ["02", "03", "04"]
+    # SQLite recorta al agregar; el motor JSON, al compactar el diario
+    assert store.compact() == (2 if backend == "json" else 0)
+    assert len(store.load_all()["palettes"]["ana"]) == 3
+
+def test_load_all_includes_palettes(store):
+    store.create_profile("ana", profile_for("ana"))
+    store.append_palette("ana", palette_for("ana", 1))
+
+    data = store.load_all()
+
+    assert list(data["profiles"]) == ["ana"]
+    assert data["palettes"]["ana"] == [palette_for("ana", 1)]
+    exported = [(user_id, list(palettes)) for user_id, _, palettes in store.iter_profiles_with_palettes()]
+    assert exported == [("ana", [palette_for("ana", 1)])]
+
+def test_version_changes_only_with_profile_writes(store):
+    version = store.profiles_version()
+
+    store.create_profile("ana", profile_for("ana"))
+    assert store.profiles_version() != version
+    version = store.profiles_version()
+
+    # Escrituras que no cambian perfiles
+    assert not store.create_profile("ana", profile_for("ana"))
+    assert not store.delete_profile("nadie")
+    store.append_palette("ana", palette_for("ana", 1))
+    assert store.profiles_version() == version
+
+    store.delete_profile("ana")
+    assert store.profiles_version() != version
+
+def test_sqlite_version_counts_write_transactions(tmp_path):
+    store = make_storage("sqlite", tmp_path)
+    store.init()
+    version = store.profiles_version()
+
+    store.create_profiles([("a", profile_for("a")), ("b", profile_for("b"))])
+    assert store.profiles_version() == version + 1
+    store.put_profile("a", profile_for("a", name="Otra"))
+    assert store.profiles_version() == version + 2
+    store.delete_profile("b")
+    assert store.profiles_version() == version + 3
+
+def test_version_seen_by_other_instance(backend, tmp_path):
+    first = make_storage(backend, tmp_path)
+    first.init()
+    second = make_storage(backend, tmp_path)
+    version = second.profiles_version()
+
+    first.create_profile("ana", profile_for("ana"))
+
+    assert second.profiles_version() != version
+
+def test_update_profiles_only_if_unchanged(store):
+    store.create_profiles([(user_id, profile_for(user_id)) for user_id in ("a", "b", "c")])
+    read = dict(store.iter_profiles())
+    store.delete_profile("b")
+    store.put_profile("c", profile_for("c", name="Editada"))
+    version = store.profiles_version()
+
+    updated = store.update_profiles([
+        (user_id, read[user_id], profile_for(user_id, name="Recalculada")) for user_id in ("a", "b", "c")
+    ])
+
+    assert updated == [True, False, False]
+    assert store.get_profile("a")["basic_info"]["name"] == "Recalculada"
+    assert store.get_profile("b") is None
+    assert store.get_profile("c")["basic_info"]["name"] == "Editada"
+    assert store.profiles_version() != version
+    assert [summary["name"] for summary in store.iter_profile_summaries()] == ["Recalculada", "Editada"]
+
+def test_migration_refuses_non_empty_database(tmp_path):
+    source = make_storage("json", tmp_path)
+    source.init()
+    source.create_profile("ana", profile_for("ana"))
+    source.append_palette("ana", palette_for("ana", 1))
+    db_path = str(tmp_path / "perfiles.db")
+
+    assert migrate_json_to_sqlite(source.path, db_path) == {"profiles": 1, "palettes": 1}
+    with pytest.raises(FileExistsError):
+        migrate_json_to_sqlite(source.path, db_path)
+
+    assert len(make_storage("sqlite", tmp_path).get_palettes("ana")) == 1
@@ -0,0 +1,44 @@
+"""
+Rutas HTTP de main.py sobre un almacén temporal
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import metodos_server
+from conftest import make_storage, questionnaire
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    storage = make_storage("sqlite", tmp_path, codec=metodos_server.record_codec)
+    storage.init()
+    monkeypatch.setattr(metodos_server, "storage", storage)
+    metodos_server.profile_cache.clear()
+    for user_id in ("a", "b", "c"):
+        metodos_server.tool_create_profile(questionnaire(user_id))
+    yield TestClient(main.app)
+    metodos_server.profile_cache.clear()
+
+def test_list_profiles_ndjson(client):
+    response = client.get("/mcp/profiles", params={"format": "ndjson", "limit": 2})
+
+    assert response.status_code == 200
+    assert [json.loads(line)["user_id"] for line in response.text.splitlines()] == ["a", "b"]
+
+@pytest.mark.parametrize("limit", [-1, 0, metodos_server.LIST_MAX_LIMIT + 1])
+@pytest.mark.parametrize("fmt", ["json", "ndjson"])
+def test_list_profiles_rejects_invalid_limit(client, fmt, limit):
+    response = client.get("/mcp/profiles", params={"format": fmt, "limit": limit})
+
+    assert response.status_code == 400
+    assert "limit" in response.json()["detail"]
+
+@pytest.mark.parametrize("cursor", ["sin-separador", "a|b"])
+def test_palette_history_rejects_invalid_cursor(client, cursor):
+    response = client.get("/mcp/palettes/a", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Cursor no válido: {cursor}"
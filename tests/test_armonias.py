@@ -0,0 +1,36 @@
+"""
+Equivalencia entre la generación de armonías por lotes (NumPy) y la escalar
+"""
+
+import random
+
+import pytest
+
+from metodos_server import ColorAnalyzer
+
+HARMONY_TYPES = list(ColorAnalyzer.HARMONY_HUE_STEPS)
+
+# Extremos de luminosidad y saturación, grises, matices puros y hex en minúsculas
+EDGE_COLORS = [
+    "#000000", "#FFFFFF", "#808080", "#7F7F7F", "#FF0000", "#00FF00", "#0000FF",
+    "#ffff00", "#00ffff", "#ff00ff", "#010101", "#FEFEFE", "#ff6b35", "#E6E6FA"
+]
+
+def random_colors(count: int, seed: int):
+    rng = random.Random(seed)
+    return [f"#{rng.randrange(0x1000000):06X}" for _ in range(count)]
+
+@pytest.mark.parametrize("base_colors", [EDGE_COLORS, random_colors(2000, seed=7)], ids=["extremos", "aleatorios"])
+def test_batch_matches_scalar(base_colors):
+    batch = ColorAnalyzer.generate_harmony_palettes_batch(base_colors, HARMONY_TYPES)
+
+    assert len(batch) == len(base_colors)
+    for base_hex, harmonies in zip(base_colors, batch):
+        assert list(harmonies) == HARMONY_TYPES
+        for harmony_type in HARMONY_TYPES:
+            assert harmonies[harmony_type] == ColorAnalyzer.generate_harmony_palette([base_hex], harmony_type), \
+                (base_hex, harmony_type)
+
+def test_batch_unknown_type_and_empty_input():
+    assert ColorAnalyzer.generate_harmony_palettes_batch([], HARMONY_TYPES) == []
+    assert ColorAnalyzer.generate_harmony_palettes_batch(["#FF0000"], ["desconocida"]) == [{"desconocida": []}]
@@ -0,0 +1,91 @@
+"""
+Invalidación de la caché de perfiles ante escrituras de otros workers
+"""
+
+import pytest
+
+import metodos_server
+from conftest import make_storage, questionnaire
+
+@pytest.fixture
+def server(backend, tmp_path, monkeypatch):
+    """metodos_server sobre un almacén temporal, con la caché vacía"""
+    storage = make_storage(backend, tmp_path, codec=metodos_server.record_codec)
+    storage.init()
+    monkeypatch.setattr(metodos_server, "storage", storage)
+    metodos_server.profile_cache.clear()
+    yield metodos_server
+    metodos_server.profile_cache.clear()
+
+@pytest.fixture
+def other_worker(backend, tmp_path):
+    """Otra instancia sobre los mismos archivos, como la de otro worker"""
+    return make_storage(backend, tmp_path, codec=metodos_server.record_codec)
+
+def test_cached_profile_is_served(server):
+    assert server.tool_create_profile(questionnaire("x"))["success"]
+    assert server.tool_show_profile({"user_id": "x"})["success"]
+    assert "x" in server.profile_cache._items
+
+def test_foreign_delete_survives_own_write(server, other_worker):
+    server.tool_create_profile(questionnaire("x"))
+    assert server.tool_show_profile({"user_id": "x"})["success"]
+
+    assert other_worker.delete_profile("x")
+    # La escritura propia no debe dar por vista la del otro worker
+    assert server.tool_create_profile(questionnaire("y"))["success"]
+
+    assert "error" in server.tool_show_profile({"user_id": "x"})
+    assert server.tool_show_profile({"user_id": "y"})["success"]
+
+def test_foreign_update_survives_own_delete(server, other_worker):
+    server.tool_create_profile(questionnaire("x"))
+    server.tool_create_profile(questionnaire("y"))
+    assert server.tool_show_profile({"user_id": "x"})["success"]
+
+    profile = other_worker.get_profile("x")
+    profile["basic_info"]["name"] = "Renombrada"
+    other_worker.put_profile("x", profile)
+    assert server.tool_delete_profile({"user_id": "y"})["success"]
+
+    assert server.get_cached_profile("x")["basic_info"]["name"] == "Renombrada"
+
+def test_own_write_keeps_cache_on_sqlite(server, backend):
+    server.tool_create_profile(questionnaire("x"))
+    server.tool_show_profile({"user_id": "x"})
+    server.tool_create_profile(questionnaire("y"))
+    # Con el contador de SQLite se sabe que solo avanzó por la escritura propia
+    assert ("x" in server.profile_cache._items) == (backend == "sqlite")
+
+def test_stale_read_is_not_cached(server, monkeypatch):
+    server.tool_create_profile(questionnaire("x"))
+    # Worker recién arrancado: la primera lectura va al almacenamiento
+    server.profile_cache.clear()
+    read_profile = server.storage.get_profile
+
+    def read_then_delete(user_id):
+        # Otra petición del mismo worker borra el perfil entre la lectura y el guardado en caché
+        profile = read_profile(user_id)
+        server.tool_delete_profile({"user_id": user_id})
+        return profile
+
+    monkeypatch.setattr(server.storage, "get_profile", read_then_delete)
+    assert server.get_cached_profile("x") is not None
+    monkeypatch.setattr(server.storage, "get_profile", read_profile)
+
+    assert server.get_cached_profile("x") is None
+
+@pytest.mark.parametrize("backend", ["json"])
+def test_own_write_clears_cache_without_version_counter(server, monkeypatch):
+    # Aunque el mtime avance justo 1 ns, el motor JSON no cuenta escrituras: se vacía igual
+    versions = iter(range(1, 100))
+    version = next(versions)
+    monkeypatch.setattr(server.storage, "profiles_version", lambda: version)
+    server.tool_create_profile(questionnaire("x"))
+    server.tool_show_profile({"user_id": "x"})
+
+    before = server.profile_cache.write_version()
+    version = next(versions)
+    server.profile_cache.mark_written(before)
+
+    assert "x" not in server.profile_cache._items
@@ -0,0 +1,53 @@
+"""
+Recálculo masivo de perfiles con escrituras concurrentes
+"""
+
+import recalcular_perfiles
+from metodos_server import build_profile
+from conftest import make_storage, questionnaire
+
+def stale_profile(user_id: str):
+    """Perfil cuyo análisis guardado no coincide con las reglas vigentes"""
+    profile = build_profile(questionnaire(user_id))
+    profile["color_analysis"]["undertone_analysis"]["score"] = 99
+    return profile
+
+def test_recalculates_only_changed_profiles(store, tmp_path):
+    store.create_profiles([("a", stale_profile("a")), ("b", build_profile(questionnaire("b")))])
+
+    result = recalcular_perfiles.recalculate_profiles(store, str(tmp_path / "punto.json"), workers=1)
+
+    assert (result["processed"], result["changed"], result["skipped"]) == (2, 1, 0)
+    assert store.get_profile("a")["color_analysis"]["undertone_analysis"]["score"] != 99
+
+def test_concurrent_delete_and_edit_are_kept(store, backend, tmp_path, monkeypatch):
+    store.create_profiles([(user_id, stale_profile(user_id)) for user_id in ("a", "b", "c")])
+    other_worker = make_storage(backend, tmp_path)
+    recompute_chunk = recalcular_perfiles.recompute_chunk
+
+    def recompute_during_traffic(chunk):
+        # El servidor borra y edita perfiles del bloque mientras se recalcula
+        result = recompute_chunk(chunk)
+        other_worker.delete_profile("b")
+        edited = other_worker.get_profile("c")
+        edited["basic_info"]["name"] = "Editada"
+        other_worker.put_profile("c", edited)
+        return result
+
+    monkeypatch.setattr(recalcular_perfiles, "recompute_chunk", recompute_during_traffic)
+    result = recalcular_perfiles.recalculate_profiles(store, str(tmp_path / "punto.json"), workers=1)
+
+    assert (result["changed"], result["skipped"]) == (1, 2)
+    assert store.get_profile("b") is None
+    assert store.get_profile("c")["basic_info"]["name"] == "Editada"
+    assert store.get_profile("a")["color_analysis"]["undertone_analysis"]["score"] != 99
+
+def test_rules_version_alone_is_not_a_change(store, tmp_path):
+    profile = build_profile(questionnaire("a"))
+    profile["color_analysis"]["season_analysis"]["rules_version"] = "anterior"
+    store.create_profile("a", profile)
+
+    result = recalcular_perfiles.recalculate_profiles(store, str(tmp_path / "punto.json"), workers=1)
+
+    assert result["changed"] == 0
+    assert store.get_profile("a")["color_analysis"]["season_analysis"]["rules_version"] == "anterior"
@@ -0,0 +1,60 @@
+"""
+Recarga en caliente de las reglas de colorimetría desde un archivo
+"""
+
+import json
+import os
+
+import pytest
+
+from reglas_color import DEFAULT_RULES, RulesRegistry, read_rules_file
+from metodos_server import ColorAnalyzer
+
+def write_rules(path, rules, mtime_ns):
+    path.write_text(json.dumps(rules), encoding="utf-8")
+    # Fecha explícita: dos escrituras seguidas pueden compartir mtime
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+@pytest.fixture
+def rules_path(tmp_path):
+    path = tmp_path / "reglas.json"
+    write_rules(path, DEFAULT_RULES, 1_000_000_000)
+    return path
+
+def test_partial_sections_keep_defaults(rules_path):
+    write_rules(rules_path, {"version": "parcial", "season": {"confidence": 90}, "undertone": {"cold_max": -3}},
+                2_000_000_000)
+    rules = read_rules_file(str(rules_path))
+
+    assert rules["season"]["confidence"] == 90
+    assert rules["season"]["matrix"] == DEFAULT_RULES["season"]["matrix"]
+    assert rules["undertone"]["cold_max"] == -3
+    assert rules["undertone"]["factors"] == DEFAULT_RULES["undertone"]["factors"]
+
+def test_hot_reload_with_partial_file(rules_path):
+    registry = RulesRegistry(str(rules_path), season_keys=ColorAnalyzer.SEASONS, check_interval=0)
+    assert registry.get().version == DEFAULT_RULES["version"]
+
+    partial = {
+        "version": "parcial",
+        "season": {"confidence": 90, "matrix": {"clara": {"frio": {"alto": "verano_frio"}}}}
+    }
+    write_rules(rules_path, partial, 2_000_000_000)
+    rules = registry.get()
+
+    assert registry.last_error is None
+    assert rules.version == "parcial"
+    assert rules.confidence == 90
+    assert rules.season_for("clara", "frio", "alto") == "verano_frio"
+    # Celdas y secciones no incluidas en el archivo
+    assert rules.season_for("clara", "frio", "medio") == "verano_frio"
+    assert rules.season_for("oscura", "calido", "bajo") == "otono_suave"
+    assert rules.classify_undertone(-1) == "frio"
+    assert rules.adjusted_contrast("negro", "azul", "bajo") == "alto"
+
+def test_invalid_file_keeps_previous_rules(rules_path):
+    registry = RulesRegistry(str(rules_path), season_keys=ColorAnalyzer.SEASONS, check_interval=0)
+    write_rules(rules_path, {"version": "mala", "season": {"default": "estacion_inexistente"}}, 2_000_000_000)
+
+    assert registry.get().version == DEFAULT_RULES["version"]
+    assert "estacion_inexistente" in registry.last_error